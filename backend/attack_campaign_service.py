@@ -0,0 +1,312 @@
+import multiprocessing
+import threading
+import time
+import uuid
+
+from fonction_de_hachage_lent import verify_many
+from backend import password_hashing
+from backend.password_attack_service import BATCH_SIZE
+from backend.password_keyspace import KEYSPACES
+
+# Étapes d'une campagne, de la moins chère à la plus chère
+CAMPAIGN_STAGES = ('dictionary3', 'dictionary5', 'bruteforce')
+# Candidats par tâche envoyée au pool (~1-2 s à 10000 itérations)
+CHUNK_SIZE = 4096
+PAGE_SIZE = 1000
+
+
+def fetch_accounts(users, page_size=PAGE_SIZE):
+    """All users with their password hash (UserRepository.iter_accounts, pages of `page_size` rows)"""
+    return list(users.iter_accounts(page_size))
+
+
+def _campaign_task(args):
+    """Test one KeyspaceRange of candidates against one account"""
+    account_id, stage, chunk, digest, salt, iterations = args
+    candidates = iter(chunk)
+    tested = 0
+    while tested < len(chunk):
+        batch = [next(candidates) for _ in range(min(BATCH_SIZE, len(chunk) - tested))]
+        matches = verify_many(digest, batch, salt, iterations=iterations)
+        if True in matches:
+            hit = matches.index(True)
+            return account_id, stage, tested + hit + 1, batch[hit]
+        tested += len(batch)
+    return account_id, stage, tested, None
+
+
+class CampaignAccount:
+    def __init__(self, row):
+        self.id = row['id']
+        self.username = row['username']
+        self.status = 'pending'
+        self.stage = None
+        self.attempts = 0
+        self.password = None
+        self.method = None
+        self.error = None
+        self.digest = self.salt = self.iterations = None
+        self.skipped_stages = set()
+        self.chunks_done = {}
+
+        try:
+            record = password_hashing.decode(row['password_hash'], row.get('password_salt'))
+        except (ValueError, KeyError, AttributeError) as e:
+            self.status, self.error = 'error', str(e)
+            return
+        if record.algorithm != 'slow':
+            self.status, self.error = 'unsupported', f"Offline attacks only support the slow hash, not {record.algorithm}"
+            return
+        self.digest, self.salt, self.iterations = record.digest, record.salt_hex, record.params['i']
+
+    @property
+    def active(self):
+        return self.status in ('pending', 'running')
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "status": self.status,
+            "stage": self.stage,
+            "attempts": self.attempts,
+            "password": self.password,
+            "method": self.method,
+            "error": self.error
+        }
+
+
+class AttackCampaign:
+    """
+    Attack every account at once: each stage (dictionary3, dictionary5, bruteforce) is run for all
+    accounts before the next one, as CHUNK_SIZE tasks on a shared process pool. Inside a stage, chunks
+    go round-robin over accounts, and an account's remaining chunks are dropped as soon as it is cracked.
+    Per-account results are appended to `results` as they land.
+    """
+
+    NOTIFY_INTERVAL = 0.5
+
+    def __init__(self, attack_service, rows, stages=CAMPAIGN_STAGES, workers=None):
+        self.id = uuid.uuid4().hex
+        self.attack_service = attack_service
+        self.stages = tuple(stages)
+        self.workers = workers or multiprocessing.cpu_count()
+        self.accounts = {row['id']: CampaignAccount(row) for row in rows}
+        self.status = 'running'
+        self.stage = None
+        self.attempts = 0
+        self.results = []
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.stop_event = threading.Event()
+        self.version = 0
+        self._last_notify = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status != 'running'
+
+    def _finish_account(self, account, status, password=None, method=None, cached=False):
+        """Called with the condition held"""
+        account.status = status
+        account.password = password
+        account.method = method
+        result = account.to_dict()
+        if cached:
+            result["cached"] = True
+        self.results.append(result)
+        self._notify(force=True)
+
+    def _notify(self, force=False):
+        now = time.time()
+        if force or now - self._last_notify >= self.NOTIFY_INTERVAL:
+            self._last_notify = now
+            self.version += 1
+            self._cond.notify_all()
+
+    def _prepare(self):
+        """Answer from the result cache where possible; report accounts that cannot be attacked"""
+        cache = self.attack_service.result_cache
+        with self._cond:
+            for account in self.accounts.values():
+                if account.status in ('error', 'unsupported'):
+                    self.results.append(account.to_dict())
+                    continue
+                if cache is None:
+                    continue
+                solved = cache.get_solved(account.digest, account.salt, account.iterations)
+                if solved is not None:
+                    self._finish_account(account, 'found', solved["password"], solved["method"], cached=True)
+                    continue
+                account.skipped_stages = {stage for stage in self.stages
+                                          if cache.is_exhausted(account.digest, account.salt,
+                                                                account.iterations, stage)}
+                if account.skipped_stages == set(self.stages):
+                    self._finish_account(account, 'not_found', cached=True)
+            self._notify(force=True)
+
+    def _tasks(self):
+        """Chunks of every stage, stage by stage, round-robin over the accounts still to crack"""
+        for stage in self.stages:
+            keyspace = KEYSPACES[stage]
+            with self._cond:
+                self.stage = stage
+                self._notify(force=True)
+            for start in range(0, len(keyspace), CHUNK_SIZE):
+                chunk = keyspace[start:start + CHUNK_SIZE]
+                for account in list(self.accounts.values()):
+                    if not account.active or stage in account.skipped_stages:
+                        continue
+                    account.status, account.stage = 'running', stage
+                    yield (account.id, stage, chunk, account.digest, account.salt, account.iterations)
+
+    def _on_result(self, result):
+        account_id, stage, tested, password = result
+        account = self.accounts[account_id]
+        cache = self.attack_service.result_cache
+        with self._cond:
+            self.attempts += tested
+            if not account.active:
+                return  # déjà cassé par un autre chunk
+            account.attempts += tested
+            if password is not None:
+                self._finish_account(account, 'found', password, stage)
+                if cache:
+                    cache.record_solved(account.digest, account.salt, account.iterations, password, stage)
+                return
+
+            account.chunks_done[stage] = account.chunks_done.get(stage, 0) + 1
+            if account.chunks_done[stage] * CHUNK_SIZE >= len(KEYSPACES[stage]):
+                if cache:
+                    cache.record_exhausted(account.digest, account.salt, account.iterations, stage,
+                                           account.attempts)
+                account.skipped_stages.add(stage)
+                if account.skipped_stages >= set(self.stages):
+                    self._finish_account(account, 'not_found')
+            self._notify()
+
+    def run(self):
+        try:
+            self._prepare()
+            slots = threading.BoundedSemaphore(self.workers * 2)
+            errors = []
+
+            def done(result):
+                try:
+                    self._on_result(result)
+                finally:
+                    slots.release()
+
+            def failed(error):
+                errors.append(error)
+                slots.release()
+
+            def acquire():
+                while not slots.acquire(timeout=0.5):
+                    if self.stop_event.is_set() or errors:
+                        return False
+                return True
+
+            with multiprocessing.Pool(self.workers) as pool:
+                # Au plus 2 tâches par worker en attente : les chunks des comptes cassés ne sont jamais envoyés
+                for task in self._tasks():
+                    if self.stop_event.is_set() or errors or not acquire():
+                        break
+                    pool.apply_async(_campaign_task, (task,), callback=done, error_callback=failed)
+                # Attendre les tâches en cours
+                for _ in range(self.workers * 2):
+                    slots.acquire()
+            if errors:
+                raise errors[0]
+
+            with self._cond:
+                if self.stop_event.is_set():
+                    self.status = 'cancelled'
+                else:
+                    for account in self.accounts.values():
+                        if account.active:
+                            self._finish_account(account, 'not_found')
+                    self.status = 'finished'
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            with self._cond:
+                self.status = 'error'
+                self.error = str(e)
+        with self._cond:
+            self.finished_at = time.time()
+            self._notify(force=True)
+
+    def wait_for_update(self, version, timeout=15):
+        """Block until the campaign changes past `version` (or timeout); returns the new version"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def results_since(self, index):
+        with self._cond:
+            return self.results[index:]
+
+    def snapshot(self, include_results=True):
+        with self._cond:
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at
+            counts = {}
+            for account in self.accounts.values():
+                counts[account.status] = counts.get(account.status, 0) + 1
+            snapshot = {
+                "campaign_id": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "stages": list(self.stages),
+                "workers": self.workers,
+                "accounts": len(self.accounts),
+                "counts": counts,
+                "attempts": self.attempts,
+                "rate": self.attempts / elapsed if elapsed > 0 else 0,
+                "elapsed": elapsed,
+                "error": self.error,
+                "version": self.version
+            }
+            if include_results:
+                snapshot["results"] = list(self.results)
+            return snapshot
+
+
+class AttackCampaignManager:
+    """Runs attack campaigns in background threads and keeps their state by campaign ID"""
+
+    def __init__(self, attack_service, max_finished_campaigns=10):
+        self.attack_service = attack_service
+        self.max_finished_campaigns = max_finished_campaigns
+        self._campaigns = {}
+        self._lock = threading.Lock()
+
+    def start(self, rows, stages=CAMPAIGN_STAGES, workers=None):
+        unknown = [stage for stage in stages if stage not in CAMPAIGN_STAGES]
+        if unknown or not stages:
+            raise ValueError(f"Unknown campaign stages: {unknown}")
+
+        campaign = AttackCampaign(self.attack_service, rows, stages, workers)
+        with self._lock:
+            finished = sorted((c for c in self._campaigns.values() if c.finished), key=lambda c: c.finished_at)
+            for old in finished[:max(len(finished) - self.max_finished_campaigns + 1, 0)]:
+                del self._campaigns[old.id]
+            self._campaigns[campaign.id] = campaign
+
+        thread = threading.Thread(target=campaign.run, name=f"campaign-{campaign.id[:8]}", daemon=True)
+        thread.start()
+        return campaign
+
+    def get(self, campaign_id):
+        with self._lock:
+            return self._campaigns.get(campaign_id)
+
+    def cancel(self, campaign_id):
+        campaign = self.get(campaign_id)
+        if campaign is None:
+            return None
+        campaign.stop_event.set()
+        return campaign
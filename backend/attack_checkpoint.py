@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import time
+
+
+class AttackCheckpoint:
+    """
+    Progress of one attack: the keyspace index ranges [start, stop) still to test.
+    `signature` identifies the index -> candidate order when it is not fixed (Markov model).
+    `update` writes to disk at most every `interval` seconds unless forced.
+    """
+
+    def __init__(self, store, method, stored_hash, salt, total, remaining, signature=None):
+        self.store = store
+        self.method = method
+        self.stored_hash = stored_hash
+        self.salt = salt
+        self.total = total
+        self.remaining = remaining
+        self.signature = signature
+        self._last_save = time.time()
+
+    @property
+    def completed(self):
+        return self.total - sum(stop - start for start, stop in self.remaining)
+
+    def update(self, remaining, force=False):
+        self.remaining = remaining
+        now = time.time()
+        if force or now - self._last_save >= self.store.interval:
+            self._last_save = now
+            self.store.save(self)
+
+    def clear(self):
+        self.store.clear(self.method, self.stored_hash, self.salt)
+
+
+class AttackCheckpointStore:
+    """JSON checkpoint files, one per (method, target hash, salt)"""
+
+    def __init__(self, directory='checkpoints', interval=10):
+        self.directory = directory
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, method, stored_hash, salt):
+        key = hashlib.sha256(f"{method}|{stored_hash}|{salt}".encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f"{method}_{key}.json")
+
+    def open(self, method, stored_hash, salt, total, signature=None):
+        """
+        Load the checkpoint for this target, or start a fresh one covering [0, total).
+        A checkpoint saved with another `signature` is discarded: its index ranges point into a
+        different candidate order (e.g. Markov model trained on another corpus).
+        """
+        remaining = [[0, total]]
+        path = self._path(method, stored_hash, salt)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("signature") != signature:
+                print(f"[!] Discarding checkpoint {path}: candidate order changed "
+                      f"({data.get('signature')} -> {signature})")
+            elif data.get("total") == total and data.get("stored_hash") == stored_hash:
+                remaining = [[int(a), int(b)] for a, b in data["remaining"]]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[!] Ignoring corrupt checkpoint {path}: {e}")
+        return AttackCheckpoint(self, method, stored_hash, salt, total, remaining, signature)
+
+    def save(self, checkpoint):
+        path = self._path(checkpoint.method, checkpoint.stored_hash, checkpoint.salt)
+        data = {
+            "method": checkpoint.method,
+            "stored_hash": checkpoint.stored_hash,
+            "salt": checkpoint.salt,
+            "total": checkpoint.total,
+            "signature": checkpoint.signature,
+            "completed": checkpoint.completed,
+            "remaining": checkpoint.remaining,
+            "updated_at": time.time()
+        }
+        # Écriture atomique : un crash pendant l'écriture ne corrompt pas l'ancien checkpoint
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def clear(self, method, stored_hash, salt):
+        try:
+            os.remove(self._path(method, stored_hash, salt))
+        except FileNotFoundError:
+            pass
+
+    def list(self):
+        """Summaries of every saved checkpoint"""
+        checkpoints = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            checkpoints.append({k: data.get(k) for k in ("method", "stored_hash", "total", "completed", "updated_at")})
+        return checkpoints
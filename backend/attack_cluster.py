@@ -0,0 +1,420 @@
+"""
+Distributed password attack: one coordinator, any number of workers, over TCP.
+
+The coordinator splits a keyspace into leases of `lease_size` indexes. Workers claim a lease,
+test it in verify_many batches, report progress (which also renews the lease) and return hits.
+A lease that is not renewed within `lease_timeout` seconds is considered lost (dead worker):
+its untested part goes back to the front of the queue for the next claim.
+
+Protocol: one JSON object per line, each request answered by one reply.
+    {"op": "claim", "worker": id}                          -> lease | wait | done
+    {"op": "progress", "lease_id", "next", "tested"}       -> ok | stop
+    {"op": "result", "lease_id", "tested", "password"}     -> ok | stop
+
+    python -m backend.attack_cluster coordinator --method bruteforce --hash <digest> --salt <hex> --port 5055
+    python -m backend.attack_cluster worker --host 10.0.0.1 --port 5055 --processes 8
+"""
+import json
+import multiprocessing
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fonction_de_hachage_lent import verify_many
+from backend import password_hashing
+from backend.password_attack_service import BATCH_SIZE, PasswordAttackService
+from backend.password_keyspace import KEYSPACES, KEYSPACE_6
+
+CLUSTER_METHODS = ('dictionary3', 'dictionary5', 'bruteforce', 'bruteforce_markov')
+LEASE_SIZE = 16384
+LEASE_TIMEOUT = 30
+PROGRESS_INTERVAL = 1.0
+
+
+def candidate_function(method):
+    """index -> candidate function of a cluster method (the same on the coordinator and every worker)"""
+    if method == 'bruteforce_markov':
+        return PasswordAttackService()._brute_force_order('markov')[1]
+    return KEYSPACES[method].__getitem__
+
+
+def _keyspace_size(method):
+    return len(KEYSPACE_6) if method == 'bruteforce_markov' else len(KEYSPACES[method])
+
+
+class _Lease:
+    def __init__(self, lease_id, start, stop, worker, timeout):
+        self.id = lease_id
+        self.start = start
+        self.stop = stop
+        self.next = start
+        self.worker = worker
+        self.timeout = timeout
+        self.deadline = time.time() + timeout
+
+    def renew(self):
+        self.deadline = time.time() + self.timeout
+
+
+class AttackCoordinator:
+    """
+    Hands out keyspace leases to TCP workers and collects their progress and hits.
+    Only the lease holder's reports are counted; a worker whose lease expired is told to stop.
+    """
+
+    def __init__(self, method, stored_hash, salt=None, lease_size=LEASE_SIZE, lease_timeout=LEASE_TIMEOUT,
+                 token=None, checkpoint_store=None, ranges=None):
+        if method not in CLUSTER_METHODS:
+            raise ValueError(f"Unknown cluster attack method: {method}")
+        record = password_hashing.decode(stored_hash, salt)
+        if record.algorithm != 'slow':
+            raise ValueError(f"Offline attacks only support the slow hash, not {record.algorithm}")
+
+        self.method = method
+        self.stored_hash, self.salt, self.iterations = record.digest, record.salt_hex, record.params['i']
+        self.lease_size = lease_size
+        self.lease_timeout = lease_timeout
+        self.token = token
+        self.total = _keyspace_size(method)
+
+        self.checkpoint = None
+        if ranges is None and checkpoint_store is not None:
+            self.checkpoint = checkpoint_store.open(method, self.stored_hash, self.salt, self.total,
+                                                    PasswordAttackService().keyspace_signature(method))
+            ranges = self.checkpoint.remaining
+        self.resumed_from = self.checkpoint.completed if self.checkpoint else 0
+        self._pending = deque([list(r) for r in (ranges or [[0, self.total]]) if r[0] < r[1]])
+
+        self._leases = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.password = None
+        self.attempts = 0
+        self.reassigned = 0
+        self.workers = {}
+        self.started_at = None
+        self.finished_at = None
+        self._server = None
+        if not self._pending:
+            self._finish()
+
+    # --- état (appelé avec self._lock) ---
+
+    def _remaining(self):
+        remaining = [[lease.next, lease.stop] for lease in self._leases.values() if lease.next < lease.stop]
+        return sorted(remaining) + [list(r) for r in self._pending]
+
+    def _expire(self):
+        now = time.time()
+        for lease in [lease for lease in self._leases.values() if lease.deadline < now]:
+            del self._leases[lease.id]
+            if lease.next < lease.stop:
+                self._pending.appendleft([lease.next, lease.stop])
+            self.reassigned += 1
+            print(f"[!] Lease {lease.id} of worker {lease.worker} expired; "
+                  f"{lease.stop - lease.next:,} candidates requeued")
+
+    def _finish(self):
+        self.finished_at = time.time()
+        if self.checkpoint:
+            if self.password is None and self._remaining():
+                self.checkpoint.update(self._remaining(), force=True)
+            else:
+                self.checkpoint.clear()
+        self._done.set()
+
+    def _worker_stats(self, worker):
+        return self.workers.setdefault(worker, {"worker": worker, "attempts": 0, "leases": 0})
+
+    # --- requêtes des workers ---
+
+    def claim(self, worker):
+        with self._lock:
+            if self._done.is_set():
+                return {"op": "done"}
+            self._expire()
+            if not self._pending:
+                # Plus rien à distribuer : attendre la fin (ou l'expiration) des leases en cours
+                return {"op": "wait", "retry": 1}
+
+            start, stop = self._pending[0]
+            lease_stop = min(start + self.lease_size, stop)
+            if lease_stop == stop:
+                self._pending.popleft()
+            else:
+                self._pending[0][0] = lease_stop
+
+            lease = _Lease(secrets.token_hex(8), start, lease_stop, worker, self.lease_timeout)
+            self._leases[lease.id] = lease
+            self._worker_stats(worker)["leases"] += 1
+            return {
+                "op": "lease",
+                "lease_id": lease.id,
+                "start": start,
+                "stop": lease_stop,
+                "method": self.method,
+                "stored_hash": self.stored_hash,
+                "salt": self.salt,
+                "iterations": self.iterations,
+                "progress_interval": min(PROGRESS_INTERVAL, self.lease_timeout / 3)
+            }
+
+    def progress(self, lease_id, next_index, tested):
+        with self._lock:
+            lease = self._leases.get(lease_id)
+            if lease is None or self._done.is_set():
+                return {"op": "stop"}
+            lease.next = max(lease.next, min(next_index, lease.stop))
+            lease.renew()
+            self.attempts += tested
+            self._worker_stats(lease.worker)["attempts"] += tested
+            if self.checkpoint:
+                self.checkpoint.update(self._remaining())
+            return {"op": "ok"}
+
+    def result(self, lease_id, tested, password):
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if password is not None and self.password is None:
+                # Un hit est valable même venant d'un lease expiré
+                self.password = password
+                self.attempts += tested
+                if lease:
+                    self._worker_stats(lease.worker)["attempts"] += tested
+                self._finish()
+                return {"op": "ok"}
+            if lease is None or self._done.is_set():
+                return {"op": "stop"}
+
+            lease.next = lease.stop
+            self.attempts += tested
+            self._worker_stats(lease.worker)["attempts"] += tested
+            if not self._pending and not self._leases:
+                self._finish()
+            elif self.checkpoint:
+                self.checkpoint.update(self._remaining())
+            return {"op": "ok"}
+
+    def handle(self, message):
+        if self.token is not None and not secrets.compare_digest(str(message.get("token", "")), self.token):
+            return {"op": "error", "message": "Invalid token"}
+        op = message.get("op")
+        if op == "claim":
+            return self.claim(str(message.get("worker")))
+        if op == "progress":
+            return self.progress(message["lease_id"], int(message["next"]), int(message["tested"]))
+        if op == "result":
+            return self.result(message["lease_id"], int(message["tested"]), message.get("password"))
+        return {"op": "error", "message": f"Unknown op: {op}"}
+
+    # --- serveur ---
+
+    def serve(self, host='127.0.0.1', port=0):
+        """Start the TCP server in a background thread; returns the (host, port) actually bound"""
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        reply = coordinator.handle(json.loads(line))
+                    except (ValueError, KeyError, TypeError) as e:
+                        reply = {"op": "error", "message": str(e)}
+                    self.wfile.write((json.dumps(reply) + "\n").encode())
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.started_at = time.time()
+        threading.Thread(target=self._server.serve_forever, name="attack-coordinator", daemon=True).start()
+        threading.Thread(target=self._watch_leases, name="attack-lease-watch", daemon=True).start()
+        print(f"[*] Coordinator for {self.method} listening on {self._server.server_address}, "
+              f"{sum(b - a for a, b in self._pending):,} candidates in leases of {self.lease_size:,}")
+        return self._server.server_address
+
+    def _watch_leases(self):
+        # Les leases expirés sont aussi remis en file quand aucun worker ne réclame de travail
+        while not self._done.wait(1):
+            with self._lock:
+                self._expire()
+
+    def wait(self, timeout=None):
+        """Block until the password is found or the keyspace is exhausted; returns the result or None"""
+        if not self._done.wait(timeout):
+            return None
+        return self.snapshot()
+
+    def shutdown(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def snapshot(self):
+        with self._lock:
+            end = self.finished_at or time.time()
+            elapsed = end - (self.started_at or end)
+            result = {
+                "success": self.password is not None,
+                "attempts": self.resumed_from + self.attempts,
+                "duration": elapsed,
+                "rate": self.attempts / elapsed if elapsed > 0 else 0,
+                "method": f"{self.method}_distributed",
+                "finished": self._done.is_set(),
+                "leases_in_flight": len(self._leases),
+                "leases_reassigned": self.reassigned,
+                "workers": sorted(self.workers.values(), key=lambda w: w["worker"])
+            }
+            if self.password is not None:
+                result["password"] = self.password
+            if self.resumed_from:
+                result["resumed_from"] = self.resumed_from
+            return result
+
+
+def run_worker(host, port, worker_id=None, token=None, connect_retries=10):
+    """
+    Claim and test leases until the coordinator says done (or goes away).
+    Returns the number of candidates tested.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    for attempt in range(connect_retries):
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except OSError:
+            if attempt == connect_retries - 1:
+                raise
+            time.sleep(1)
+
+    stream = sock.makefile('rw', encoding='utf-8')
+    candidate_functions = {}
+    total_tested = 0
+
+    def call(message):
+        if token is not None:
+            message["token"] = token
+        stream.write(json.dumps(message) + "\n")
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            raise ConnectionError("Coordinator closed the connection")
+        return json.loads(line)
+
+    try:
+        while True:
+            reply = call({"op": "claim", "worker": worker_id})
+            if reply["op"] == "wait":
+                time.sleep(reply.get("retry", 1))
+                continue
+            if reply["op"] != "lease":
+                if reply["op"] == "error":
+                    print(f"[!] Coordinator error: {reply['message']}")
+                break
+
+            method = reply["method"]
+            if method not in candidate_functions:
+                candidate_functions[method] = candidate_function(method)
+            candidate_at = candidate_functions[method]
+            lease_id, stop = reply["lease_id"], reply["stop"]
+
+            tested = unreported = 0
+            password = None
+            last_report = time.time()
+            stopped = False
+            for batch_start in range(reply["start"], stop, BATCH_SIZE):
+                batch = [candidate_at(i) for i in range(batch_start, min(batch_start + BATCH_SIZE, stop))]
+                matches = verify_many(reply["stored_hash"], batch, reply["salt"], iterations=reply["iterations"])
+                if True in matches:
+                    hit = matches.index(True)
+                    password = batch[hit]
+                    unreported += hit + 1
+                    tested += hit + 1
+                    break
+                tested += len(batch)
+                unreported += len(batch)
+                if time.time() - last_report >= reply["progress_interval"]:
+                    if call({"op": "progress", "lease_id": lease_id, "next": batch_start + len(batch),
+                             "tested": unreported})["op"] == "stop":
+                        stopped = True
+                        break
+                    unreported = 0
+                    last_report = time.time()
+
+            total_tested += tested
+            if stopped:
+                continue
+            call({"op": "result", "lease_id": lease_id, "tested": unreported, "password": password})
+    except (ConnectionError, OSError):
+        pass  # coordinateur arrêté : plus rien à faire
+    finally:
+        sock.close()
+    return total_tested
+
+
+def _worker_process(args):
+    host, port, worker_id, token = args
+    return run_worker(host, port, worker_id, token)
+
+
+def run_workers(host, port, processes=None, token=None):
+    """Run `processes` workers on this machine (one per core by default)"""
+    processes = processes or os.cpu_count() or 1
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    with multiprocessing.Pool(processes) as pool:
+        return sum(pool.map(_worker_process, [(host, port, f"{prefix}-{i}", token) for i in range(processes)]))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Distributed password attack over TCP")
+    sub = parser.add_subparsers(dest='cmd')
+
+    p_coord = sub.add_parser('coordinator', help='Split a keyspace into leases and serve them to workers')
+    p_coord.add_argument('--method', choices=CLUSTER_METHODS, default='bruteforce')
+    p_coord.add_argument('--hash', required=True, help='Stored hash (versioned, or legacy digest with --salt)')
+    p_coord.add_argument('--salt')
+    p_coord.add_argument('--host', default='127.0.0.1')
+    p_coord.add_argument('--port', type=int, default=5055)
+    p_coord.add_argument('--lease-size', type=int, default=LEASE_SIZE)
+    p_coord.add_argument('--lease-timeout', type=float, default=LEASE_TIMEOUT)
+    p_coord.add_argument('--token', default=os.getenv('ATTACK_CLUSTER_TOKEN'))
+    p_coord.add_argument('--checkpoint-dir', help='Resume from / save to this checkpoint directory')
+
+    p_worker = sub.add_parser('worker', help='Claim leases from a coordinator')
+    p_worker.add_argument('--host', default='127.0.0.1')
+    p_worker.add_argument('--port', type=int, default=5055)
+    p_worker.add_argument('--processes', type=int, default=None)
+    p_worker.add_argument('--token', default=os.getenv('ATTACK_CLUSTER_TOKEN'))
+
+    args = parser.parse_args()
+    if args.cmd == 'coordinator':
+        store = None
+        if args.checkpoint_dir:
+            from backend.attack_checkpoint import AttackCheckpointStore
+            store = AttackCheckpointStore(args.checkpoint_dir)
+        coordinator = AttackCoordinator(args.method, args.hash, args.salt, lease_size=args.lease_size,
+                                        lease_timeout=args.lease_timeout, token=args.token,
+                                        checkpoint_store=store)
+        coordinator.serve(args.host, args.port)
+        try:
+            result = coordinator.wait()
+        except KeyboardInterrupt:
+            with coordinator._lock:
+                coordinator._finish()
+            result = coordinator.snapshot()
+        # Laisser aux workers le temps de recevoir "done"
+        time.sleep(2)
+        coordinator.shutdown()
+        print(json.dumps(result, indent=2))
+    elif args.cmd == 'worker':
+        tested = run_workers(args.host, args.port, args.processes, args.token)
+        print(f"[*] Worker finished: {tested:,} candidates tested")
+    else:
+        parser.print_help()
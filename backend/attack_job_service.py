@@ -0,0 +1,151 @@
+import threading
+import time
+import uuid
+
+
+class AttackJob:
+    """State of one background attack, updated by the attack's progress callback"""
+
+    # Minimum delay between two progress notifications sent to waiting clients
+    NOTIFY_INTERVAL = 0.5
+
+    def __init__(self, username, method, total):
+        self.id = uuid.uuid4().hex
+        self.username = username
+        self.method = method
+        self.total = total
+        self.status = 'running'
+        self.attempts = 0
+        # Tentatives reprises d'un checkpoint (ou d'un résultat en cache), pas faites par ce job
+        self.resumed_from = 0
+        self.current_candidate = None
+        self.result = None
+        self.error = None
+        self.plan = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.stop_event = threading.Event()
+        self.version = 0
+        self._last_notify = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status != 'running'
+
+    def report(self, attempts, candidate, resumed=0):
+        """
+        Progress callback passed to PasswordAttackService.run; `resumed` is the number of
+        attempts just taken over from a checkpoint, left out of the rate
+        """
+        with self._cond:
+            self.attempts = attempts
+            self.resumed_from += resumed
+            self.current_candidate = candidate
+            now = time.time()
+            if now - self._last_notify >= self.NOTIFY_INTERVAL:
+                self._last_notify = now
+                self.version += 1
+                self._cond.notify_all()
+
+    def finish(self, status, result=None, error=None):
+        with self._cond:
+            self.status = status
+            self.result = result
+            self.error = error
+            if result:
+                self.attempts = result.get("attempts", self.attempts)
+            self.finished_at = time.time()
+            self.version += 1
+            self._cond.notify_all()
+
+    def wait_for_update(self, version, timeout=15):
+        """Block until the job changes past `version` (or timeout); returns the new version"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def snapshot(self):
+        with self._cond:
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at
+            rate = (self.attempts - self.resumed_from) / elapsed if elapsed > 0 else 0
+            remaining = max(self.total - self.attempts, 0)
+            eta = remaining / rate if rate > 0 and not self.finished else None
+            return {
+                "job_id": self.id,
+                "username": self.username,
+                "method": self.method,
+                "status": self.status,
+                "attempts": self.attempts,
+                "resumed_from": self.resumed_from,
+                "total": self.total,
+                "progress": (self.attempts / self.total * 100) if self.total else 0,
+                "rate": rate,
+                "eta_seconds": eta,
+                "elapsed": elapsed,
+                "current_candidate": self.current_candidate,
+                "result": self.result,
+                "error": self.error,
+                "plan": self.plan.to_dict() if self.plan else None,
+                "version": self.version
+            }
+
+
+class AttackJobManager:
+    """Runs password attacks in background threads and keeps their state by job ID"""
+
+    def __init__(self, attack_service, max_finished_jobs=100):
+        self.attack_service = attack_service
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, username, method, stored_hash, salt, workers=None):
+        if method not in self.attack_service.METHODS:
+            raise ValueError(f"Unknown attack method: {method}")
+
+        job = AttackJob(username, method, self.attack_service.keyspace_size(method))
+        if method == 'smart':
+            # Plan calculé avant le lancement : renvoyé au client avec le job
+            job.plan = self.attack_service.plan_attack(stored_hash, salt, workers)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+
+        thread = threading.Thread(target=self._run, args=(job, stored_hash, salt, workers),
+                                  name=f"attack-{job.id[:8]}", daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job, stored_hash, salt, workers):
+        try:
+            result = self.attack_service.run(job.method, stored_hash, salt, job.username,
+                                             progress=job.report, stop_event=job.stop_event,
+                                             workers=workers, plan=job.plan)
+            if result.get("cancelled"):
+                status = 'cancelled'
+            else:
+                status = 'found' if result["success"] else 'not_found'
+            job.finish(status, result=result)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            job.finish('error', error=str(e))
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.stop_event.set()
+        return job
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished_jobs"""
+        finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.finished_at)
+        for job in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self._jobs[job.id]
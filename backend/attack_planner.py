@@ -0,0 +1,110 @@
+import os
+import time
+
+from fonction_de_hachage_lent import verify_many
+from backend.candidate_pipeline import CandidateDedup, CandidatePipeline
+from backend.password_keyspace import KEYSPACES
+
+# Probabilité a priori que le mot de passe cible soit dans chaque étape (hypothèses ajustables :
+# les trois formats à parts égales, une partie des mots de 6 caractères étant des mots courants mutés)
+STAGE_PRIORS = {
+    'dictionary3': 0.3,
+    'dictionary5': 0.3,
+    'dictionary_rules': 0.1,
+    'bruteforce': 0.3,
+}
+BENCHMARK_ITERATIONS = 1000
+BENCHMARK_SECONDS = 0.5
+
+
+class AttackPlan:
+    """Ordered attack stages with their expected and worst-case durations"""
+
+    def __init__(self, steps, iterations, workers, hash_rate):
+        self.steps = steps
+        self.iterations = iterations
+        self.workers = workers
+        self.hash_rate = hash_rate
+
+        # Temps attendu jusqu'au succès : le mot de passe est dans l'étape i avec la probabilité p_i,
+        # à une position uniforme (t_i / 2 en moyenne), après avoir épuisé les étapes précédentes
+        elapsed = 0
+        self.expected_seconds = 0
+        for step in steps:
+            step["starts_after"] = elapsed
+            self.expected_seconds += step["probability"] * (elapsed + step["worst_seconds"] / 2)
+            elapsed += step["worst_seconds"]
+        self.worst_seconds = elapsed
+
+    def to_dict(self):
+        return {
+            "steps": self.steps,
+            "iterations": self.iterations,
+            "workers": self.workers,
+            "hash_rate": self.hash_rate,
+            "expected_seconds": self.expected_seconds,
+            "worst_seconds": self.worst_seconds
+        }
+
+
+class AttackPlanner:
+    """
+    Orders smart attack stages to minimize the expected time-to-crack on this machine.
+
+    The hash rate is measured once (benchmark()), then scaled to each target's iteration count.
+    Stages are sorted by probability / duration, highest first (Smith's rule), which minimizes the
+    expected time to reach the stage holding the password. The brute force stage runs on all workers.
+    """
+
+    def __init__(self, attack_service, priors=None):
+        self.attack_service = attack_service
+        self.priors = dict(priors or STAGE_PRIORS)
+        self.hash_rate = None  # hachages/s d'un cœur à BENCHMARK_ITERATIONS itérations
+        self._rules_size = None
+
+    def benchmark(self, seconds=BENCHMARK_SECONDS):
+        """Measure the single-core batch hash rate; returns hashes/sec at BENCHMARK_ITERATIONS"""
+        batch = [KEYSPACES['bruteforce'][i] for i in range(256)]
+        salt = '00' * 16
+        hashed = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            verify_many('00000000', batch, salt, iterations=BENCHMARK_ITERATIONS)
+            hashed += len(batch)
+        self.hash_rate = hashed / (time.perf_counter() - start)
+        print(f"[*] Attack planner: {self.hash_rate:,.0f} hashes/s per core at {BENCHMARK_ITERATIONS} iterations")
+        return self.hash_rate
+
+    def rate(self, iterations):
+        """Single-core candidates/sec for targets hashed with `iterations`"""
+        if self.hash_rate is None:
+            self.benchmark()
+        return self.hash_rate * BENCHMARK_ITERATIONS / iterations
+
+    def stage_size(self, method):
+        if method == 'dictionary_rules':
+            if self._rules_size is None:
+                words = self.attack_service.load_wordlist(self.attack_service.rules_wordlist_path)
+                self._rules_size = sum(1 for _ in CandidatePipeline(words, dedup=CandidateDedup(capacity=100_000)))
+            return self._rules_size
+        return len(KEYSPACES[method])
+
+    def plan(self, iterations, workers=None):
+        workers = workers or os.cpu_count() or 1
+        rate = self.rate(iterations)
+        steps = []
+        for stage, probability in self.priors.items():
+            candidates = self.stage_size(stage)
+            method, stage_workers = stage, 1
+            if stage == 'bruteforce' and workers > 1:
+                method, stage_workers = 'bruteforce_parallel', workers
+            steps.append({
+                "method": method,
+                "candidates": candidates,
+                "workers": stage_workers,
+                "probability": probability,
+                "worst_seconds": candidates / (rate * stage_workers)
+            })
+        steps.sort(key=lambda s: s["probability"] / s["worst_seconds"] if s["worst_seconds"] else float('inf'),
+                   reverse=True)
+        return AttackPlan(steps, iterations, workers, rate)
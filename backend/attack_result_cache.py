@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+import time
+
+
+class AttackResultCache:
+    """
+    Persistent attack results (SQLite):
+    - solved:    (hash, salt, iterations) -> password
+    - exhausted: (hash, salt, iterations, keyspace) searched entirely without a match
+    """
+
+    def __init__(self, path='attack_results.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS solved (
+                    stored_hash TEXT NOT NULL,
+                    salt TEXT NOT NULL,
+                    iterations INTEGER NOT NULL,
+                    password TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    solved_at REAL NOT NULL,
+                    PRIMARY KEY (stored_hash, salt, iterations)
+                )''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS exhausted (
+                    stored_hash TEXT NOT NULL,
+                    salt TEXT NOT NULL,
+                    iterations INTEGER NOT NULL,
+                    keyspace TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    exhausted_at REAL NOT NULL,
+                    PRIMARY KEY (stored_hash, salt, iterations, keyspace)
+                )''')
+
+    def get_solved(self, stored_hash, salt, iterations):
+        """Returns {"password", "method", "solved_at"} or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT password, method, solved_at FROM solved WHERE stored_hash = ? AND salt = ? AND iterations = ?',
+                (stored_hash, salt, iterations)).fetchone()
+        if row is None:
+            return None
+        return {"password": row[0], "method": row[1], "solved_at": row[2]}
+
+    def record_solved(self, stored_hash, salt, iterations, password, method):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO solved VALUES (?, ?, ?, ?, ?, ?)',
+                (stored_hash, salt, iterations, password, method, time.time()))
+
+    def is_exhausted(self, stored_hash, salt, iterations, keyspace):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM exhausted WHERE stored_hash = ? AND salt = ? AND iterations = ? AND keyspace = ?',
+                (stored_hash, salt, iterations, keyspace)).fetchone()
+        return row is not None
+
+    def record_exhausted(self, stored_hash, salt, iterations, keyspace, attempts):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO exhausted VALUES (?, ?, ?, ?, ?, ?)',
+                (stored_hash, salt, iterations, keyspace, attempts, time.time()))
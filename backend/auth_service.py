@@ -1,6 +1,7 @@
-from backend.database import get_supabase_client
+from backend.database import get_repository
 from backend.password_validator import PasswordValidator
-from fonction_de_hachage_lent import slow_hash, verify_password
+from backend.user_cache import UserCache
+from backend import password_hashing
 from datetime import datetime, timedelta, timezone
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -9,6 +10,15 @@ LOCK_DURATION = timedelta(minutes=10)  # durée du blocage
 MAX_FAILED = 3
 HASH_ITERATIONS = 10000
 
+# Politique de hachage des nouveaux mots de passe (les anciens sont re-hachés à la connexion)
+HASH_ALGORITHM = os.getenv('HASH_ALGORITHM', 'slow')
+HASH_PARAMS = os.getenv('HASH_PARAMS')  # ex. "i=10000" ou "n=16384,p=1,r=8"
+HASH_TARGET_MS = os.getenv('HASH_TARGET_MS')  # si défini, calibre le coût au démarrage
+
+# Cache des lignes `users` (0 pour désactiver)
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '1024'))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '30'))
+
 def _utc_now():
     return datetime.now(timezone.utc)
 
@@ -23,70 +33,119 @@ def _parse_iso_to_dt(s):
     except:
         return None
 
+def _hash_policy():
+    if HASH_PARAMS:
+        return password_hashing.parse_params(HASH_PARAMS)
+    if HASH_TARGET_MS:
+        params = password_hashing.calibrate(HASH_ALGORITHM, float(HASH_TARGET_MS) / 1000)
+        print(f"[*] Calibrated {HASH_ALGORITHM} for ~{HASH_TARGET_MS} ms: {params}")
+        return params
+    if HASH_ALGORITHM == 'slow':
+        return {'i': HASH_ITERATIONS}
+    return dict(password_hashing.ALGORITHMS[HASH_ALGORITHM].default_params)
+
+
 class AuthService:
-    def __init__(self):
-        self.supabase = get_supabase_client()
+    def __init__(self, hash_pool=None, user_cache=None, repository=None):
+        self.users = (repository or get_repository()).users
+        self.hash_algorithm = HASH_ALGORITHM
+        self.hash_params = _hash_policy()
+        # Pool de processus pour le hachage (None = calcul dans le thread de la requête)
+        self.hash_pool = hash_pool
+        if user_cache is None and USER_CACHE_SIZE > 0:
+            user_cache = UserCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+        self.user_cache = user_cache
+
+    def get_user(self, username):
+        '''Full user row by username (cached), or None.'''
+        if self.user_cache:
+            user = self.user_cache.get(username)
+            if user is not None:
+                return user
+        user = self.users.get_by_username(username)
+        if user and self.user_cache:
+            self.user_cache.put(user)
+        return user
+
+    def _update_user(self, user_id, update):
+        # Écriture en base puis dans le cache (write-through)
+        self.users.update(user_id, update)
+        if self.user_cache:
+            self.user_cache.update(user_id, update)
+
+    def _register_failed_login(self, user):
+        '''Increments failed_attempts atomically (locking the account at MAX_FAILED); returns the new count.'''
+        state = self.users.register_failed_login(user["id"], MAX_FAILED, int(LOCK_DURATION.total_seconds()))
+        if self.user_cache:
+            self.user_cache.update(user["id"], state)
+        return state["failed_attempts"]
+
+    def cache_stats(self):
+        return self.user_cache.stats() if self.user_cache else {"enabled": False}
+
+    def _hash_password(self, password):
+        if self.hash_pool:
+            return self.hash_pool.hash_password(password, self.hash_algorithm, self.hash_params)
+        return password_hashing.hash_password(password, self.hash_algorithm, self.hash_params)
+
+    def _verify_password(self, stored_hash, password, salt_hex):
+        if self.hash_pool:
+            return self.hash_pool.verify(stored_hash, password, salt_hex)
+        return password_hashing.verify(stored_hash, password, salt_hex)
 
     def sign_up(self, username, password):
         ok, _ = PasswordValidator.validate_password(password)
         if not ok:
             return {"success": False, "message": "Invalid password format"}
 
-        if self.supabase.table('users').select('id').eq('username', username).execute().data:
+        if self.get_user(username):
             return {"success": False, "message": "User already exists"}
 
-        password_hash, salt = slow_hash(password, iterations=HASH_ITERATIONS)
-        r = self.supabase.table('users').insert({
+        password_hash, salt = self._hash_password(password)
+        u = self.users.create({
             "username": username,
             "password_hash": password_hash,
             "password_salt": salt,
             "failed_attempts": 0,
             "locked_until": None
-        }).execute()
-        if r.data:
-            u = r.data[0]
+        })
+        if u:
+            if self.user_cache:
+                self.user_cache.put(u)
             return {"success": True, "message": "Sign up successful", "user": {"id": u["id"], "username": u["username"]}}
         return {"success": False, "message": "Failed to create user"}
 
     def get_all_users(self):
         '''Retrieves all users\' public information (id, username).'''
         try:
-            result = self.supabase.table('users').select('id, username').execute()
-            
-            return result.data if result.data else [] 
-            
+            return self.users.list_public()
         except Exception as e:
             print(f"Error fetching all users: {str(e)}")
             return []
 
     def sign_in(self, username, password):
-        r = self.supabase.table('users').select('*').eq('username', username).execute()
-        if not r.data:
+        user = self.get_user(username)
+        if not user:
             return {"success": False, "message": "Nom d\'utilisateur ou mot de passe incorrect."}
 
-        user = r.data[0]
         locked_until = _parse_iso_to_dt(user.get("locked_until"))
         if locked_until and _utc_now() < locked_until:
             mins = int((locked_until - _utc_now()).total_seconds() // 60) + 1
             return {"success": False, "message": f"Compte verrouillé. Réessayez dans ~{mins} minute(s)."}
 
-        ok = verify_password(
-            stored_hash_hex=user["password_hash"],
-            password=password,
-            salt_hex=user["password_salt"],
-            iterations=HASH_ITERATIONS
-        )
+        ok = self._verify_password(user["password_hash"], password, user["password_salt"])
 
         if ok:
-            self.supabase.table("users").update({"failed_attempts": 0, "locked_until": None}).eq("id", user["id"]).execute()
+            update = {"failed_attempts": 0, "locked_until": None}
+            # Re-hachage transparent si le hash stocké est legacy ou avec des paramètres dépassés
+            if password_hashing.needs_rehash(user["password_hash"], self.hash_algorithm, self.hash_params,
+                                             user["password_salt"]):
+                update["password_hash"], update["password_salt"] = self._hash_password(password)
+            self._update_user(user["id"], update)
             return {"success": True, "message": "Connexion réussie", "user": {"id": user["id"], "username": user["username"]}}
 
-        # mauvais mot de passe -> incrément
-        fails = (user.get("failed_attempts") or 0) + 1
-        update = {"failed_attempts": fails}
-        if fails >= MAX_FAILED:
-            update["locked_until"] = _to_iso_z(_utc_now() + LOCK_DURATION)
-        self.supabase.table("users").update(update).eq("id", user["id"]).execute()
+        # mauvais mot de passe -> incrément atomique en base
+        fails = self._register_failed_login(user)
 
         if fails >= MAX_FAILED:
             return {"success": False, "message": f"Compte verrouillé après {MAX_FAILED} échecs. Attendez {int(LOCK_DURATION.total_seconds()/60)} min."}
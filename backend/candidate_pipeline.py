@@ -0,0 +1,145 @@
+import hashlib
+import itertools
+import math
+
+from backend.password_validator import PasswordValidator
+
+# Substitutions "leet" limitées aux caractères autorisés par les formats de mot de passe
+LEET_SUBSTITUTIONS = {'a': '4', 'e': '3', 'i': '1', 'o': '0', 's': '5', 't': '7', 'g': '9', 'b': '8'}
+DIGIT_SUFFIXES = [str(d) for d in range(10)] + [f"{d:02d}" for d in range(100)] + ['123', '1234']
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over str candidates: no false negatives, false positives at about
+    `error_rate` once `capacity` items were added. Bit positions come from one blake2b digest
+    (double hashing), so a lookup costs a single hash call.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=1e-6):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item):
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item):
+        """Add an item; returns True if it was (probably) already present"""
+        present = True
+        for p in self._positions(item):
+            mask = 1 << (p & 7)
+            if not self._bits[p >> 3] & mask:
+                present = False
+                self._bits[p >> 3] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    @property
+    def size_bytes(self):
+        return len(self._bits)
+
+
+class CandidateDedup:
+    """
+    Candidates already tried during one attack, shared by all its phases.
+    With remember=False (last phase), candidates are only checked, not added.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=1e-6):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.remember = True
+        self.skipped = 0
+
+    def is_new(self, candidate):
+        seen = self.bloom.add(candidate) if self.remember else candidate in self.bloom
+        if seen:
+            self.skipped += 1
+        return not seen
+
+    def fresh(self, candidates):
+        """Positions of the candidates of a batch not tried yet"""
+        return [i for i, candidate in enumerate(candidates) if self.is_new(candidate)]
+
+    def stats(self):
+        return {
+            "skipped": self.skipped,
+            "remembered": self.bloom.count,
+            "capacity": self.bloom.capacity,
+            "error_rate": self.bloom.error_rate,
+            "size_bytes": self.bloom.size_bytes
+        }
+
+
+def mutate_case(word):
+    yield word.capitalize()
+    yield word.upper()
+    yield word.swapcase()
+
+
+def mutate_digit_suffix(word):
+    for suffix in DIGIT_SUFFIXES:
+        yield word + suffix
+
+
+def mutate_leet(word):
+    """Every combination of leet substitutions of the word's substitutable letters"""
+    options = [(c, LEET_SUBSTITUTIONS[c.lower()]) if c.lower() in LEET_SUBSTITUTIONS else (c,) for c in word]
+    for combination in itertools.islice(itertools.product(*options), 1, 256):
+        yield ''.join(combination)
+
+
+MUTATION_RULES = {
+    'case': mutate_case,
+    'digits': mutate_digit_suffix,
+    'leet': mutate_leet,
+}
+DEFAULT_RULES = ('case', 'digits', 'leet')
+
+
+class CandidatePipeline:
+    """
+    Streams wordlist words followed by their mutations, keeping only candidates that are valid
+    passwords (anything else cannot be a stored password) and that `dedup` has not seen yet.
+    Pass the attack's CandidateDedup to also skip candidates tried by earlier phases.
+    """
+
+    def __init__(self, words, rules=DEFAULT_RULES, dedup=None):
+        unknown = [rule for rule in rules if rule not in MUTATION_RULES]
+        if unknown:
+            raise ValueError(f"Unknown mutation rules: {unknown}")
+        self.words = words
+        self.rules = [MUTATION_RULES[rule] for rule in rules]
+        self.dedup = dedup or CandidateDedup()
+        self.generated = 0
+        self.invalid = 0
+
+    def _variants(self, word):
+        yield word
+        for rule in self.rules:
+            yield from rule(word)
+
+    def __iter__(self):
+        for word in self.words:
+            if isinstance(word, bytes):
+                word = word.decode('utf-8', errors='ignore')
+            for candidate in self._variants(word.strip()):
+                self.generated += 1
+                if not PasswordValidator.validate_password(candidate)[0]:
+                    self.invalid += 1
+                    continue
+                if self.dedup.is_new(candidate):
+                    yield candidate
+
+    def stats(self):
+        return {"generated": self.generated, "invalid": self.invalid}
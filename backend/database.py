@@ -1,14 +1,41 @@
 import os
-from supabase import create_client, Client
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
-supabase_url = os.getenv("VITE_SUPABASE_URL")
-supabase_key = os.getenv("VITE_SUPABASE_SUPABASE_ANON_KEY")
+# Stockage : "supabase" (par défaut) ou "sqlite" (base locale construite depuis database_migration.sql)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "local.db")
+
+_lock = threading.Lock()
+_supabase = None
+_repository = None
 
-# Create Supabase client (simple version without custom options)
-supabase: Client = create_client(supabase_url, supabase_key)
 
 def get_supabase_client():
-    return supabase
+    """Supabase client, created on first use (importing this module needs no network or credentials)"""
+    global _supabase
+    with _lock:
+        if _supabase is None:
+            from supabase import create_client
+            _supabase = create_client(os.getenv("VITE_SUPABASE_URL"), os.getenv("VITE_SUPABASE_SUPABASE_ANON_KEY"))
+        return _supabase
+
+
+def get_repository():
+    """Storage backend selected by STORAGE_BACKEND, created on first use"""
+    global _repository
+    if _repository is None:
+        if STORAGE_BACKEND == "sqlite":
+            from backend.sqlite_repository import SQLiteRepository
+            repository = SQLiteRepository(SQLITE_PATH)
+        elif STORAGE_BACKEND == "supabase":
+            from backend.repository import SupabaseRepository
+            repository = SupabaseRepository(get_supabase_client())
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND} (expected supabase or sqlite)")
+        with _lock:
+            if _repository is None:
+                _repository = repository
+    return _repository
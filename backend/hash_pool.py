@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from backend import password_hashing
+
+
+class HashPoolBusy(Exception):
+    """The pool is at capacity (or the hash timed out); the client should retry later"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class HashPool:
+    """
+    Runs CPU-bound password hashing in worker processes, off the Flask request threads.
+    At most `max_pending` hashes are queued or running; beyond that, submissions fail fast
+    with HashPoolBusy instead of waiting. If a worker dies (e.g. OOM-killed), the broken
+    executor is replaced and the affected hashes fail with HashPoolBusy.
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=10.0, latency_window=1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._restarts = 0
+        self._latencies = deque(maxlen=latency_window)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashPoolBusy("Serveur occupé, réessayez dans un instant.")
+
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+        def done(_future):
+            # La place n'est libérée qu'à la fin réelle du calcul, même après un timeout
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._latencies.append(time.perf_counter() - submitted_at)
+            self._slots.release()
+
+        executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException as e:
+            # Rien n'a été soumis : le callback ne viendra jamais, on rend la place ici
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            if isinstance(e, BrokenProcessPool):
+                self._restart(executor)
+                raise HashPoolBusy("Serveur occupé, réessayez dans un instant.") from e
+            raise
+        future.add_done_callback(done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            raise HashPoolBusy("Le calcul du hash a expiré, réessayez.", retry_after=int(self.timeout) or 1)
+        except BrokenProcessPool as e:
+            # Un worker est mort pendant le calcul : le callback a déjà libéré la place
+            self._restart(executor)
+            raise HashPoolBusy("Serveur occupé, réessayez dans un instant.") from e
+
+    def _restart(self, broken):
+        """Replace a broken executor (once, even if several requests see it broken)"""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def verify(self, stored_hash, password, salt_hex=None):
+        return self._submit(password_hashing.verify, stored_hash, password, salt_hex)
+
+    def hash_password(self, password, algorithm, params):
+        return self._submit(password_hashing.hash_password, password, algorithm, params)
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            in_flight = self._in_flight
+            stats = {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": in_flight,
+                "queue_depth": max(in_flight - self.workers, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "restarts": self._restarts,
+            }
+
+        def percentile(q):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+        stats["latency_ms"] = {
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": latencies[-1] * 1000 if latencies else None,
+        }
+        return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
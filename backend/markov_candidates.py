@@ -0,0 +1,184 @@
+import hashlib
+import os
+
+
+class MarkovModel:
+    """
+    Character-level Markov model (first character + previous->next transitions)
+    reduced to rank tables: for each context, the charset sorted by decreasing probability.
+    """
+
+    def __init__(self, charset, first_order, next_order):
+        self.charset = charset
+        self.first_order = first_order  # str : caractères par probabilité décroissante en 1re position
+        self.next_order = next_order    # dict prev -> str : caractères suivants par probabilité décroissante
+        self.first_rank = {c: i for i, c in enumerate(first_order)}
+        self.next_rank = {prev: {c: i for i, c in enumerate(order)} for prev, order in next_order.items()}
+
+    def signature(self):
+        """Short digest of the rank tables: two models with the same signature enumerate in the same order"""
+        tables = self.charset + '|' + self.first_order + '|' + '|'.join(
+            f"{prev}{self.next_order[prev]}" for prev in sorted(self.next_order))
+        return hashlib.sha256(tables.encode()).hexdigest()[:16]
+
+    @classmethod
+    def train(cls, words, charset):
+        """Count first characters and transitions; characters outside the charset break the chain"""
+        allowed = frozenset(charset)
+        first = {c: 0 for c in charset}
+        transitions = {p: {c: 0 for c in charset} for p in charset}
+
+        for word in words:
+            prev = None
+            for char in word:
+                if char not in allowed:
+                    prev = None
+                    continue
+                if prev is None:
+                    first[char] += 1
+                else:
+                    transitions[prev][char] += 1
+                prev = char
+
+        position = {c: i for i, c in enumerate(charset)}
+
+        def order(counts):
+            # Probabilité décroissante ; à égalité, ordre du charset (les caractères jamais vus restent couverts)
+            return ''.join(sorted(charset, key=lambda c: (-counts[c], position[c])))
+
+        return cls(charset, order(first), {p: order(transitions[p]) for p in charset})
+
+    @classmethod
+    def from_corpus(cls, path, charset):
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            words = [line.strip() for line in f if line.strip()]
+        return cls.train(words, charset)
+
+
+class MarkovKeyspace:
+    """
+    Every `length`-character string over the model's charset, most likely candidates first.
+
+    A candidate is described by its rank tuple (rank of each character in the table of its context).
+    Candidates are enumerated by layers: layer L holds the tuples whose largest rank is exactly L,
+    so all candidates made only of top-ranked characters come first. Index <-> candidate is a
+    bijection computed in O(length), which keeps index-range sharding and checkpoints working.
+    """
+
+    def __init__(self, model, length=6):
+        self.model = model
+        self.length = length
+        self.base = len(model.charset)
+
+    def __len__(self):
+        return self.base ** self.length
+
+    def signature(self):
+        """Identifies the index -> candidate order (rank tables + length), for checkpoints"""
+        return f"markov{self.length}-{self.model.signature()}"
+
+    def layer_bounds(self):
+        """First index of each layer, plus the keyspace size: [0, 1, 2**n, 3**n, ..., base**n]"""
+        return [layer ** self.length for layer in range(self.base + 1)]
+
+    def _layer(self, index):
+        """Smallest L with (L + 1) ** length > index"""
+        layer = int(round(index ** (1 / self.length))) if index else 0
+        while layer ** self.length > index:
+            layer -= 1
+        while (layer + 1) ** self.length <= index:
+            layer += 1
+        return layer
+
+    def _ranks(self, index):
+        n = self.length
+        layer = self._layer(index)
+        offset = index - layer ** n
+
+        # Position k de la première occurrence du rang L : rangs < L avant, rang <= L après
+        for k in range(n):
+            block = layer ** k * (layer + 1) ** (n - 1 - k)
+            if offset < block:
+                break
+            offset -= block
+
+        after = []
+        for _ in range(n - 1 - k):
+            offset, digit = divmod(offset, layer + 1)
+            after.append(digit)
+        before = []
+        for _ in range(k):
+            offset, digit = divmod(offset, layer)
+            before.append(digit)
+        return list(reversed(before)) + [layer] + list(reversed(after))
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError("keyspace index out of range")
+        chars = []
+        prev = None
+        for rank in self._ranks(index):
+            char = self.model.first_order[rank] if prev is None else self.model.next_order[prev][rank]
+            chars.append(char)
+            prev = char
+        return ''.join(chars)
+
+    def index_of(self, candidate):
+        """Inverse of __getitem__"""
+        n = self.length
+        ranks = []
+        prev = None
+        for char in candidate:
+            ranks.append(self.model.first_rank[char] if prev is None else self.model.next_rank[prev][char])
+            prev = char
+
+        layer = max(ranks)
+        k = ranks.index(layer)
+        index = layer ** n
+        for j in range(k):
+            index += layer ** j * (layer + 1) ** (n - 1 - j)
+
+        offset = 0
+        for rank in ranks[:k]:
+            offset = offset * layer + rank
+        for rank in ranks[k + 1:]:
+            offset = offset * (layer + 1) + rank
+        return index + offset
+
+
+def median_rank(index_of, passwords):
+    """Median number of attempts needed to crack each password with the given ordering"""
+    ranks = sorted(index_of(p) + 1 for p in passwords)
+    if not ranks:
+        return None
+    middle = len(ranks) // 2
+    return ranks[middle] if len(ranks) % 2 else (ranks[middle - 1] + ranks[middle]) / 2
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from backend.password_attack_service import CHAR_SET, PASSWORD_LENGTH, candidate_to_index
+
+    parser = argparse.ArgumentParser(description="Markov-ordered candidates for the 6-char brute force")
+    parser.add_argument('--corpus', default='Attacks/markov_corpus.txt')
+    parser.add_argument('--test', help='Test passwords (default: every 5th corpus line, held out)')
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8', errors='ignore') as f:
+        corpus = [line.strip() for line in f if line.strip()]
+    if args.test:
+        with open(args.test, 'r', encoding='utf-8', errors='ignore') as f:
+            test = [line.strip() for line in f if line.strip()]
+        train = corpus
+    else:
+        test = corpus[::5]
+        train = [w for i, w in enumerate(corpus) if i % 5]
+
+    test = [p for p in test if len(p) == PASSWORD_LENGTH and all(c in CHAR_SET for c in p)]
+    keyspace = MarkovKeyspace(MarkovModel.train(train, CHAR_SET), PASSWORD_LENGTH)
+    print(f"Test passwords: {len(test)}")
+    print(f"Median attempts (lexicographic): {median_rank(candidate_to_index, test):,.0f}")
+    print(f"Median attempts (Markov):        {median_rank(keyspace.index_of, test):,.0f}")
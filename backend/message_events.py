@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+
+
+class MessageEvents:
+    """
+    In-process pub/sub of new messages, fed by MessageService.send_message and
+    StegoService.hide_message_and_save*. Events carry only the message key and its two users:
+    subscribers fetch the rows themselves with the `since` cursor of the message endpoints.
+
+    Every event gets a sequence number; the last `history` events are kept so a client
+    reconnecting with Last-Event-ID gets the ones it missed. One process only: with several
+    workers, a message sent through another process is seen at the next `since` sync.
+    """
+
+    def __init__(self, history=1000):
+        self._events = deque(maxlen=history)
+        self._cond = threading.Condition()
+        self.seq = 0
+        self.published = 0
+
+    def publish(self, message_type, row):
+        event = {
+            "message_type": message_type,
+            "id": row.get("id"),
+            "sender_id": row.get("sender_id"),
+            "receiver_id": row.get("receiver_id"),
+            "date_created": row.get("date_created")
+        }
+        with self._cond:
+            self.seq += 1
+            self.published += 1
+            self._events.append((self.seq, event))
+            self._cond.notify_all()
+
+    def wait_for_events(self, user_id, seq, timeout=15):
+        """
+        Block until an event newer than `seq` is published (or timeout); returns
+        (new seq, events of `user_id` after `seq`), the list being empty for other users' events
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > seq, timeout=timeout)
+            events = [(n, event) for n, event in self._events
+                      if n > seq and user_id in (event["sender_id"], event["receiver_id"])]
+            return self.seq, events
+
+    def stats(self):
+        with self._cond:
+            return {"seq": self.seq, "published": self.published, "buffered": len(self._events)}
@@ -1,11 +1,13 @@
-from backend.database import get_supabase_client
-from datetime import datetime
+from backend.database import get_repository
+from backend.repository import utc_timestamp
 
 
 class MessageService:
-    def __init__(self, crypto_service=None):
-        self.supabase = get_supabase_client()
+    def __init__(self, crypto_service=None, repository=None, events=None):
+        self.messages = (repository or get_repository()).messages
         self.crypto_service = crypto_service
+        # MessageEvents optionnel : notifie les destinataires connectés (flux SSE)
+        self.events = events
 
     def send_message(self, sender_id, receiver_id, encrypted, algo_name, algorithm_key=None):
         try:
@@ -14,16 +16,18 @@ class MessageService:
                 "receiver_id": receiver_id,
                 "encrypted": encrypted,
                 "algo_name": algo_name,
-                "date_created": datetime.now().isoformat()
+                "date_created": utc_timestamp()
             }
 
             if algorithm_key:
                 message_data["algorithm_key"] = algorithm_key
 
-            result = self.supabase.table('messages').insert(message_data).execute()
+            row = self.messages.insert(message_data)
 
-            if result.data and len(result.data) > 0:
-                return {"success": True, "message": "Message sent successfully", "data": result.data[0]}
+            if row:
+                if self.events:
+                    self.events.publish('crypto', row)
+                return {"success": True, "message": "Message sent successfully", "data": row}
             else:
                 return {"success": False, "message": "Failed to send message"}
 
@@ -31,26 +35,16 @@ class MessageService:
             print(f"Error sending message: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}"}
 
-    def get_conversation(self, user1_id, user2_id):
+    def get_conversation(self, user1_id, user2_id, limit=None, before=None, after=None):
+        '''
+        Whole conversation (oldest first), or with `limit` one keyset page older than `before`
+        (newest first) or newer than `after` (oldest first)
+        '''
         try:
-            # Query messages between two users with proper joins
-            result = self.supabase.table('messages').select(
-                '''
-                id,
-                date_created,
-                encrypted,
-                algo_name,
-                algorithm_key,
-                sender_id,
-                receiver_id,
-                sender:users!messages_sender_id_fkey(id, username),
-                receiver:users!messages_receiver_id_fkey(id, username)
-                '''
-            ).or_(
-                f'and(sender_id.eq.{user1_id},receiver_id.eq.{user2_id}),and(sender_id.eq.{user2_id},receiver_id.eq.{user1_id})'
-            ).order('date_created', desc=False).execute()
-
-            messages = result.data if result.data else []
+            if limit:
+                messages = self.messages.conversation_page(user1_id, user2_id, limit, before, after)
+            else:
+                messages = self.messages.conversation(user1_id, user2_id)
             
             # Debug: Print to console
             print(f"Loading conversation between {user1_id} and {user2_id}")
@@ -61,63 +55,31 @@ class MessageService:
             print(f"Error loading conversation: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}", "messages": []}
 
-    def get_all_conversations(self, user_id):
+    def get_all_conversations(self, user_id, limit=None, before=None, after=None):
         try:
-            result = self.supabase.table('messages').select(
-                '''
-                id,
-                date_created,
-                encrypted,
-                algo_name,
-                algorithm_key,
-                sender_id,
-                receiver_id,
-                sender:users!messages_sender_id_fkey(id, username),
-                receiver:users!messages_receiver_id_fkey(id, username)
-                '''
-            ).or_(
-                f'sender_id.eq.{user_id},receiver_id.eq.{user_id}'
-            ).order('date_created', desc=False).execute()
-
-            return {"success": True, "messages": result.data if result.data else []}
+            if limit:
+                return {"success": True, "messages": self.messages.for_user_page(user_id, limit, before, after)}
+            return {"success": True, "messages": self.messages.for_user(user_id)}
         except Exception as e:
             print(f"Error getting all conversations: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}"}
 
-    def get_sent_messages(self, user_id):
+    def get_inbox_summary(self, user_id):
+        '''One summary per conversation (counts, last message), computed by the database'''
         try:
-            result = self.supabase.table('messages').select(
-                '''
-                id,
-                date_created,
-                encrypted,
-                algo_name,
-                algorithm_key,
-                sender_id,
-                receiver_id,
-                receiver:users!messages_receiver_id_fkey(username)
-                '''
-            ).eq('sender_id', user_id).order('date_created', desc=True).execute()
+            return {"success": True, "conversations": self.messages.inbox_summary(user_id)}
+        except Exception as e:
+            print(f"Error getting inbox summary: {str(e)}")
+            return {"success": False, "message": f"Error: {str(e)}"}
 
-            return {"success": True, "messages": result.data if result.data else []}
+    def get_sent_messages(self, user_id):
+        try:
+            return {"success": True, "messages": self.messages.sent(user_id)}
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
 
     def get_received_messages(self, user_id):
         try:
-            result = self.supabase.table('messages').select(
-                '''
-                id,
-                date_created,
-                encrypted,
-                algo_name,
-                algorithm_key,
-                sender_id,
-                receiver_id,
-                sender:users!messages_sender_id_fkey(username)
-                '''
-            ).eq('receiver_id', user_id).order('date_created', desc=True).execute()
-
-            return {"success": True, "messages": result.data if result.data else []}
+            return {"success": True, "messages": self.messages.received(user_id)}
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
\ No newline at end of file
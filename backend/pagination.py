@@ -0,0 +1,112 @@
+import base64
+import heapq
+import json
+from itertools import islice
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Clé de départ d'une table sans message : toute ligne est "après" elle
+SINCE_ORIGIN = ('1970-01-01T00:00:00.000000+00:00', 0)
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Page size from a query parameter, clamped to [1, MAX_PAGE_SIZE]"""
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def encode_cursor(keys):
+    """Opaque cursor from {message_type: [date_created, id]}"""
+    return base64.urlsafe_b64encode(json.dumps(keys, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """{message_type: (date_created, id)} from a cursor; raises ValueError if it is malformed"""
+    if not cursor:
+        return {}
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return {message_type: (str(key[0]), int(key[1])) for message_type, key in keys.items()}
+    except (ValueError, TypeError, AttributeError, IndexError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def message_key(message):
+    return message['date_created'], message['id']
+
+
+def _tagged(rows, message_type):
+    for row in rows:
+        row['message_type'] = message_type
+        yield row
+
+
+def merge_pages(pages, limit, keys=None):
+    """
+    Keyset pagination over several message tables at once.
+
+    `pages` maps a message type to up to limit + 1 rows of that table, newest first, all older
+    than keys[type]. Returns (messages, next_cursor): the `limit` newest rows overall, oldest
+    first, tagged with message_type, and a cursor holding each table's last returned key
+    (None when every table is exhausted). The pages are already ordered, so they are merged in
+    one linear pass instead of being sorted again.
+    """
+    keys = dict(keys or {})
+    merged = heapq.merge(*(_tagged(rows, message_type) for message_type, rows in pages.items()),
+                         key=message_key, reverse=True)
+    page = list(islice(merged, limit + 1))
+    has_more = len(page) > limit
+
+    page = page[:limit]
+    for message in page:
+        keys[message['message_type']] = message_key(message)
+
+    next_cursor = encode_cursor({t: list(k) for t, k in keys.items()}) if has_more else None
+    page.reverse()
+    return page, next_cursor
+
+
+def since_keys(keys, message_types):
+    """
+    `since` keys with a bound for every table: a table missing from the cursor starts from
+    SINCE_ORIGIN, so the repositories always get an `after` key and return rows oldest first
+    """
+    keys = dict(keys or {})
+    for message_type in message_types:
+        keys.setdefault(message_type, SINCE_ORIGIN)
+    return keys
+
+
+def latest_cursor(messages, message_types, keys=None):
+    """
+    Cursor for ?since=: each table's newest key among `messages` (or its key in `keys`).
+    A table with no row yet starts from the newest key overall: every row of it newer than the
+    messages already shown is then returned by the next sync. With no row at all (empty
+    conversation), every table starts from SINCE_ORIGIN.
+    """
+    keys = dict(keys or {})
+    for message in messages:
+        key = message_key(message)
+        if message['message_type'] not in keys or key > keys[message['message_type']]:
+            keys[message['message_type']] = key
+    start = (max(keys.values())[0], 0) if keys else SINCE_ORIGIN
+    for message_type in message_types:
+        keys.setdefault(message_type, start)
+    return encode_cursor({t: list(k) for t, k in keys.items()})
+
+
+def merge_since(pages, limit, keys=None):
+    """
+    Incremental sync: `pages` maps a message type to up to limit + 1 rows newer than keys[type],
+    oldest first. Returns (messages, latest_cursor, has_more): the `limit` oldest new rows,
+    tagged with message_type, the cursor to pass as `since` next time, and whether more new
+    rows remain (call again right away).
+    """
+    merged = heapq.merge(*(_tagged(rows, message_type) for message_type, rows in pages.items()),
+                         key=message_key)
+    page = list(islice(merged, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    return page, latest_cursor(page, pages, keys), has_more
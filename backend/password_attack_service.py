@@ -1,227 +1,630 @@
 import time
-import hashlib
 import os
-from itertools import product
-from fonction_de_hachage_lent import verify_password
+import multiprocessing
+from fonction_de_hachage_lent import verify_many
+from backend.wordlist_store import WordlistStore
+from backend import password_hashing
+from backend.markov_candidates import MarkovModel, MarkovKeyspace
+from backend.password_keyspace import KEYSPACES, KEYSPACE_3, KEYSPACE_5, KEYSPACE_6
+from backend.candidate_pipeline import CandidateDedup, CandidatePipeline, DEFAULT_RULES
+from backend.attack_planner import AttackPlanner
+
+# Format des mots de passe de 6 caractères, défini par PasswordValidator
+CHAR_SET = KEYSPACE_6.charset
+PASSWORD_LENGTH = KEYSPACE_6.length
+BATCH_SIZE = 256
+HASH_ITERATIONS = 10000
+
+# Keyspaces searched by each method (exhausted searches are cached per keyspace)
+METHOD_KEYSPACES = {
+    'dictionary': ('dictionary3', 'dictionary5'),
+    'dictionary3': ('dictionary3',),
+    'dictionary5': ('dictionary5',),
+    'dictionary_rules': ('dictionary_rules',),
+    'bruteforce': ('bruteforce',),
+    'bruteforce_parallel': ('bruteforce',),
+    'bruteforce_markov': ('bruteforce',),
+    'smart': ('dictionary3', 'dictionary5', 'dictionary_rules', 'bruteforce'),
+}
+
+# Signal d'arrêt et compteurs partagés entre les processus du pool (hérités via l'initializer)
+_found_event = None
+_shared_attempts = None
+_shared_next = None
+
+
+def index_to_candidate(index):
+    """Convert a 6-char keyspace index to its candidate (same order as itertools.product)."""
+    return KEYSPACE_6[index]
+
+
+def candidate_to_index(candidate):
+    """Inverse of index_to_candidate."""
+    return KEYSPACE_6.index_of(candidate)
+
+
+def _split_ranges(ranges, parts):
+    """Split the largest [start, stop) ranges in half until there are `parts` of them."""
+    ranges = [list(r) for r in ranges if r[0] < r[1]]
+    while 0 < len(ranges) < parts:
+        largest = max(range(len(ranges)), key=lambda i: ranges[i][1] - ranges[i][0])
+        start, stop = ranges[largest]
+        if stop - start < 2:
+            break
+        middle = (start + stop) // 2
+        ranges[largest:largest + 1] = [[start, middle], [middle, stop]]
+    return ranges
+
+
+def _stage_ranges(ranges, boundaries):
+    """Group [start, stop) ranges by the consecutive intervals of `boundaries`, in order."""
+    stages = []
+    for low, high in zip(boundaries, boundaries[1:]):
+        stage = [[max(start, low), min(stop, high)] for start, stop in ranges
+                 if max(start, low) < min(stop, high)]
+        if stage:
+            stages.append(stage)
+    return stages
+
+
+def _init_brute_force_worker(found_event, shared_attempts, shared_next):
+    global _found_event, _shared_attempts, _shared_next
+    _found_event = found_event
+    _shared_attempts = shared_attempts
+    _shared_next = shared_next
+
+
+def _brute_force_worker(args):
+    """Test every candidate in [start, stop) in batches until done or another worker succeeds."""
+    shard_id, start, stop, stored_hash, salt, iterations, candidate_at = args
+    start_time = time.time()
+    attempts = 0
+    password = None
+
+    for batch_start in range(start, stop, BATCH_SIZE):
+        if _found_event.is_set():
+            break
+        batch = [candidate_at(i) for i in range(batch_start, min(batch_start + BATCH_SIZE, stop))]
+        matches = verify_many(stored_hash, batch, salt, iterations=iterations)
+        hit = matches.index(True) if True in matches else None
+        tested = len(batch) if hit is None else hit + 1
+        attempts += tested
+        with _shared_attempts.get_lock():
+            _shared_attempts.value += tested
+        _shared_next[shard_id] = batch_start + tested
+        if hit is not None:
+            password = batch[hit]
+            _found_event.set()
+            break
+
+    elapsed = time.time() - start_time
+    return {
+        "worker": shard_id,
+        "start": start,
+        "stop": stop,
+        "attempts": attempts,
+        "duration": elapsed,
+        "rate": attempts / elapsed if elapsed > 0 else 0,
+        "password": password
+    }
 
 
 class PasswordAttackService:
-    def __init__(self, wordlist_path='wordlist.txt'):
+    METHODS = tuple(METHOD_KEYSPACES)
+
+    def __init__(self, wordlist_path='wordlist.txt', checkpoint_store=None, wordlist_store=None,
+                 result_cache=None):
         self.wordlist_path = wordlist_path
-        self.worldlist3_path = 'Attacks/worldlist3.txt'
-        self.worldlist5_path = 'Attacks/worldlist5.txt'
-    
+        self.checkpoint_store = checkpoint_store
+        self.result_cache = result_cache
+        self.wordlist_store = wordlist_store or WordlistStore()
+        self.markov_corpus_path = 'Attacks/markov_corpus.txt'
+        # Mots de base de l'attaque par règles de mutation
+        self.rules_wordlist_path = 'Attacks/markov_corpus.txt'
+        self.planner = AttackPlanner(self)
+        self._markov_keyspace = None
+
     def load_wordlist(self, filepath):
-        """Load wordlist from file"""
+        """
+        Load wordlist from file.
+        Returns the compiled, memory-mapped wordlist (a sequence of bytes words).
+        """
         if not os.path.exists(filepath):
             print(f"[!] Wordlist not found: {filepath}")
             return []
-        
+
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                words = [line.strip() for line in f if line.strip()]
-            print(f"[*] Loaded wordlist from: {filepath} ({len(words)} entries)")
-            return words
+            return self.wordlist_store.get(filepath)
         except Exception as e:
             print(f"[!] Error reading wordlist {filepath}: {e}")
             return []
-    
-    def dictionary_attack(self, stored_hash, salt, username):
+
+    def keyspace_size(self, method):
+        """Number of candidates a method will test (used for progress and ETA)"""
+        # Le flux de mutations n'a pas de taille connue à l'avance
+        return sum(len(KEYSPACES[keyspace]) for keyspace in METHOD_KEYSPACES.get(method, ()) if keyspace in KEYSPACES)
+
+    def plan_attack(self, stored_hash, salt=None, workers=None):
+        """Smart attack plan (stage order, expected and worst-case time) for this target"""
+        record = password_hashing.decode(stored_hash, salt)
+        return self.planner.plan(record.params.get('i', HASH_ITERATIONS), workers)
+
+    def run(self, method, stored_hash, salt, username, progress=None, stop_event=None, workers=None, dedup=None,
+            plan=None):
+        """
+        Dispatch an attack by method name, answering from the result cache when possible.
+        - stored_hash: versioned hash string, or legacy 8-hex digest (then `salt` is required)
+        - progress: optional callback(attempts, candidate, resumed=0), called after each batch; `resumed`
+          is set once to the attempts taken over from a checkpoint or a cached result
+        - stop_event: optional threading.Event; setting it cancels the attack
+        - dedup: optional CandidateDedup shared by several runs, to skip candidates already tried
+        - plan: optional AttackPlan for method 'smart' (see plan_attack)
+        """
+        if method not in METHOD_KEYSPACES:
+            raise ValueError(f"Unknown attack method: {method}")
+
+        record = password_hashing.decode(stored_hash, salt)
+        if record.algorithm != 'slow':
+            raise ValueError(f"Offline attacks only support the slow hash, not {record.algorithm}")
+        encoded_hash, encoded_salt = stored_hash, salt
+        stored_hash, salt, iterations = record.digest, record.salt_hex, record.params['i']
+
+        cached = self._cached_result(method, stored_hash, salt, iterations)
+        if cached is not None:
+            if progress:
+                progress(cached["attempts"], cached.get("password"), resumed=cached["attempts"])
+            return cached
+
+        if method == 'dictionary3':
+            result = self.dictionary3_attack(stored_hash, salt, username, progress, stop_event, iterations, dedup)
+        elif method == 'dictionary5':
+            result = self.dictionary5_attack(stored_hash, salt, username, progress, stop_event, iterations, dedup)
+        elif method == 'dictionary':
+            result = self.dictionary_attack(stored_hash, salt, username, progress, stop_event, iterations, dedup)
+        elif method == 'dictionary_rules':
+            result = self.dictionary_rules_attack(stored_hash, salt, username, progress, stop_event, iterations,
+                                                  dedup)
+        elif method == 'bruteforce':
+            result = self.brute_force_6char_attack(stored_hash, salt, username, progress=progress,
+                                                   stop_event=stop_event, iterations=iterations, dedup=dedup)
+        elif method == 'smart':
+            # Les étapes repassent par run() : leur transmettre le hash encodé (avec ses itérations)
+            result = self.smart_attack(encoded_hash, encoded_salt, username, progress, stop_event, workers, plan)
+        else:
+            order = 'markov' if method == 'bruteforce_markov' else 'lexicographic'
+            result = self.parallel_brute_force_6char_attack(stored_hash, salt, username, workers=workers,
+                                                            progress=progress, stop_event=stop_event,
+                                                            iterations=iterations, order=order)
+
+        self._record_result(method, stored_hash, salt, iterations, result)
+        return result
+
+    def _cached_result(self, method, stored_hash, salt, iterations):
+        """Known password for this hash, or a "not found" if every keyspace of the method was exhausted"""
+        if self.result_cache is None:
+            return None
+
+        solved = self.result_cache.get_solved(stored_hash, salt, iterations)
+        if solved is not None:
+            print(f"[+] Cached result: password already found with method {solved['method']}")
+            return {
+                "success": True,
+                "password": solved["password"],
+                "attempts": 0,
+                "duration": 0,
+                "method": method,
+                "cached": True,
+                "cached_method": solved["method"]
+            }
+
+        if all(self.result_cache.is_exhausted(stored_hash, salt, iterations, keyspace)
+               for keyspace in METHOD_KEYSPACES[method]):
+            print(f"[-] Cached result: keyspace of method {method} already exhausted for this hash")
+            return {
+                "success": False,
+                "attempts": 0,
+                "duration": 0,
+                "method": method,
+                "cached": True
+            }
+        return None
+
+    def _record_result(self, method, stored_hash, salt, iterations, result):
+        if self.result_cache is None or result.get("cached") or result.get("cancelled"):
+            return
+        if result["success"]:
+            self.result_cache.record_solved(stored_hash, salt, iterations, result["password"], result["method"])
+        else:
+            for keyspace in METHOD_KEYSPACES[method]:
+                self.result_cache.record_exhausted(stored_hash, salt, iterations, keyspace, result["attempts"])
+
+    def keyspace_signature(self, method):
+        """Signature of the candidate order of a checkpointed method (None when the order is fixed)"""
+        if method == 'bruteforce_markov':
+            self._brute_force_order('markov')
+            return self._markov_keyspace.signature()
+        return None
+
+    def _open_checkpoint(self, method, stored_hash, salt, total):
+        if self.checkpoint_store is None:
+            return None
+        checkpoint = self.checkpoint_store.open(method, stored_hash, salt, total, self.keyspace_signature(method))
+        if checkpoint.completed:
+            print(f"[*] Resuming from checkpoint: {checkpoint.completed:,}/{total:,} candidates already tested")
+        return checkpoint
+
+    def _scan(self, method, candidate_at, total, stored_hash, salt, progress=None, stop_event=None,
+              iterations=HASH_ITERATIONS, dedup=None):
+        """
+        Test keyspace indexes [0, total) in verify_many batches, resuming from the checkpoint if any.
+        candidate_at(index) returns the candidate at an index.
+        Candidates already seen by `dedup` are skipped without hashing (still counted as attempts).
+        Returns (hit index or None, attempts, cancelled, resumed_from)
+        """
+        checkpoint = self._open_checkpoint(method, stored_hash, salt, total)
+        remaining = checkpoint.remaining if checkpoint else [[0, total]]
+        attempts = resumed_from = checkpoint.completed if checkpoint else 0
+        if progress and resumed_from:
+            progress(attempts, None, resumed=resumed_from)
+
+        while remaining:
+            start, stop = remaining[0]
+            for batch_start in range(start, stop, BATCH_SIZE):
+                if stop_event is not None and stop_event.is_set():
+                    if checkpoint:
+                        checkpoint.update(remaining, force=True)
+                    return None, attempts, True, resumed_from
+
+                batch_stop = min(batch_start + BATCH_SIZE, stop)
+                indexes = range(batch_start, batch_stop)
+                batch = [candidate_at(i) for i in indexes]
+                if dedup is not None:
+                    fresh = dedup.fresh(batch)
+                    if len(fresh) < len(batch):
+                        indexes = [indexes[i] for i in fresh]
+                        batch = [batch[i] for i in fresh]
+                matches = verify_many(stored_hash, batch, salt, iterations=iterations) if batch else []
+                if True in matches:
+                    hit = indexes[matches.index(True)]
+                    attempts += hit - batch_start + 1
+                    if progress:
+                        progress(attempts, candidate_at(hit))
+                    if checkpoint:
+                        checkpoint.clear()
+                    return hit, attempts, False, resumed_from
+
+                attempts += batch_stop - batch_start
+                remaining[0] = [batch_stop, stop]
+                if checkpoint:
+                    checkpoint.update(remaining)
+                if progress:
+                    progress(attempts, candidate_at(batch_stop - 1))
+            remaining.pop(0)
+
+        if checkpoint:
+            checkpoint.clear()
+        return None, attempts, False, resumed_from
+
+    def _result(self, password, attempts, start_time, method, cancelled=False, resumed_from=0, dedup=None):
+        elapsed = time.time() - start_time
+        if password is not None:
+            print(f"\n[+] SUCCESS! Password found: '{password}' (Method: {method})")
+            print(f"[#] Attempts: {attempts}")
+            print(f"[#] Time taken: {elapsed:.4f} seconds")
+            result = {
+                "success": True,
+                "password": password,
+                "attempts": attempts,
+                "duration": elapsed,
+                "method": method
+            }
+        else:
+            if cancelled:
+                print(f"\n[!] CANCELLED after {attempts:,} attempts. (Method: {method})")
+            else:
+                print(f"\n[-] FAILED. Password not found after {attempts:,} attempts. (Method: {method})")
+            print(f"[#] Time taken: {elapsed:.4f} seconds")
+            result = {
+                "success": False,
+                "attempts": attempts,
+                "duration": elapsed,
+                "method": method
+            }
+            if cancelled:
+                result["cancelled"] = True
+
+        if resumed_from:
+            result["resumed_from"] = resumed_from
+        if dedup is not None:
+            result["dedup"] = dedup.stats()
+            print(f"[#] Dedup: {dedup.skipped:,} candidates skipped (already tried)")
+        return result
+
+    def dictionary_attack(self, stored_hash, salt, username, progress=None, stop_event=None,
+                          iterations=HASH_ITERATIONS, dedup=None):
         """
         Dictionary attack for 3 and 5 character passwords
         """
         print(f"\n[*] Starting Dictionary Attack for user: {username}")
         start_time = time.time()
-        attempts = 0
-        
-        # Try 3-character dictionary first
-        print("[*] Phase 1: Testing 3-character passwords...")
-        wordlist_3 = self.load_wordlist(self.worldlist3_path)
-        
-        for password in wordlist_3:
-            attempts += 1
-            if verify_password(stored_hash, password, salt, iterations=10000):
-                elapsed = time.time() - start_time
-                print(f"\n[+] SUCCESS! Password found: '{password}'")
-                print(f"[#] Attempts: {attempts}")
-                print(f"[#] Time taken: {elapsed:.4f} seconds")
-                return {
-                    "success": True,
-                    "password": password,
-                    "attempts": attempts,
-                    "duration": elapsed,
-                    "method": "dictionary_3char"
-                }
-            
-            if attempts % 100 == 0:
-                print(f"    Tested {attempts} passwords...", end='\r')
-        
-        # Try 5-digit dictionary
-        print("\n[*] Phase 2: Testing 5-digit passwords...")
-        wordlist_5 = self.load_wordlist(self.worldlist5_path)
-        
-        for password in wordlist_5:
-            attempts += 1
-            if verify_password(stored_hash, password, salt, iterations=10000):
-                elapsed = time.time() - start_time
-                print(f"\n[+] SUCCESS! Password found: '{password}'")
-                print(f"[#] Attempts: {attempts}")
-                print(f"[#] Time taken: {elapsed:.4f} seconds")
-                return {
-                    "success": True,
-                    "password": password,
-                    "attempts": attempts,
-                    "duration": elapsed,
-                    "method": "dictionary_5digit"
-                }
-            
-            if attempts % 1000 == 0:
-                print(f"    Tested {attempts} passwords...", end='\r')
-        
-        elapsed = time.time() - start_time
-        print(f"\n[-] FAILED. Password not found after {attempts} attempts.")
-        print(f"[#] Time taken: {elapsed:.4f} seconds")
-        
-        return {
-            "success": False,
-            "attempts": attempts,
-            "duration": elapsed,
-            "method": "dictionary"
-        }
-        
-    def dictionary3_attack(self, stored_hash, salt, username):
+
+        # 3-character keyspace first, then 5-digit keyspace, as one resumable keyspace
+        print("[*] Phase 1: Testing 3-character passwords, Phase 2: Testing 5-digit passwords...")
+        n3 = len(KEYSPACE_3)
+
+        def candidate_at(index):
+            return KEYSPACE_3[index] if index < n3 else KEYSPACE_5[index - n3]
+
+        hit, attempts, cancelled, resumed_from = self._scan(
+            'dictionary', candidate_at, n3 + len(KEYSPACE_5), stored_hash, salt, progress, stop_event, iterations,
+            dedup)
+
+        if hit is None:
+            return self._result(None, attempts, start_time, "dictionary", cancelled, resumed_from, dedup)
+        method = "dictionary_3char" if hit < n3 else "dictionary_5digit"
+        return self._result(candidate_at(hit), attempts, start_time, method, resumed_from=resumed_from, dedup=dedup)
+
+    def _keyspace_attack(self, method, stored_hash, salt, progress, stop_event, iterations, dedup=None):
+        """Scan the keyspace of an elementary method, generating candidates on the fly"""
+        start_time = time.time()
+        keyspace = KEYSPACES[method]
+        hit, attempts, cancelled, resumed_from = self._scan(
+            method, keyspace.__getitem__, len(keyspace), stored_hash, salt, progress, stop_event, iterations, dedup)
+        password = keyspace[hit] if hit is not None else None
+        return self._result(password, attempts, start_time, method, cancelled, resumed_from, dedup)
+
+    def dictionary3_attack(self, stored_hash, salt, username, progress=None, stop_event=None,
+                           iterations=HASH_ITERATIONS, dedup=None):
         """
         Dictionary attack for 3 character passwords only.
         """
         print(f"\n[*] Starting Dictionary 3-char Attack for user: {username}")
-        start_time = time.time()
-        attempts = 0
-        
-        WORDS = self.load_wordlist(self.worldlist3_path)
-        
-        for password in WORDS:
-            attempts += 1
-            # BUG 1 FIX: Swapped arguments
-            if verify_password(stored_hash, password, salt):
-                elapsed = time.time() - start_time
-                print(f"[+] SUCCESS! Password found: '{password}' (Method: dictionary3)")
-                print(f"[#] Attempts: {attempts}")
-                print(f"[#] Time taken: {elapsed:.4f} seconds")
-                return {
-                    "success": True,
-                    "password": password,
-                    "attempts": attempts,
-                    "duration": elapsed,
-                    "method": "dictionary3"
-                }
+        return self._keyspace_attack('dictionary3', stored_hash, salt, progress, stop_event, iterations, dedup)
 
-        elapsed = time.time() - start_time
-        print(f"\n[-] FAILED. Password not found after {attempts:,} attempts. (Method: dictionary3)")
-        return {
-            "success": False,
-            "attempts": attempts,
-            "duration": elapsed,
-            "method": "dictionary3"
-        }
-
-    def dictionary5_attack(self, stored_hash, salt, username):
+    def dictionary5_attack(self, stored_hash, salt, username, progress=None, stop_event=None,
+                           iterations=HASH_ITERATIONS, dedup=None):
         """
         Dictionary attack for 5 character passwords only.
         """
         print(f"\n[*] Starting Dictionary 5-char Attack for user: {username}")
+        return self._keyspace_attack('dictionary5', stored_hash, salt, progress, stop_event, iterations, dedup)
+
+    def dictionary_rules_attack(self, stored_hash, salt, username, progress=None, stop_event=None,
+                                iterations=HASH_ITERATIONS, dedup=None, rules=DEFAULT_RULES):
+        """
+        Dictionary attack with mutation rules (case toggles, digit suffixes, leet substitutions)
+        on the words of rules_wordlist_path. Candidates are streamed, so this attack is not checkpointed.
+        Candidates already seen by `dedup` are skipped without hashing (still counted as attempts).
+        """
+        print(f"\n[*] Starting Dictionary + Rules Attack for user: {username}")
+        print(f"[*] Rules: {', '.join(rules)}")
         start_time = time.time()
-        attempts = 0
-        
-        WORDS = self.load_wordlist(self.worldlist5_path)
-        
-        for password in WORDS:
-            attempts += 1
-            # BUG 1 FIX: Swapped arguments
-            if verify_password(stored_hash, password, salt):
-                elapsed = time.time() - start_time
-                print(f"[+] SUCCESS! Password found: '{password}' (Method: dictionary5)")
-                print(f"[#] Attempts: {attempts}")
-                print(f"[#] Time taken: {elapsed:.4f} seconds")
-                return {
-                    "success": True,
-                    "password": password,
-                    "attempts": attempts,
-                    "duration": elapsed,
-                    "method": "dictionary5"
-                }
+        dedup = dedup or CandidateDedup()
+        pipeline = CandidatePipeline(self.load_wordlist(self.rules_wordlist_path), rules, dedup)
+        candidates = iter(pipeline)
+        # Comme _scan : les candidats déjà essayés (ignorés par dedup) comptent comme des tentatives
+        skipped_before = dedup.skipped
+        hashed = attempts = 0
+        password = None
+        cancelled = False
+
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                cancelled = True
+                break
+            # (candidat, candidats ignorés jusqu'à lui) : le générateur est paresseux, dedup.skipped est à jour
+            batch = [(c, dedup.skipped - skipped_before) for _, c in zip(range(BATCH_SIZE), candidates)]
+            if not batch:
+                attempts = hashed + dedup.skipped - skipped_before
+                break
+            matches = verify_many(stored_hash, [c for c, _ in batch], salt, iterations=iterations)
+            if True in matches:
+                hit = matches.index(True)
+                password, skipped = batch[hit]
+                attempts = hashed + hit + 1 + skipped
+                if progress:
+                    progress(attempts, password)
+                break
+            hashed += len(batch)
+            attempts = hashed + batch[-1][1]
+            if progress:
+                progress(attempts, batch[-1][0])
+
+        result = self._result(password, attempts, start_time, "dictionary_rules", cancelled, dedup=dedup)
+        result["pipeline"] = pipeline.stats()
+        return result
+
+    def _brute_force_order(self, order):
+        """
+        (checkpoint name, index -> candidate function) of a 6-char enumeration order:
+        'lexicographic' (itertools.product order) or 'markov' (most likely candidates first)
+        """
+        if order == 'lexicographic':
+            return 'bruteforce', index_to_candidate
+        if order == 'markov':
+            if self._markov_keyspace is None:
+                model = MarkovModel.from_corpus(self.markov_corpus_path, CHAR_SET)
+                self._markov_keyspace = MarkovKeyspace(model, PASSWORD_LENGTH)
+            return 'bruteforce_markov', self._markov_keyspace.__getitem__
+        raise ValueError(f"Unknown brute force order: {order}")
 
-        elapsed = time.time() - start_time
-        print(f"\n[-] FAILED. Password not found after {attempts:,} attempts. (Method: dictionary5)")
-        return {
-            "success": False,
-            "attempts": attempts,
-            "duration": elapsed,
-            "method": "dictionary5"
-        }
-    
     # BUG 2 FIX: Renamed function
-    def brute_force_6char_attack(self, stored_hash, salt, username):
+    def brute_force_6char_attack(self, stored_hash, salt, username, workers=1, progress=None, stop_event=None,
+                                 iterations=HASH_ITERATIONS, order='lexicographic', dedup=None):
         """
         Brute force attack for 6-character passwords
         Uses the character set: a-z, A-Z, 0-9, +, *
+        workers != 1 delegates to the multi-process version (None = all cores, no dedup)
+        order='markov' tries the most likely candidates first (same keyspace, same coverage)
         """
+        if workers != 1:
+            return self.parallel_brute_force_6char_attack(stored_hash, salt, username, workers=workers,
+                                                          progress=progress, stop_event=stop_event,
+                                                          iterations=iterations, order=order)
+
         print(f"\n[*] Starting Brute Force Attack for user: {username}")
-        PASSWORD_LENGTH = 6
-        CHAR_SET = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789*+'
-        
+        total = len(KEYSPACE_6)
         print(f"[*] Character set: {CHAR_SET}")
         print(f"[*] Password length: {PASSWORD_LENGTH}")
-        print(f"[*] Total combinations: {len(CHAR_SET) ** PASSWORD_LENGTH:,}")
-        
+        print(f"[*] Order: {order}")
+        print(f"[*] Total combinations: {total:,}")
+
+        name, candidate_at = self._brute_force_order(order)
+        start_time = time.time()
+        hit, attempts, cancelled, resumed_from = self._scan(
+            name, candidate_at, total, stored_hash, salt, progress, stop_event, iterations, dedup)
+        if order == 'markov':
+            found_method = failed_method = "bruteforce_markov"
+        else:
+            found_method, failed_method = "bruteforce_6char", "bruteforce"
+        if hit is not None:
+            return self._result(candidate_at(hit), attempts, start_time, found_method, resumed_from=resumed_from,
+                                dedup=dedup)
+        return self._result(None, attempts, start_time, failed_method, cancelled, resumed_from, dedup)
+
+    def parallel_brute_force_6char_attack(self, stored_hash, salt, username, workers=None,
+                                          ranges=None, progress=None, stop_event=None,
+                                          iterations=HASH_ITERATIONS, order='lexicographic'):
+        """
+        Multi-process brute force for 6-character passwords.
+        The keyspace (or the given [start, stop) index ranges) is split into one shard per worker;
+        the first worker to find the password sets a shared event that stops the others.
+        With order='markov', each likelihood layer is split across all workers in turn, so the
+        whole pool works on the most likely candidates first.
+        Without explicit ranges, progress is checkpointed and shared with the sequential brute force.
+        """
+        workers = workers or os.cpu_count() or 1
+        total = len(KEYSPACE_6)
+        name, candidate_at = self._brute_force_order(order)
+        boundaries = self._markov_keyspace.layer_bounds() if order == 'markov' else [0, total]
+
+        checkpoint = None
+        if ranges is None:
+            checkpoint = self._open_checkpoint(name, stored_hash, salt, total)
+            ranges = checkpoint.remaining if checkpoint else [[0, total]]
+        resumed_from = checkpoint.completed if checkpoint else 0
+        if progress and resumed_from:
+            progress(resumed_from, None, resumed=resumed_from)
+
+        print(f"\n[*] Starting Parallel Brute Force Attack for user: {username}")
+        print(f"[*] Workers: {workers}")
+        print(f"[*] Order: {order}")
+        print(f"[*] Keyspace: {sum(b - a for a, b in ranges):,} of {total:,} combinations left")
+
+        stages = [_split_ranges(stage, workers) for stage in _stage_ranges(ranges, boundaries)]
+        stages = [stage for stage in stages if stage]
+        slots = max((len(stage) for stage in stages), default=1)
+
         start_time = time.time()
-        attempts = 0
-        
-        for combination in product(CHAR_SET, repeat=PASSWORD_LENGTH):
-            candidate = "".join(combination)
-            attempts += 1
-            
-            if verify_password(stored_hash, candidate, salt, iterations=10000):
-                elapsed = time.time() - start_time
-                print(f"\n[+] SUCCESS! Password found: '{candidate}'")
-                print(f"[#] Attempts: {attempts}")
-                print(f"[#] Time taken: {elapsed:.4f} seconds")
-                return {
-                    "success": True,
-                    "password": candidate,
-                    "attempts": attempts,
-                    "duration": elapsed,
-                    "method": "bruteforce_6char"
-                }
-            
-            # Update progress less frequently
-            if attempts % 10000 == 0:
-                elapsed = time.time() - start_time
-                rate = attempts / elapsed if elapsed > 0 else 0
-                print(f"    Attempting: {candidate} ({attempts:,} attempts, {rate:.0f} attempts/sec)", end='\r')
-        
+        found_event = multiprocessing.Event()
+        shared_attempts = multiprocessing.Value('q', 0)
+        shared_next = multiprocessing.Array('q', slots, lock=False)
+        cancelled = False
+        password = None
+        per_worker = {}
+        shard_ranges = []
+        stage_index = 0
+
+        def current_state():
+            remaining = [[shared_next[i], stop] for i, (_, stop) in enumerate(shard_ranges)
+                         if shared_next[i] < stop]
+            for later in stages[stage_index + 1:]:
+                remaining.extend([list(r) for r in later])
+            candidate = candidate_at(min(shared_next[0], total - 1)) if shard_ranges else None
+            return remaining, candidate
+
+        with multiprocessing.Pool(min(workers, slots), initializer=_init_brute_force_worker,
+                                  initargs=(found_event, shared_attempts, shared_next)) as pool:
+            for stage_index, shard_ranges in enumerate(stages):
+                for i, (start, _) in enumerate(shard_ranges):
+                    shared_next[i] = start
+                shards = [(shard_id, start, stop, stored_hash, salt, iterations, candidate_at)
+                          for shard_id, (start, stop) in enumerate(shard_ranges)]
+
+                pending = pool.map_async(_brute_force_worker, shards)
+                while not pending.ready():
+                    pending.wait(0.5)
+                    remaining, candidate = current_state()
+                    if checkpoint and not found_event.is_set():
+                        checkpoint.update(remaining)
+                    if progress:
+                        progress(resumed_from + shared_attempts.value, candidate)
+                    if stop_event is not None and stop_event.is_set() and not found_event.is_set():
+                        cancelled = True
+                        found_event.set()
+
+                for r in pending.get():
+                    stats = per_worker.setdefault(r["worker"], {"worker": r["worker"], "attempts": 0,
+                                                                "duration": 0, "shards": 0})
+                    stats["attempts"] += r["attempts"]
+                    stats["duration"] += r["duration"]
+                    stats["shards"] += 1
+                    password = password or r["password"]
+                if found_event.is_set():
+                    break
         elapsed = time.time() - start_time
-        print(f"\n[-] FAILED. Password not found after {attempts:,} attempts.")
-        print(f"[#] Time taken: {elapsed:.4f} seconds")
-        
-        return {
-            "success": False,
-            "attempts": attempts,
-            "duration": elapsed,
-            "method": "bruteforce"
-        }
-    
-    def smart_attack(self, stored_hash, salt, username):
-        """
-        Smart attack that tries dictionary first, then brute force
+
+        attempts = resumed_from + shared_attempts.value
+        for stats in per_worker.values():
+            stats["rate"] = stats["attempts"] / stats["duration"] if stats["duration"] > 0 else 0
+        per_worker = [per_worker[k] for k in sorted(per_worker)]
+        remaining, candidate = current_state()
+        if progress:
+            progress(attempts, password or candidate)
+        if checkpoint:
+            if cancelled and password is None:
+                checkpoint.update(remaining, force=True)
+            else:
+                checkpoint.clear()
+
+        method = "bruteforce_markov" if order == 'markov' else "bruteforce_parallel"
+        result = self._result(password, attempts, start_time, method,
+                              cancelled and password is None, resumed_from)
+        result["duration"] = elapsed
+        result["rate"] = (attempts - resumed_from) / elapsed if elapsed > 0 else 0
+        result["workers"] = per_worker
+        return result
+
+    def smart_attack(self, stored_hash, salt, username, progress=None, stop_event=None, workers=None, plan=None):
+        """
+        Smart attack: runs the stages (dictionary3, dictionary5, dictionary_rules, brute force) in the
+        order chosen by the cost-based planner, the brute force on all workers.
+        A Bloom filter shared by the stages skips candidates an earlier stage already hashed.
         """
         print(f"\n[*] Starting Smart Attack for user: {username}")
-        
-        # Try dictionary attack first (faster for 3 and 5 char passwords)
-        result = self.dictionary_attack(stored_hash, salt, username)
-        
-        if result["success"]:
-            return result
-        
-        # If dictionary fails, try brute force for 6-char passwords
-        print("\n[*] Dictionary attack failed. Trying brute force for 6-character passwords...")
-        return self.brute_force_6char_attack(stored_hash, salt, username)
\ No newline at end of file
+        plan = plan or self.plan_attack(stored_hash, salt, workers)
+        print(f"[*] Plan (expected {plan.expected_seconds:,.0f}s, worst case {plan.worst_seconds:,.0f}s):")
+        for step in plan.steps:
+            print(f"    {step['method']:<20} {step['candidates']:>14,} candidates  "
+                  f"p={step['probability']:.2f}  ~{step['worst_seconds']:,.0f}s")
+
+        dedup = CandidateDedup()
+        start_time = time.time()
+        offset = 0
+        stages = []
+        result = None
+        for step in plan.steps:
+            method = step["method"]
+            if method.startswith('bruteforce'):
+                # Dernière grosse étape : on consulte le filtre sans le remplir
+                dedup.remember = False
+
+            def stage_progress(attempts, candidate, resumed=0, offset=offset):
+                if progress:
+                    progress(offset + attempts, candidate, resumed=resumed)
+
+            result = self.run(method, stored_hash, salt, username, stage_progress, stop_event,
+                              workers=step["workers"], dedup=dedup)
+            offset += result["attempts"]
+            stages.append({k: result.get(k) for k in ("method", "success", "attempts", "duration", "cached")})
+            if result["success"] or result.get("cancelled"):
+                break
+            print(f"\n[*] {method} failed. Next stage...")
+
+        result = dict(result)
+        result["attempts"] = offset
+        result["duration"] = time.time() - start_time
+        result["plan"] = plan.to_dict()
+        result["stages"] = stages
+        result["dedup"] = dedup.stats()
+        return result
@@ -0,0 +1,174 @@
+import hashlib
+import secrets
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fonction_de_hachage_lent import _slow_hash_core, _to_bytes
+
+# Format stocké : $<algorithme>$<paramètres>$<salt hex>$<digest hex>
+#   ex. $slow$i=10000$9f...$1a2b3c4d   $pbkdf2-sha256$i=600000$...$...   $scrypt$n=16384,r=8,p=1$...$...
+# Un hash "legacy" (8 hex seuls, salt dans password_salt) est lu comme $slow$i=10000$.
+
+LEGACY_ITERATIONS = 10000
+SALT_BYTES = 16
+
+
+class SlowHashBackend:
+    name = 'slow'
+    cost_param = 'i'
+    default_params = {'i': 10000}
+
+    def digest(self, password, salt_bytes, params):
+        return _slow_hash_core(_to_bytes(password), salt_bytes, iterations=params['i'])
+
+
+class Pbkdf2Backend:
+    name = 'pbkdf2-sha256'
+    cost_param = 'i'
+    default_params = {'i': 600000}
+
+    def digest(self, password, salt_bytes, params):
+        return hashlib.pbkdf2_hmac('sha256', _to_bytes(password), salt_bytes, params['i']).hex()
+
+
+class ScryptBackend:
+    name = 'scrypt'
+    cost_param = 'n'
+    default_params = {'n': 16384, 'r': 8, 'p': 1}
+
+    def digest(self, password, salt_bytes, params):
+        n, r, p = params['n'], params['r'], params['p']
+        maxmem = 256 * n * r + (1 << 20)
+        return hashlib.scrypt(_to_bytes(password), salt=salt_bytes, n=n, r=r, p=p,
+                              maxmem=maxmem, dklen=32).hex()
+
+
+ALGORITHMS = {backend.name: backend for backend in (SlowHashBackend(), Pbkdf2Backend(), ScryptBackend())}
+
+
+class HashRecord:
+    def __init__(self, algorithm, params, salt_hex, digest, legacy=False):
+        self.algorithm = algorithm
+        self.params = params
+        self.salt_hex = salt_hex
+        self.digest = digest
+        self.legacy = legacy
+
+    def encode(self):
+        return encode(self.algorithm, self.params, self.salt_hex, self.digest)
+
+
+def _format_params(params):
+    return ','.join(f"{k}={v}" for k, v in sorted(params.items()))
+
+
+def parse_params(text):
+    params = {}
+    for item in text.split(','):
+        key, _, value = item.partition('=')
+        params[key] = int(value)
+    return params
+
+
+def encode(algorithm, params, salt_hex, digest):
+    return f"${algorithm}${_format_params(params)}${salt_hex}${digest}"
+
+
+def decode(stored_hash, salt_hex=None):
+    """
+    Parse a stored hash into a HashRecord.
+    salt_hex is only needed for legacy hashes (bare 8-hex digest with a separate salt column).
+    """
+    if not stored_hash.startswith('$'):
+        if salt_hex is None:
+            raise ValueError("Legacy hash requires the stored salt")
+        return HashRecord('slow', {'i': LEGACY_ITERATIONS}, salt_hex, stored_hash, legacy=True)
+
+    parts = stored_hash.split('$')
+    if len(parts) != 5:
+        raise ValueError("Malformed password hash")
+    _, algorithm, params, salt, digest = parts
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm: {algorithm}")
+    return HashRecord(algorithm, parse_params(params), salt, digest)
+
+
+def hash_password(password, algorithm='slow', params=None):
+    """Hash with a fresh server-side salt. Returns (encoded hash, salt hex)."""
+    backend = ALGORITHMS[algorithm]
+    params = dict(params or backend.default_params)
+    salt_bytes = secrets.token_bytes(SALT_BYTES)
+    digest = backend.digest(password, salt_bytes, params)
+    return encode(algorithm, params, salt_bytes.hex(), digest), salt_bytes.hex()
+
+
+def verify(stored_hash, password, salt_hex=None):
+    """Check a password against a stored hash (encoded or legacy). Constant-time comparison."""
+    record = decode(stored_hash, salt_hex)
+    computed = ALGORITHMS[record.algorithm].digest(password, bytes.fromhex(record.salt_hex), record.params)
+    return secrets.compare_digest(computed, record.digest)
+
+
+def needs_rehash(stored_hash, algorithm, params, salt_hex=None):
+    """True if the stored hash is legacy or uses another algorithm or cost than the current policy"""
+    record = decode(stored_hash, salt_hex)
+    return record.legacy or record.algorithm != algorithm or record.params != params
+
+
+def calibrate(algorithm, target_seconds=0.1, sample_password='aB3+x*'):
+    """
+    Pick the cost parameter giving about `target_seconds` per verification on this machine.
+    Linear costs (iterations) are extrapolated from a short measurement;
+    scrypt's n is doubled until the target is reached.
+    """
+    backend = ALGORITHMS[algorithm]
+    params = dict(backend.default_params)
+    salt_bytes = secrets.token_bytes(SALT_BYTES)
+
+    def measure(p):
+        start = time.perf_counter()
+        backend.digest(sample_password, salt_bytes, p)
+        return time.perf_counter() - start
+
+    if algorithm == 'scrypt':
+        params['n'] = 1024
+        while params['n'] < (1 << 20) and measure(params) < target_seconds:
+            params['n'] *= 2
+        return params
+
+    probe = 1000
+    while True:
+        params['i'] = probe
+        elapsed = measure(params)
+        if elapsed >= 0.02 or probe >= 10 ** 8:
+            break
+        probe *= 4
+    params['i'] = max(1, int(probe * target_seconds / elapsed))
+    return params
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Versioned password hashes and cost calibration")
+    sub = parser.add_subparsers(dest='cmd')
+
+    p_cal = sub.add_parser('calibrate', help='Find the cost giving a target verify latency')
+    p_cal.add_argument('--algorithm', choices=sorted(ALGORITHMS), default='slow')
+    p_cal.add_argument('--target-ms', type=float, default=100)
+
+    p_hash = sub.add_parser('hash', help='Hash a password in the versioned format')
+    p_hash.add_argument('password')
+    p_hash.add_argument('--algorithm', choices=sorted(ALGORITHMS), default='slow')
+
+    args = parser.parse_args()
+    if args.cmd == 'calibrate':
+        params = calibrate(args.algorithm, args.target_ms / 1000)
+        print(f"HASH_ALGORITHM={args.algorithm}")
+        print(f"HASH_PARAMS={_format_params(params)}")
+    elif args.cmd == 'hash':
+        print(hash_password(args.password, args.algorithm)[0])
+    else:
+        parser.print_help()
@@ -0,0 +1,109 @@
+from backend.password_validator import TYPE1, TYPE2, TYPE3
+
+
+class Keyspace:
+    """
+    Every password of a PasswordClass, in itertools.product order, generated on the fly.
+    Supports len(), keyspace[i] (index -> password), keyspace[a:b] (a KeyspaceRange),
+    index_of(password) and shards(n).
+    """
+
+    def __init__(self, password_class):
+        self.password_class = password_class
+        self.name = password_class.name
+        self.charset = password_class.charset
+        self.length = password_class.length
+        self.base = len(self.charset)
+        self._size = self.base ** self.length
+        self._rank = {c: i for i, c in enumerate(self.charset)}
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                raise ValueError("Keyspace slices must be contiguous")
+            return KeyspaceRange(self, start, max(start, stop))
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("keyspace index out of range")
+        chars = []
+        for _ in range(self.length):
+            index, digit = divmod(index, self.base)
+            chars.append(self.charset[digit])
+        return ''.join(reversed(chars))
+
+    def __iter__(self):
+        return iter(self[0:self._size])
+
+    def __contains__(self, password):
+        return self.password_class.matches(password)
+
+    def index_of(self, password):
+        """Inverse of keyspace[index]; ValueError if the password is not in this keyspace"""
+        if password not in self:
+            raise ValueError(f"{password!r} is not a {self.name} password")
+        index = 0
+        for char in password:
+            index = index * self.base + self._rank[char]
+        return index
+
+    def shards(self, parts):
+        """Split the keyspace into `parts` contiguous ranges of (almost) equal size"""
+        parts = max(1, min(parts, self._size))
+        bounds = [self._size * i // parts for i in range(parts + 1)]
+        return [KeyspaceRange(self, a, b) for a, b in zip(bounds, bounds[1:])]
+
+
+class KeyspaceRange:
+    """Indexes [start, stop) of a Keyspace, itself indexable and iterable"""
+
+    def __init__(self, keyspace, start, stop):
+        self.keyspace = keyspace
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("keyspace range index out of range")
+        return self.keyspace[self.start + index]
+
+    def __iter__(self):
+        # Incrémente les chiffres en place plutôt que de refaire les divisions à chaque mot de passe
+        if self.start >= self.stop:
+            return
+        keyspace = self.keyspace
+        charset, base = keyspace.charset, keyspace.base
+        digits = [keyspace._rank[c] for c in keyspace[self.start]]
+        for _ in range(self.start, self.stop):
+            yield ''.join(charset[d] for d in digits)
+            position = keyspace.length - 1
+            while position >= 0:
+                digits[position] += 1
+                if digits[position] < base:
+                    break
+                digits[position] = 0
+                position -= 1
+
+    def __repr__(self):
+        return f"KeyspaceRange({self.keyspace.name}, {self.start}, {self.stop})"
+
+
+KEYSPACE_3 = Keyspace(TYPE1)
+KEYSPACE_5 = Keyspace(TYPE2)
+KEYSPACE_6 = Keyspace(TYPE3)
+
+# Keyspace de chaque méthode d'attaque élémentaire
+KEYSPACES = {
+    'dictionary3': KEYSPACE_3,
+    'dictionary5': KEYSPACE_5,
+    'bruteforce': KEYSPACE_6,
+}
@@ -1,39 +1,44 @@
-import re
+class PasswordClass:
+    """One accepted password format: every character from `charset`, exactly `length` characters"""
+
+    def __init__(self, name, charset, length, description):
+        self.name = name
+        self.charset = charset
+        self.length = length
+        self.description = description
+        self.allowed = frozenset(charset)
+
+    def matches(self, password):
+        return len(password) == self.length and self.allowed.issuperset(password)
+
+
+# Les trois formats acceptés ; l'ordre des caractères fixe l'ordre d'énumération des keyspaces
+TYPE1 = PasswordClass('type1', '234', 3, "Valid Type 1 password (3 digits: 2, 3, or 4)")
+TYPE2 = PasswordClass('type2', '0123456789', 5, "Valid Type 2 password (5 digits: 0-9)")
+TYPE3 = PasswordClass('type3', 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789*+', 6,
+                      "Valid Type 3 password (6 characters: a-z, A-Z, 0-9, +, *)")
+PASSWORD_CLASSES = (TYPE1, TYPE2, TYPE3)
+
+# Chaque longueur correspond à une seule classe : une recherche par longueur suffit
+_CLASS_BY_LENGTH = {c.length: c for c in PASSWORD_CLASSES}
 
 
 class PasswordValidator:
     @staticmethod
     def validate_password(password):
-        if PasswordValidator.is_type1_password(password):
-            return True, "Valid Type 1 password (3 digits: 2, 3, or 4)"
-        elif PasswordValidator.is_type2_password(password):
-            return True, "Valid Type 2 password (5 digits: 0-9)"
-        elif PasswordValidator.is_type3_password(password):
-            return True, "Valid Type 3 password (6 characters: a-z, A-Z, 0-9, +, *)"
-        else:
-            return False, "Invalid password"
+        password_class = _CLASS_BY_LENGTH.get(len(password))
+        if password_class is not None and password_class.matches(password):
+            return True, password_class.description
+        return False, "Invalid password"
 
     @staticmethod
     def is_type1_password(password):
-        if len(password) != 3:
-            return False
-        for char in password:
-            if char not in ['2', '3', '4']:
-                return False
-        return True
+        return TYPE1.matches(password)
 
     @staticmethod
     def is_type2_password(password):
-        if len(password) != 5:
-            return False
-        return password.isdigit()
+        return TYPE2.matches(password)
 
     @staticmethod
     def is_type3_password(password):
-        if len(password) != 6:
-            return False
-        allowed_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+*')
-        for char in password:
-            if char not in allowed_chars:
-                return False
-        return True
+        return TYPE3.matches(password)
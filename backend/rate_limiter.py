@@ -0,0 +1,106 @@
+import threading
+import time
+
+
+class RateLimited(Exception):
+    """Too many requests for this key; the client should retry after `retry_after` seconds"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """
+    One token bucket per key: `rate` tokens/sec, at most `burst` tokens stored.
+    Each key costs a two-item list (tokens, last update). Buckets that have refilled completely
+    are indistinguishable from new ones, so they are dropped by a sweep every `sweep_interval`
+    seconds; memory stays proportional to the keys active within the last burst / rate seconds.
+    """
+
+    def __init__(self, rate, burst, sweep_interval=60.0):
+        self.rate = rate
+        self.burst = burst
+        self.sweep_interval = sweep_interval
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def _sweep(self, now):
+        idle = [key for key, (tokens, last) in self._buckets.items()
+                if tokens + (now - last) * self.rate >= self.burst]
+        for key in idle:
+            del self._buckets[key]
+        self.evicted += len(idle)
+        self._last_sweep = now
+
+    def acquire(self, key):
+        """Take one token; returns 0 if allowed, else the seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                self.allowed += 1
+                return 0
+            bucket[0] = tokens
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+
+    def refund(self, key):
+        """Give back a token taken by acquire() (the request was rejected by another limiter)"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + 1)
+                self.allowed -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "active_keys": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evicted": self.evicted
+            }
+
+
+class LoginRateLimiter:
+    """
+    Sign-in throttling applied before any password hash or database request:
+    one bucket per client IP (credential stuffing from one source) and one per username
+    (distributed guessing against one account).
+    """
+
+    def __init__(self, ip_rate=5.0, ip_burst=20, user_rate=0.2, user_burst=5, sweep_interval=60.0):
+        self.by_ip = TokenBucketLimiter(ip_rate, ip_burst, sweep_interval)
+        self.by_username = TokenBucketLimiter(user_rate, user_burst, sweep_interval)
+
+    def check(self, ip, username):
+        """Raises RateLimited if either bucket is empty (then no token is consumed from the other)"""
+        wait = self.by_ip.acquire(ip)
+        if wait:
+            raise RateLimited("Trop de tentatives depuis cette adresse, réessayez plus tard.", _seconds(wait))
+        wait = self.by_username.acquire(str(username).lower())
+        if wait:
+            self.by_ip.refund(ip)
+            raise RateLimited("Trop de tentatives pour ce compte, réessayez plus tard.", _seconds(wait))
+
+    def stats(self):
+        return {"ip": self.by_ip.stats(), "username": self.by_username.stats()}
+
+
+def _seconds(wait):
+    # Retry-After est un nombre entier de secondes
+    return max(1, int(wait + 0.999))
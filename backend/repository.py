@@ -0,0 +1,353 @@
+"""
+Storage interface used by the services: one repository per table (users, messages,
+stego_messages), grouped in a Repository. Rows are plain dicts shaped like Supabase rows,
+with `sender` / `receiver` embedded as {"id", "username"} dicts on message listings.
+
+Implementations: SupabaseRepository (below) and SQLiteRepository (backend/sqlite_repository.py),
+chosen by STORAGE_BACKEND in backend/database.py.
+"""
+from datetime import datetime, timedelta, timezone
+
+PAGE_SIZE = 1000
+# Erreurs PostgREST / Postgres signalant une fonction SQL absente (migration non appliquée)
+MISSING_FUNCTION_CODES = ('PGRST202', '42883')
+
+MESSAGE_COLUMNS = 'id, date_created, encrypted, algo_name, algorithm_key, sender_id, receiver_id'
+STEGO_COLUMNS = 'id, date_created, audio_filename, sender_id, receiver_id'
+
+
+def conversation_key(user1_id, user2_id):
+    """
+    Value of the generated conversation_key column of a pair of users, the same in both
+    directions: the smaller id in the high 32 bits, the larger one in the low 32 bits
+    """
+    low, high = sorted((int(user1_id), int(user2_id)))
+    return (low << 32) | high
+
+
+def utc_timestamp():
+    """
+    date_created of a new row: UTC with an explicit offset and microseconds, the format of
+    TIMESTAMPTZ values returned by Postgres, so timestamps of both tables compare as strings
+    """
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+
+class UserRepository:
+    # False : lecture puis écriture séparées (non atomique, pour comparaison dans les tests de charge)
+    atomic_lockout = True
+
+    def get_by_username(self, username):
+        raise NotImplementedError
+
+    def get_by_id(self, user_id):
+        raise NotImplementedError
+
+    def create(self, row):
+        """Insert a user; returns the stored row (with its id) or None"""
+        raise NotImplementedError
+
+    def update(self, user_id, fields):
+        raise NotImplementedError
+
+    def delete(self, user_id):
+        raise NotImplementedError
+
+    def register_failed_login(self, user_id, max_failed, lock_seconds):
+        """
+        Increment failed_attempts, locking the account for `lock_seconds` once it reaches
+        `max_failed`; returns {"failed_attempts", "locked_until"}. Implementations override this
+        with a single atomic statement; this fallback is a read-modify-write.
+        """
+        user = self.get_by_id(user_id)
+        update = {"failed_attempts": (user.get("failed_attempts") or 0) + 1}
+        if update["failed_attempts"] >= max_failed:
+            locked_until = datetime.now(timezone.utc) + timedelta(seconds=lock_seconds)
+            update["locked_until"] = locked_until.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+        self.update(user_id, update)
+        return {"failed_attempts": update["failed_attempts"],
+                "locked_until": update.get("locked_until", user.get("locked_until"))}
+
+    def list_public(self):
+        """id and username of every user"""
+        raise NotImplementedError
+
+    def iter_accounts(self, page_size=PAGE_SIZE):
+        """id, username, password_hash, password_salt of every user, ordered by id"""
+        raise NotImplementedError
+
+
+class MessageRepository:
+    def insert(self, row):
+        raise NotImplementedError
+
+    def conversation(self, user1_id, user2_id):
+        """Messages between two users, oldest first, with sender and receiver"""
+        raise NotImplementedError
+
+    def for_user(self, user_id):
+        """Messages sent or received by a user, oldest first, with sender and receiver"""
+        raise NotImplementedError
+
+    def conversation_page(self, user1_id, user2_id, limit, before=None, after=None):
+        """
+        Up to `limit` messages between two users strictly older than the `before`
+        (date_created, id) key, newest first (keyset pagination); with `after`, the messages
+        strictly newer than that key, oldest first (incremental sync)
+        """
+        raise NotImplementedError
+
+    def for_user_page(self, user_id, limit, before=None, after=None):
+        """Up to `limit` messages of a user older than `before` (newest first) or newer than `after` (oldest first)"""
+        raise NotImplementedError
+
+    def inbox_summary(self, user_id):
+        """
+        One row per peer of a user, most recent conversation first: peer_id, peer_username,
+        crypto_count, stego_count, last_message_at, last_message_type, last_sender_id,
+        last_preview (first 50 characters of the last crypto message) and last_algo_name
+        """
+        raise NotImplementedError
+
+    def sent(self, user_id):
+        """Messages sent by a user, newest first, with the receiver's username"""
+        raise NotImplementedError
+
+    def received(self, user_id):
+        """Messages received by a user, newest first, with the sender's username"""
+        raise NotImplementedError
+
+
+class StegoMessageRepository:
+    def insert(self, row):
+        raise NotImplementedError
+
+    def get(self, message_id):
+        raise NotImplementedError
+
+    def conversation(self, user1_id, user2_id):
+        """Stego messages between two users, oldest first, with sender and receiver"""
+        raise NotImplementedError
+
+    def for_user(self, user_id):
+        """Stego messages sent or received by a user, newest first, with sender and receiver"""
+        raise NotImplementedError
+
+    def conversation_page(self, user1_id, user2_id, limit, before=None, after=None):
+        """Up to `limit` stego messages between two users older than `before` or newer than `after`"""
+        raise NotImplementedError
+
+    def for_user_page(self, user_id, limit, before=None, after=None):
+        """Up to `limit` stego messages of a user older than `before` or newer than `after`"""
+        raise NotImplementedError
+
+
+def summarize_inbox(user_id, messages, stego_messages):
+    """inbox_summary() rows from the full message lists (embedded sender / receiver), in Python"""
+    peers = {}
+    rows = [('crypto', m) for m in messages] + [('stego', m) for m in stego_messages]
+    rows.sort(key=lambda row: (row[1]['date_created'], row[1]['id']), reverse=True)
+    for message_type, message in rows:
+        peer = message['receiver'] if message['sender_id'] == user_id else message['sender']
+        summary = peers.get(peer['id'])
+        if summary is None:
+            summary = peers[peer['id']] = {
+                "peer_id": peer['id'],
+                "peer_username": peer['username'],
+                "crypto_count": 0,
+                "stego_count": 0,
+                "last_message_at": message['date_created'],
+                "last_message_type": message_type,
+                "last_sender_id": message['sender_id'],
+                "last_preview": message['encrypted'][:50] if message_type == 'crypto' else None,
+                "last_algo_name": None
+            }
+        summary[f"{message_type}_count"] += 1
+        if message_type == 'crypto' and summary["last_algo_name"] is None:
+            summary["last_algo_name"] = message['algo_name']
+    return list(peers.values())
+
+
+class Repository:
+    """The three table repositories of one storage backend"""
+
+    def __init__(self, name, users, messages, stego_messages):
+        self.name = name
+        self.users = users
+        self.messages = messages
+        self.stego_messages = stego_messages
+
+
+# --- Supabase -----------------------------------------------------------------------------
+
+def _first(result):
+    return result.data[0] if result.data else None
+
+
+def _page(query, limit, before, after=None):
+    """
+    Keyset page: rows strictly before (date_created, id), newest first, or with `after`
+    rows strictly after that key, oldest first
+    """
+    # Paramètres PostgREST bruts : la requête peut déjà porter un filtre "or", et l'ordre a deux colonnes.
+    # PostgREST n'a pas de comparaison de tuples : la borne redondante date_created <= clé (ou >=)
+    # délimite le parcours d'index, le "or" ne départage que les messages de même date
+    key, op, direction = (after, 'gt', 'asc') if after else (before, 'lt', 'desc')
+    if key:
+        date_created, message_id = key
+        query.params = query.params.add(
+            'and', f'(date_created.{op[0]}te."{date_created}",or(date_created.{op}."{date_created}",'
+                   f'and(date_created.eq."{date_created}",id.{op}.{int(message_id)})))')
+    query.params = query.params.add('order', f'date_created.{direction},id.{direction}')
+    return query.limit(limit).execute().data or []
+
+
+class SupabaseUserRepository(UserRepository):
+    def __init__(self, client):
+        self.client = client
+
+    def get_by_username(self, username):
+        return _first(self.client.table('users').select('*').eq('username', username).execute())
+
+    def get_by_id(self, user_id):
+        return _first(self.client.table('users').select('*').eq('id', user_id).execute())
+
+    def create(self, row):
+        return _first(self.client.table('users').insert(row).execute())
+
+    def update(self, user_id, fields):
+        self.client.table('users').update(fields).eq('id', user_id).execute()
+
+    def delete(self, user_id):
+        self.client.table('users').delete().eq('id', user_id).execute()
+
+    def register_failed_login(self, user_id, max_failed, lock_seconds):
+        if self.atomic_lockout:
+            try:
+                r = self.client.rpc('register_failed_login', {
+                    "p_user_id": user_id,
+                    "p_max_failed": max_failed,
+                    "p_lock_seconds": lock_seconds
+                }).execute()
+            except Exception as e:
+                if getattr(e, 'code', None) not in MISSING_FUNCTION_CODES:
+                    raise
+                print(f"[!] register_failed_login RPC unavailable, falling back to a non-atomic update: {e}")
+                self.atomic_lockout = False
+            else:
+                state = r.data[0] if isinstance(r.data, list) else r.data
+                return {"failed_attempts": state["failed_attempts"], "locked_until": state["locked_until"]}
+        return super().register_failed_login(user_id, max_failed, lock_seconds)
+
+    def list_public(self):
+        return self.client.table('users').select('id, username').execute().data or []
+
+    def iter_accounts(self, page_size=PAGE_SIZE):
+        start = 0
+        while True:
+            page = (self.client.table('users')
+                    .select('id, username, password_hash, password_salt')
+                    .order('id')
+                    .range(start, start + page_size - 1)
+                    .execute()).data or []
+            yield from page
+            if len(page) < page_size:
+                return
+            start += page_size
+
+
+class SupabaseMessageRepository(MessageRepository):
+    WITH_USERS = MESSAGE_COLUMNS + (', sender:users!messages_sender_id_fkey(id, username)'
+                                    ', receiver:users!messages_receiver_id_fkey(id, username)')
+    # False si la fonction SQL inbox_summary n'est pas installée (migration non appliquée)
+    summary_function = True
+
+    def __init__(self, client):
+        self.client = client
+
+    def insert(self, row):
+        return _first(self.client.table('messages').insert(row).execute())
+
+    def conversation(self, user1_id, user2_id):
+        return self.client.table('messages').select(self.WITH_USERS).eq(
+            'conversation_key', conversation_key(user1_id, user2_id)
+        ).order('date_created', desc=False).execute().data or []
+
+    def for_user(self, user_id):
+        return self.client.table('messages').select(self.WITH_USERS).or_(
+            f'sender_id.eq.{user_id},receiver_id.eq.{user_id}'
+        ).order('date_created', desc=False).execute().data or []
+
+    def conversation_page(self, user1_id, user2_id, limit, before=None, after=None):
+        query = self.client.table('messages').select(self.WITH_USERS).eq(
+            'conversation_key', conversation_key(user1_id, user2_id))
+        return _page(query, limit, before, after)
+
+    def for_user_page(self, user_id, limit, before=None, after=None):
+        query = self.client.table('messages').select(self.WITH_USERS).or_(
+            f'sender_id.eq.{user_id},receiver_id.eq.{user_id}')
+        return _page(query, limit, before, after)
+
+    def inbox_summary(self, user_id):
+        if self.summary_function:
+            try:
+                return self.client.rpc('inbox_summary', {"p_user_id": user_id}).execute().data or []
+            except Exception as e:
+                if getattr(e, 'code', None) not in MISSING_FUNCTION_CODES:
+                    raise
+                print(f"[!] inbox_summary RPC unavailable, summarizing every message in Python: {e}")
+                self.summary_function = False
+        stego_messages = self.client.table('stego_messages').select(SupabaseStegoMessageRepository.WITH_USERS).or_(
+            f'sender_id.eq.{user_id},receiver_id.eq.{user_id}').execute().data or []
+        return summarize_inbox(user_id, self.for_user(user_id), stego_messages)
+
+    def sent(self, user_id):
+        return self.client.table('messages').select(
+            MESSAGE_COLUMNS + ', receiver:users!messages_receiver_id_fkey(username)'
+        ).eq('sender_id', user_id).order('date_created', desc=True).execute().data or []
+
+    def received(self, user_id):
+        return self.client.table('messages').select(
+            MESSAGE_COLUMNS + ', sender:users!messages_sender_id_fkey(username)'
+        ).eq('receiver_id', user_id).order('date_created', desc=True).execute().data or []
+
+
+class SupabaseStegoMessageRepository(StegoMessageRepository):
+    WITH_USERS = STEGO_COLUMNS + (', sender:users!stego_messages_sender_id_fkey(id, username)'
+                                  ', receiver:users!stego_messages_receiver_id_fkey(id, username)')
+
+    def __init__(self, client):
+        self.client = client
+
+    def insert(self, row):
+        return _first(self.client.table('stego_messages').insert(row).execute())
+
+    def get(self, message_id):
+        return _first(self.client.table('stego_messages').select('*').eq('id', message_id).execute())
+
+    def conversation(self, user1_id, user2_id):
+        return self.client.table('stego_messages').select(self.WITH_USERS).eq(
+            'conversation_key', conversation_key(user1_id, user2_id)
+        ).order('date_created', desc=False).execute().data or []
+
+    def for_user(self, user_id):
+        return self.client.table('stego_messages').select(self.WITH_USERS).or_(
+            f'sender_id.eq.{user_id},receiver_id.eq.{user_id}'
+        ).order('date_created', desc=True).execute().data or []
+
+    def conversation_page(self, user1_id, user2_id, limit, before=None, after=None):
+        query = self.client.table('stego_messages').select(self.WITH_USERS).eq(
+            'conversation_key', conversation_key(user1_id, user2_id))
+        return _page(query, limit, before, after)
+
+    def for_user_page(self, user_id, limit, before=None, after=None):
+        query = self.client.table('stego_messages').select(self.WITH_USERS).or_(
+            f'sender_id.eq.{user_id},receiver_id.eq.{user_id}')
+        return _page(query, limit, before, after)
+
+
+class SupabaseRepository(Repository):
+    def __init__(self, client):
+        self.client = client
+        super().__init__('supabase', SupabaseUserRepository(client), SupabaseMessageRepository(client),
+                         SupabaseStegoMessageRepository(client))
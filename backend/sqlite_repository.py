@@ -0,0 +1,442 @@
+"""
+Local SQLite storage backend (offline development, query benchmarks, load tests).
+
+The schema is derived from database_migration.sql: tables, columns (after the ALTER TABLE
+statements) and indexes are translated to SQLite; row level security, policies and
+functions are Postgres-only and skipped.
+
+    python -m backend.sqlite_repository seed --db local.db --users 1000 --messages 100000
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.repository import (Repository, UserRepository, MessageRepository, StegoMessageRepository,
+                                MESSAGE_COLUMNS, STEGO_COLUMNS, PAGE_SIZE, conversation_key)
+
+MIGRATION_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database_migration.sql')
+# Même format que les timestamptz renvoyés par Supabase
+SQLITE_NOW = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+
+# --- Schéma -------------------------------------------------------------------------------
+
+def _split_top_level(text, sep=','):
+    """Split on `sep` outside parentheses"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == sep and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return parts
+
+
+def _to_sqlite(definition):
+    definition = re.sub(r'\bSERIAL\s+PRIMARY\s+KEY\b', 'INTEGER PRIMARY KEY AUTOINCREMENT', definition, flags=re.I)
+    definition = re.sub(r'\bTIMESTAMPTZ\b', 'TEXT', definition, flags=re.I)
+    definition = re.sub(r'\bDEFAULT\s+now\(\)', f'DEFAULT {SQLITE_NOW}', definition, flags=re.I)
+    # Colonnes générées : LEAST / GREATEST -> MIN / MAX, sans cast ; VIRTUAL car ALTER TABLE ADD COLUMN
+    # n'accepte pas STORED (une colonne virtuelle s'indexe de la même façon)
+    definition = re.sub(r'\bLEAST\(', 'MIN(', definition, flags=re.I)
+    definition = re.sub(r'\bGREATEST\(', 'MAX(', definition, flags=re.I)
+    definition = re.sub(r'::\w+', '', definition)
+    definition = re.sub(r'\bSTORED\b', 'VIRTUAL', definition, flags=re.I)
+    # Index couvrant : pas d'INCLUDE, les colonnes sont ajoutées à la clé
+    definition = re.sub(r'\)\s*INCLUDE\s*\(([^)]*)\)', r', \1)', definition, flags=re.I)
+    return re.sub(r'\bpublic\.', '', definition)
+
+
+def _statements(sql):
+    sql = re.sub(r'--[^\n]*', '', sql)
+    sql = re.sub(r'\$\$.*?\$\$', "''", sql, flags=re.S)  # corps des fonctions (Postgres uniquement)
+    return [' '.join(s.split()) for s in sql.split(';') if s.strip()]
+
+
+def load_schema(path=MIGRATION_PATH):
+    """(tables, indexes): {table: {column: definition}} plus table constraints, and CREATE/DROP INDEX statements"""
+    with open(path, 'r', encoding='utf-8') as f:
+        statements = _statements(f.read())
+
+    tables = OrderedDict()
+    indexes = []
+    for statement in statements:
+        create = re.match(r'CREATE TABLE (?:IF NOT EXISTS )?(?:public\.)?(\w+) \((.*)\)$', statement, re.I)
+        if create:
+            columns = tables.setdefault(create.group(1), OrderedDict())
+            for i, item in enumerate(_split_top_level(create.group(2))):
+                if re.match(r'(PRIMARY KEY|UNIQUE|CONSTRAINT|FOREIGN KEY|CHECK)\b', item, re.I):
+                    columns[f'__constraint{i}'] = item
+                else:
+                    columns[item.split()[0]] = item
+            continue
+
+        alter = re.match(r'ALTER TABLE (?:IF EXISTS )?(?:public\.)?(\w+) (.*)$', statement, re.I)
+        if alter and alter.group(1) in tables:
+            columns = tables[alter.group(1)]
+            for action in _split_top_level(alter.group(2)):
+                add = re.match(r'ADD COLUMN (?:IF NOT EXISTS )?(.*)$', action, re.I)
+                drop = re.match(r'DROP COLUMN (?:IF EXISTS )?(\w+)', action, re.I)
+                retype = re.match(r'ALTER COLUMN (\w+) TYPE (\w+(?:\s*\([^)]*\))?)', action, re.I)
+                if add:
+                    columns.setdefault(add.group(1).split()[0], add.group(1))
+                elif drop:
+                    columns.pop(drop.group(1), None)
+                elif retype and retype.group(1) in columns:
+                    name = retype.group(1)
+                    rest = re.match(r'\w+\s+\w+(?:\s*\([^)]*\))?(.*)$', columns[name]).group(1)
+                    columns[name] = f"{name} {retype.group(2)}{rest}"
+            continue
+
+        if re.match(r'(CREATE (UNIQUE )?INDEX|DROP INDEX)', statement, re.I):
+            indexes.append(statement)
+
+    return tables, indexes
+
+
+def create_schema(conn, path=MIGRATION_PATH):
+    """Create missing tables, columns and indexes (idempotent)"""
+    tables, indexes = load_schema(path)
+    for table, columns in tables.items():
+        # table_xinfo : table_info ne liste pas les colonnes générées
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_xinfo({table})')}
+        if not existing:
+            body = ', '.join(_to_sqlite(d) for d in columns.values())
+            conn.execute(f'CREATE TABLE {table} ({body})')
+            continue
+        for name, definition in columns.items():
+            if name.startswith('__constraint') or name in existing:
+                continue
+            try:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {_to_sqlite(definition)}')
+            except sqlite3.OperationalError as e:
+                print(f"[!] Cannot add column {table}.{name} to the existing database: {e}")
+    for statement in indexes:
+        conn.execute(_to_sqlite(statement))
+    conn.commit()
+
+
+# --- Repositories -------------------------------------------------------------------------
+
+class SQLiteDatabase:
+    """One connection per thread to the same database file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        create_schema(self.connection())
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql, params=()):
+        return [dict(row) for row in self.connection().execute(sql, params)]
+
+    def write(self, sql, params=()):
+        """Run one statement in its own transaction; returns the rows of a RETURNING clause"""
+        conn = self.connection()
+        with conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+
+def _insert(db, table, row):
+    columns = ', '.join(row)
+    placeholders = ', '.join('?' for _ in row)
+    rows = db.write(f'INSERT INTO {table} ({columns}) VALUES ({placeholders}) RETURNING *', tuple(row.values()))
+    return rows[0] if rows else None
+
+
+def _with_users(rows, sender_fields=('id', 'username'), receiver_fields=('id', 'username')):
+    """Nest the joined sender_* / receiver_* columns like Supabase embedded resources"""
+    for row in rows:
+        sender = {'id': row.pop('sender_user_id'), 'username': row.pop('sender_username')}
+        receiver = {'id': row.pop('receiver_user_id'), 'username': row.pop('receiver_username')}
+        if sender_fields:
+            row['sender'] = {k: sender[k] for k in sender_fields}
+        if receiver_fields:
+            row['receiver'] = {k: receiver[k] for k in receiver_fields}
+    return rows
+
+
+def _keyset_page(db, select, where, params, limit, before, after=None):
+    """
+    Rows matching `where` strictly before the (date_created, id) key, newest first, or with
+    `after` strictly after that key, oldest first
+    """
+    key, op, direction = (after, '>', 'ASC') if after else (before, '<', 'DESC')
+    if key:
+        where = f'({where}) AND (t.date_created, t.id) {op} (?, ?)'
+        params = (*params, key[0], key[1])
+    return _with_users(db.query(
+        f'{select} WHERE {where} ORDER BY t.date_created {direction}, t.id {direction} LIMIT ?', (*params, limit)))
+
+
+CONVERSATION_WHERE = 't.conversation_key = ?'
+
+
+# Même requête que la fonction inbox_summary de database_migration.sql
+INBOX_SUMMARY_SQL = """
+    WITH user_messages AS (
+        SELECT 'crypto' AS message_type, id, date_created, sender_id, algo_name, substr(encrypted, 1, 50) AS preview,
+               CASE WHEN sender_id = :user_id THEN receiver_id ELSE sender_id END AS peer_id
+        FROM messages WHERE sender_id = :user_id OR receiver_id = :user_id
+        UNION ALL
+        SELECT 'stego', id, date_created, sender_id, NULL, NULL,
+               CASE WHEN sender_id = :user_id THEN receiver_id ELSE sender_id END
+        FROM stego_messages WHERE sender_id = :user_id OR receiver_id = :user_id
+    ),
+    ranked AS (
+        SELECT m.*,
+               COUNT(*) FILTER (WHERE m.message_type = 'crypto') OVER peer AS crypto_count,
+               COUNT(*) FILTER (WHERE m.message_type = 'stego') OVER peer AS stego_count,
+               ROW_NUMBER() OVER (PARTITION BY m.peer_id ORDER BY m.date_created DESC, m.id DESC) AS recency,
+               FIRST_VALUE(m.algo_name) OVER (PARTITION BY m.peer_id
+                   ORDER BY m.algo_name IS NULL, m.date_created DESC, m.id DESC) AS last_algo_name
+        FROM user_messages m
+        WINDOW peer AS (PARTITION BY m.peer_id)
+    )
+    SELECT r.peer_id, u.username AS peer_username, r.crypto_count, r.stego_count,
+           r.date_created AS last_message_at, r.message_type AS last_message_type,
+           r.sender_id AS last_sender_id, r.preview AS last_preview, r.last_algo_name
+    FROM ranked r JOIN users u ON u.id = r.peer_id
+    WHERE r.recency = 1
+    ORDER BY r.date_created DESC
+"""
+
+
+def _select_with_users(table, columns):
+    prefixed = ', '.join(f't.{c.strip()}' for c in columns.split(','))
+    return (f'SELECT {prefixed}, s.id AS sender_user_id, s.username AS sender_username, '
+            f'r.id AS receiver_user_id, r.username AS receiver_username '
+            f'FROM {table} t JOIN users s ON s.id = t.sender_id JOIN users r ON r.id = t.receiver_id')
+
+
+class SQLiteUserRepository(UserRepository):
+    def __init__(self, db):
+        self.db = db
+
+    def get_by_username(self, username):
+        rows = self.db.query('SELECT * FROM users WHERE username = ?', (username,))
+        return rows[0] if rows else None
+
+    def get_by_id(self, user_id):
+        rows = self.db.query('SELECT * FROM users WHERE id = ?', (user_id,))
+        return rows[0] if rows else None
+
+    def create(self, row):
+        try:
+            return _insert(self.db, 'users', row)
+        except sqlite3.IntegrityError:
+            return None
+
+    def update(self, user_id, fields):
+        assignments = ', '.join(f'{column} = ?' for column in fields)
+        self.db.write(f'UPDATE users SET {assignments} WHERE id = ?', (*fields.values(), user_id))
+
+    def delete(self, user_id):
+        self.db.write('DELETE FROM users WHERE id = ?', (user_id,))
+
+    def register_failed_login(self, user_id, max_failed, lock_seconds):
+        if not self.atomic_lockout:
+            return super().register_failed_login(user_id, max_failed, lock_seconds)
+        rows = self.db.write(
+            "UPDATE users SET failed_attempts = failed_attempts + 1, "
+            "locked_until = CASE WHEN failed_attempts + 1 >= ? "
+            "THEN strftime('%Y-%m-%dT%H:%M:%SZ', 'now', ?) ELSE locked_until END "
+            "WHERE id = ? RETURNING failed_attempts, locked_until",
+            (max_failed, f'+{int(lock_seconds)} seconds', user_id))
+        return rows[0]
+
+    def list_public(self):
+        return self.db.query('SELECT id, username FROM users ORDER BY id')
+
+    def iter_accounts(self, page_size=PAGE_SIZE):
+        last_id = 0
+        while True:
+            page = self.db.query('SELECT id, username, password_hash, password_salt FROM users '
+                                 'WHERE id > ? ORDER BY id LIMIT ?', (last_id, page_size))
+            yield from page
+            if len(page) < page_size:
+                return
+            last_id = page[-1]['id']
+
+
+class SQLiteMessageRepository(MessageRepository):
+    def __init__(self, db):
+        self.db = db
+        self.select = _select_with_users('messages', MESSAGE_COLUMNS)
+
+    def insert(self, row):
+        return _insert(self.db, 'messages', row)
+
+    def conversation(self, user1_id, user2_id):
+        return _with_users(self.db.query(
+            f'{self.select} WHERE {CONVERSATION_WHERE} ORDER BY t.date_created ASC, t.id ASC',
+            (conversation_key(user1_id, user2_id),)))
+
+    def for_user(self, user_id):
+        return _with_users(self.db.query(
+            f'{self.select} WHERE t.sender_id = ? OR t.receiver_id = ? ORDER BY t.date_created ASC',
+            (user_id, user_id)))
+
+    def conversation_page(self, user1_id, user2_id, limit, before=None, after=None):
+        return _keyset_page(self.db, self.select, CONVERSATION_WHERE, (conversation_key(user1_id, user2_id),),
+                            limit, before, after)
+
+    def for_user_page(self, user_id, limit, before=None, after=None):
+        return _keyset_page(self.db, self.select, 't.sender_id = ? OR t.receiver_id = ?', (user_id, user_id),
+                            limit, before, after)
+
+    def inbox_summary(self, user_id):
+        return self.db.query(INBOX_SUMMARY_SQL, {"user_id": user_id})
+
+    def sent(self, user_id):
+        return _with_users(self.db.query(
+            f'{self.select} WHERE t.sender_id = ? ORDER BY t.date_created DESC', (user_id,)),
+            sender_fields=None, receiver_fields=('username',))
+
+    def received(self, user_id):
+        return _with_users(self.db.query(
+            f'{self.select} WHERE t.receiver_id = ? ORDER BY t.date_created DESC', (user_id,)),
+            sender_fields=('username',), receiver_fields=None)
+
+
+class SQLiteStegoMessageRepository(StegoMessageRepository):
+    def __init__(self, db):
+        self.db = db
+        self.select = _select_with_users('stego_messages', STEGO_COLUMNS)
+
+    def insert(self, row):
+        return _insert(self.db, 'stego_messages', row)
+
+    def get(self, message_id):
+        rows = self.db.query('SELECT * FROM stego_messages WHERE id = ?', (message_id,))
+        return rows[0] if rows else None
+
+    def conversation(self, user1_id, user2_id):
+        return _with_users(self.db.query(
+            f'{self.select} WHERE {CONVERSATION_WHERE} ORDER BY t.date_created ASC, t.id ASC',
+            (conversation_key(user1_id, user2_id),)))
+
+    def for_user(self, user_id):
+        return _with_users(self.db.query(
+            f'{self.select} WHERE t.sender_id = ? OR t.receiver_id = ? ORDER BY t.date_created DESC',
+            (user_id, user_id)))
+
+    def conversation_page(self, user1_id, user2_id, limit, before=None, after=None):
+        return _keyset_page(self.db, self.select, CONVERSATION_WHERE, (conversation_key(user1_id, user2_id),),
+                            limit, before, after)
+
+    def for_user_page(self, user_id, limit, before=None, after=None):
+        return _keyset_page(self.db, self.select, 't.sender_id = ? OR t.receiver_id = ?', (user_id, user_id),
+                            limit, before, after)
+
+
+class SQLiteRepository(Repository):
+    def __init__(self, path):
+        self.db = SQLiteDatabase(path)
+        super().__init__('sqlite', SQLiteUserRepository(self.db), SQLiteMessageRepository(self.db),
+                         SQLiteStegoMessageRepository(self.db))
+
+
+# --- Données de test ----------------------------------------------------------------------
+
+ALGORITHMS = ('ceasar', 'hill', 'playfair')
+
+
+def seed(repository, users=1000, messages=100_000, stego_ratio=0.1, days=365, hash_iterations=1000, seed=0):
+    """
+    Fill the database with `users` accounts (password of user N: TYPE2 string f"{N % 100000:05d}")
+    and `messages` crypto messages (+ stego_ratio stego messages) over the last `days` days.
+    Conversations are skewed: a few pairs of users exchange most messages, as in real inboxes.
+    """
+    from backend import password_hashing
+
+    rng = random.Random(seed)
+    db = repository.db
+    conn = db.connection()
+    start = time.perf_counter()
+
+    first_id = (db.query('SELECT COALESCE(MAX(id), 0) AS n FROM users')[0]['n']) + 1
+    rows = []
+    for n in range(first_id, first_id + users):
+        password_hash, salt = password_hashing.hash_password(f"{n % 100000:05d}", 'slow', {'i': hash_iterations})
+        rows.append((f"user{n}", password_hash, salt))
+    with conn:
+        conn.executemany('INSERT INTO users (username, password_hash, password_salt, failed_attempts) '
+                         'VALUES (?, ?, ?, 0)', rows)
+    ids = [row['id'] for row in db.query('SELECT id FROM users')]
+
+    now = datetime.now(timezone.utc)
+    weights = [1 / (rank + 1) for rank in range(len(ids))]  # loi de Zipf : quelques comptes très actifs
+
+    def pairs(count):
+        senders = rng.choices(ids, weights, k=count)
+        receivers = rng.choices(ids, weights, k=count)
+        for sender, receiver in zip(senders, receivers):
+            if sender != receiver:
+                date = now - timedelta(seconds=rng.uniform(0, days * 86400))
+                yield sender, receiver, date.isoformat(timespec='microseconds')
+
+    with conn:
+        conn.executemany(
+            'INSERT INTO messages (sender_id, receiver_id, date_created, encrypted, algo_name) VALUES (?, ?, ?, ?, ?)',
+            ((s, r, d, ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=rng.randint(8, 120))),
+              rng.choice(ALGORITHMS)) for s, r, d in pairs(messages)))
+        conn.executemany(
+            'INSERT INTO stego_messages (sender_id, receiver_id, date_created, audio_filename) VALUES (?, ?, ?, ?)',
+            ((s, r, d, f"stego{s}{i}.wav") for i, (s, r, d) in enumerate(pairs(int(messages * stego_ratio)))))
+        conn.execute('ANALYZE')
+
+    counts = {table: db.query(f'SELECT COUNT(*) AS n FROM {table}')[0]['n']
+              for table in ('users', 'messages', 'stego_messages')}
+    print(f"[+] Seeded {db.path} in {time.perf_counter() - start:.1f}s: {counts}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SQLite database built from database_migration.sql")
+    sub = parser.add_subparsers(dest='command', required=True)
+    init = sub.add_parser('init', help='Create the schema')
+    init.add_argument('--db', default=os.getenv('SQLITE_PATH', 'local.db'))
+    fill = sub.add_parser('seed', help='Create the schema and insert generated users and messages')
+    fill.add_argument('--db', default=os.getenv('SQLITE_PATH', 'local.db'))
+    fill.add_argument('--users', type=int, default=1000)
+    fill.add_argument('--messages', type=int, default=100_000)
+    fill.add_argument('--stego-ratio', type=float, default=0.1)
+    fill.add_argument('--days', type=int, default=365)
+    fill.add_argument('--hash-iterations', type=int, default=1000)
+    fill.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    repository = SQLiteRepository(args.db)
+    if args.command == 'init':
+        print(f"[+] Schema ready in {args.db}")
+    else:
+        seed(repository, args.users, args.messages, args.stego_ratio, args.days, args.hash_iterations, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from backend.database import get_supabase_client
+from backend.database import get_repository
+from backend.repository import utc_timestamp
 from datetime import datetime
 import os
 import sys
@@ -10,8 +11,10 @@ from steganography.steganography import hide_in_audio, extract_from_audio, text_
 
 
 class StegoService:
-    def __init__(self):
-        self.supabase = get_supabase_client()
+    def __init__(self, repository=None, events=None):
+        self.stego_messages = (repository or get_repository()).stego_messages
+        # MessageEvents optionnel : notifie les destinataires connectés (flux SSE)
+        self.events = events
 
     def analyze_audio_file(self, file_path):
         '''
@@ -140,16 +143,18 @@ class StegoService:
                 "sender_id": sender_id,
                 "receiver_id": receiver_id,
                 "audio_filename": output_filename,
-                "date_created": datetime.now().isoformat()
+                "date_created": utc_timestamp()
             }
 
-            result = self.supabase.table('stego_messages').insert(message_data).execute()
+            row = self.stego_messages.insert(message_data)
 
-            if result.data and len(result.data) > 0:
+            if row:
+                if self.events:
+                    self.events.publish('stego', row)
                 return {
                     "success": True,
                     "message": "Message stéganographié envoyé avec succès",
-                    "data": result.data[0],
+                    "data": row,
                     "analysis": {
                         "original": original_analysis,
                         "modified": stego_analysis,
@@ -192,41 +197,32 @@ class StegoService:
                 "sender_id": sender_id,
                 "receiver_id": receiver_id,
                 "audio_filename": output_filename,
-                "date_created": datetime.now().isoformat()
+                "date_created": utc_timestamp()
             }
 
-            result = self.supabase.table('stego_messages').insert(message_data).execute()
+            row = self.stego_messages.insert(message_data)
 
             # Clean up original file
             if os.path.exists(input_path):
                 os.remove(input_path)
 
-            if result.data and len(result.data) > 0:
-                return {"success": True, "message": "Steganography message sent successfully", "data": result.data[0]}
+            if row:
+                if self.events:
+                    self.events.publish('stego', row)
+                return {"success": True, "message": "Steganography message sent successfully", "data": row}
             else:
                 return {"success": False, "message": "Failed to save message"}
 
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
 
-    def get_user_messages(self, user_id):
-        '''Get all steganography messages for a user'''
+    def get_user_messages(self, user_id, limit=None, before=None, after=None):
+        '''Get all steganography messages for a user (or one keyset page of `limit` older than `before` / newer than `after`)'''
         try:
-            result = self.supabase.table('stego_messages').select(
-                '''
-                id,
-                date_created,
-                audio_filename,
-                sender_id,
-                receiver_id,
-                sender:users!stego_messages_sender_id_fkey(id, username),
-                receiver:users!stego_messages_receiver_id_fkey(id, username)
-                '''
-            ).or_(
-                f'sender_id.eq.{user_id},receiver_id.eq.{user_id}'
-            ).order('date_created', desc=True).execute()
-
-            return {"success": True, "messages": result.data if result.data else []}
+            if limit:
+                return {"success": True,
+                        "messages": self.stego_messages.for_user_page(user_id, limit, before, after)}
+            return {"success": True, "messages": self.stego_messages.for_user(user_id)}
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
 
@@ -234,13 +230,11 @@ class StegoService:
         '''Extract hidden message from audio file'''
         try:
             # Get message from database
-            result = self.supabase.table('stego_messages').select('*').eq('id', message_id).execute()
+            message = self.stego_messages.get(message_id)
 
-            if not result.data or len(result.data) == 0:
+            if not message:
                 return {"success": False, "message": "Message not found"}
 
-            message = result.data[0]
-
             # Verify user is receiver
             if message['receiver_id'] != user_id:
                 return {"success": False, "message": "Unauthorized"}
@@ -261,23 +255,12 @@ class StegoService:
         
         # [AJOUTER CETTE MÉTHODE DANS stego_service.py, à l'intérieur de la classe StegoService]
 
-    def get_conversation_messages(self, user1_id, user2_id):
-        '''Get all steganography messages between two specific users'''
+    def get_conversation_messages(self, user1_id, user2_id, limit=None, before=None, after=None):
+        '''Get all steganography messages between two specific users (or one keyset page, before or after a key)'''
         try:
-            result = self.supabase.table('stego_messages').select(
-                '''
-                id,
-                date_created,
-                audio_filename,
-                sender_id,
-                receiver_id,
-                sender:users!stego_messages_sender_id_fkey(id, username),
-                receiver:users!stego_messages_receiver_id_fkey(id, username)
-                '''
-            ).or_(
-                f'and(sender_id.eq.{user1_id},receiver_id.eq.{user2_id}),and(sender_id.eq.{user2_id},receiver_id.eq.{user1_id})'
-            ).order('date_created', desc=False).execute()
-
-            return {"success": True, "messages": result.data if result.data else []}
+            if limit:
+                return {"success": True,
+                        "messages": self.stego_messages.conversation_page(user1_id, user2_id, limit, before, after)}
+            return {"success": True, "messages": self.stego_messages.conversation(user1_id, user2_id)}
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}", "messages": []}
\ No newline at end of file
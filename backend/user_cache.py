@@ -0,0 +1,106 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of `users` rows, keyed by username with a secondary index by id.
+
+    Rows are cached on read and kept up to date write-through by AuthService (sign-up, lockout
+    counters, rehash). Entries expire after `ttl` seconds so changes made by other processes are
+    picked up eventually; at most `maxsize` rows are kept, least recently used evicted first.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._rows = OrderedDict()  # username -> (expires_at, row)
+        self._ids = {}  # id -> username
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, username):
+        _, row = self._rows.pop(username)
+        self._ids.pop(row.get("id"), None)
+
+    def _lookup(self, username):
+        entry = self._rows.get(username)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, row = entry
+        if time.monotonic() >= expires_at:
+            self._drop(username)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._rows.move_to_end(username)
+        self.hits += 1
+        return copy.deepcopy(row)
+
+    def get(self, username):
+        """Cached row for this username, or None (miss or expired)"""
+        with self._lock:
+            return self._lookup(username)
+
+    def get_by_id(self, user_id):
+        with self._lock:
+            username = self._ids.get(user_id)
+            if username is None:
+                self.misses += 1
+                return None
+            return self._lookup(username)
+
+    def put(self, row):
+        """Cache a full row (as returned by select('*'))"""
+        if not row or "username" not in row:
+            return
+        with self._lock:
+            username = row["username"]
+            if username in self._rows:
+                self._drop(username)
+            self._rows[username] = (time.monotonic() + self.ttl, copy.deepcopy(row))
+            if row.get("id") is not None:
+                self._ids[row["id"]] = username
+            while len(self._rows) > self.maxsize:
+                self._drop(next(iter(self._rows)))
+                self.evictions += 1
+
+    def update(self, user_id, fields):
+        """Apply a write already sent to the database; the entry keeps its expiry"""
+        with self._lock:
+            username = self._ids.get(user_id)
+            if username is None or username not in self._rows:
+                return
+            self._rows[username][1].update(copy.deepcopy(fields))
+
+    def invalidate(self, username=None, user_id=None):
+        with self._lock:
+            if username is None:
+                username = self._ids.get(user_id)
+            if username in self._rows:
+                self._drop(username)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._ids.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._rows),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
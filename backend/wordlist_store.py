@@ -0,0 +1,155 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+# En-tête du format compilé : magic, mtime (ns) et taille du fichier source, nombre de mots, nombre de buckets
+_MAGIC = b'WLC1'
+_HEADER = struct.Struct('<4sqqII')
+# Un bucket par longueur de mot : (longueur, index du premier mot, nombre de mots)
+_BUCKET = struct.Struct('<III')
+
+
+def compile_wordlist(source_path, output_path):
+    """
+    Compile a text wordlist into the binary format read by CompiledWordlist.
+
+    Lines are stripped, empty lines and duplicates dropped (first occurrence kept), then words
+    are grouped by length. The file holds the header, the bucket table, a uint32 offset
+    table (count + 1 entries) and the concatenated word bytes.
+    """
+    stat = os.stat(source_path)
+    with open(source_path, 'rb') as f:
+        lines = f.read().splitlines()
+
+    seen = set()
+    buckets = {}
+    for line in lines:
+        word = line.strip()
+        if word and word not in seen:
+            seen.add(word)
+            buckets.setdefault(len(word), []).append(word)
+
+    words = []
+    bucket_table = []
+    for length in sorted(buckets):
+        bucket_table.append((length, len(words), len(buckets[length])))
+        words.extend(buckets[length])
+
+    offsets = np.zeros(len(words) + 1, dtype='<u4')
+    if words:
+        np.cumsum([len(w) for w in words], out=offsets[1:])
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, stat.st_mtime_ns, stat.st_size, len(words), len(bucket_table)))
+        for bucket in bucket_table:
+            f.write(_BUCKET.pack(*bucket))
+        f.write(offsets.tobytes())
+        f.write(b''.join(words))
+    os.replace(tmp_path, output_path)
+
+
+class CompiledWordlist:
+    """
+    Read-only, memory-mapped view of a compiled wordlist.
+    Indexing returns the word as bytes, sliced straight from the mapping.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.source_mtime_ns, self.source_size, self._count, n_buckets = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a compiled wordlist: {path}")
+
+        position = _HEADER.size
+        self.buckets = []
+        for _ in range(n_buckets):
+            self.buckets.append(_BUCKET.unpack_from(self._mmap, position))
+            position += _BUCKET.size
+
+        self._offsets = np.frombuffer(self._mmap, dtype='<u4', count=self._count + 1, offset=position)
+        self._data_start = position + self._offsets.nbytes
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("wordlist index out of range")
+        start = self._data_start + int(self._offsets[index])
+        return self._mmap[start:self._data_start + int(self._offsets[index + 1])]
+
+    def __iter__(self):
+        return self.iter_range(0, self._count)
+
+    def iter_range(self, start, stop):
+        """Yield words [start, stop) as bytes"""
+        offsets = self._offsets[start:stop + 1].tolist()
+        base = self._data_start
+        for a, b in zip(offsets, offsets[1:]):
+            yield self._mmap[base + a:base + b]
+
+    def bucket(self, length):
+        """(first index, count) of the words of a given length, or (0, 0)"""
+        for bucket_length, first, count in self.buckets:
+            if bucket_length == length:
+                return first, count
+        return 0, 0
+
+    def __reduce__(self):
+        # Les processus workers ré-ouvrent le même fichier : les pages mappées sont partagées
+        return (CompiledWordlist, (self.path,))
+
+
+class WordlistStore:
+    """
+    Compiles wordlists once into `cache_dir` and keeps them memory-mapped.
+    Entries are keyed by the source file's mtime and size, so unchanged files reload for free.
+    """
+
+    def __init__(self, cache_dir='wordlist_cache'):
+        self.cache_dir = cache_dir
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _compiled_path(self, source_path):
+        key = hashlib.sha256(os.path.abspath(source_path).encode()).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.cache_dir, f"{name}_{key}.wlc")
+
+    def get(self, source_path):
+        stat = os.stat(source_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._cache.get(source_path)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+            compiled_path = self._compiled_path(source_path)
+            wordlist = None
+            if os.path.exists(compiled_path):
+                try:
+                    wordlist = CompiledWordlist(compiled_path)
+                except (ValueError, struct.error):
+                    wordlist = None
+                if wordlist and (wordlist.source_mtime_ns, wordlist.source_size) != signature:
+                    wordlist = None
+
+            if wordlist is None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                compile_wordlist(source_path, compiled_path)
+                wordlist = CompiledWordlist(compiled_path)
+                print(f"[*] Compiled wordlist {source_path} -> {compiled_path} ({len(wordlist)} entries)")
+
+            self._cache[source_path] = (signature, wordlist)
+            return wordlist
@@ -0,0 +1,125 @@
+"""
+Concurrent-login stress test for the account lockout counter, on the configured storage backend
+(STORAGE_BACKEND=sqlite runs it offline).
+
+    python benchmarks/lockout_stress.py                  # atomic register_failed_login
+    python benchmarks/lockout_stress.py --non-atomic     # read-modify-write, for comparison
+
+Creates a throwaway account, fires `--attempts` wrong-password sign-ins from `--threads` threads at
+once, then checks that failed_attempts in the database equals the number of failures the service
+actually evaluated (any difference is a lost increment). Also reports user repository calls per
+sign-in. The account is deleted afterwards.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.auth_service import AuthService
+
+
+class CountingUsers:
+    """Wraps the user repository and counts its calls (one database request each)"""
+
+    def __init__(self, users):
+        self._users = users
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def __getattr__(self, name):
+        attribute = getattr(self._users, name)
+        if not callable(attribute):
+            return attribute
+
+        def counted(*args, **kwargs):
+            with self._lock:
+                self.requests += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+
+def _evaluated_failure(message):
+    # Échecs réellement comptés : mot de passe vérifié puis refusé (y compris celui qui verrouille)
+    return message.startswith("Mot de passe incorrect") or message.startswith("Compte verrouillé après")
+
+
+def run(threads, attempts, atomic=True):
+    service = AuthService(user_cache=False)
+    service.hash_params = {'i': 1000}  # hachage court : la contention porte sur la base, pas le CPU
+    repository = service.users
+    repository.atomic_lockout = atomic
+    client = service.users = CountingUsers(repository)
+
+    username = f"stress_{uuid.uuid4().hex[:12]}"
+    created = service.sign_up(username, '24680')
+    if not created["success"]:
+        print(f"[!] Could not create the test account: {created['message']}")
+        return None
+    user_id = created["user"]["id"]
+
+    try:
+        client.requests = 0
+        barrier = threading.Barrier(threads)
+
+        def attempt(i):
+            if i < threads:
+                barrier.wait()  # la première vague part en même temps
+            return service.sign_in(username, '13579')["message"]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            messages = list(pool.map(attempt, range(attempts)))
+        elapsed = time.perf_counter() - start
+        requests = client.requests
+
+        row = repository.get_by_id(user_id)
+    finally:
+        repository.delete(user_id)
+
+    evaluated = sum(1 for m in messages if _evaluated_failure(m))
+    return {
+        "mode": "atomic" if repository.atomic_lockout else "read-modify-write",
+        "threads": threads,
+        "attempts": attempts,
+        "evaluated_failures": evaluated,
+        "rejected_while_locked": attempts - evaluated,
+        "failed_attempts_in_db": row["failed_attempts"],
+        "lost_increments": evaluated - row["failed_attempts"],
+        "locked_until": row["locked_until"],
+        "requests_per_sign_in": requests / attempts,
+        "elapsed": elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-login stress test for the lockout counter")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--attempts', type=int, default=64)
+    parser.add_argument('--non-atomic', action='store_true', help='Use the read-modify-write update')
+    args = parser.parse_args()
+
+    print(f"[*] {args.attempts} concurrent failed sign-ins on {args.threads} threads")
+    report = run(args.threads, args.attempts, atomic=not args.non_atomic)
+    if report is None:
+        sys.exit(1)
+
+    print(f"[#] Mode: {report['mode']}")
+    print(f"[#] Failures evaluated: {report['evaluated_failures']}, rejected while locked: "
+          f"{report['rejected_while_locked']}")
+    print(f"[#] failed_attempts in database: {report['failed_attempts_in_db']} "
+          f"(locked until {report['locked_until']})")
+    print(f"[#] Database requests per sign-in: {report['requests_per_sign_in']:.2f} "
+          f"({report['elapsed']:.2f}s total)")
+    if report["lost_increments"]:
+        print(f"[!] Lost increments: {report['lost_increments']}")
+        sys.exit(1)
+    print("[+] Counter consistent: no lost increments")
+
+
+if __name__ == "__main__":
+    main()
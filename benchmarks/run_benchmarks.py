@@ -0,0 +1,249 @@
+"""
+Offline benchmarks for the slow hash and the password attacks.
+
+    python benchmarks/run_benchmarks.py                 # full suite
+    python benchmarks/run_benchmarks.py --quick         # shorter runs, fewer points
+    python benchmarks/run_benchmarks.py --only hash
+    python benchmarks/run_benchmarks.py --only queries  # message/user queries on a seeded SQLite database
+
+Every target is generated locally with slow_hash (no database needed); query benchmarks run on a
+temporary SQLite database built from database_migration.sql. Each run is appended
+to a JSON history file (with the git commit) and compared with the previous run, so
+throughput regressions show up between commits.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from fonction_de_hachage_lent import _slow_hash_core, slow_hash, slow_hash_batch, verify_password
+from backend.password_attack_service import PasswordAttackService, index_to_candidate
+from backend.password_keyspace import KEYSPACE_3, KEYSPACE_5, KEYSPACE_6
+from backend.sqlite_repository import SQLiteRepository, seed
+
+DEFAULT_HISTORY = os.path.join(ROOT, 'benchmarks', 'history.json')
+REGRESSION_THRESHOLD = 0.10  # baisse de débit signalée au-delà de 10 %
+
+
+def _measure(fn, min_time):
+    """Call fn() until min_time seconds have elapsed; returns (calls, seconds)"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls, elapsed
+
+
+def bench_hash(lengths, iterations_list, min_time):
+    """Hashes/sec of _slow_hash_core, verify_password and slow_hash_batch vs input length and iterations"""
+    results = {}
+    salt = bytes(range(16))
+    for iterations in iterations_list:
+        for length in lengths:
+            data = b'a' * length
+            calls, elapsed = _measure(lambda: _slow_hash_core(data, salt, iterations=iterations), min_time)
+            results[f"core.len{length}.i{iterations}"] = calls / elapsed
+
+        stored, salt_hex = slow_hash('aB3+x*', iterations=iterations)
+        calls, elapsed = _measure(lambda: verify_password(stored, 'aB3+x*', salt_hex, iterations=iterations),
+                                  min_time)
+        results[f"verify.i{iterations}"] = calls / elapsed
+
+        batch = [index_to_candidate(i) for i in range(256)]
+        calls, elapsed = _measure(lambda: slow_hash_batch(batch, salt, iterations), min_time)
+        results[f"batch256.i{iterations}"] = calls * len(batch) / elapsed
+    return results
+
+
+def _attack_target(password, iterations):
+    """(digest, salt hex) of a known password, as the attack methods receive them"""
+    return slow_hash(password, iterations=iterations)
+
+
+def bench_attacks(budget, iterations):
+    """
+    Candidates/sec of each attack method. The target is the candidate found after about
+    `budget` attempts, so every method does a comparable amount of work and succeeds.
+    """
+    service = PasswordAttackService()
+    results = {}
+
+    targets = {
+        'dictionary3': KEYSPACE_3[-1],
+        'dictionary5': KEYSPACE_5[min(budget, len(KEYSPACE_5)) - 1],
+        'bruteforce': KEYSPACE_6[budget - 1],
+    }
+    attacks = {
+        'dictionary3': service.dictionary3_attack,
+        'dictionary5': service.dictionary5_attack,
+        'bruteforce': lambda h, s, u, iterations: service.brute_force_6char_attack(h, s, u, iterations=iterations),
+    }
+
+    for method, password in targets.items():
+        stored_hash, salt = _attack_target(password, iterations)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = attacks[method](stored_hash, salt, 'benchmark', iterations=iterations)
+            elapsed = time.perf_counter() - start
+        if not result["success"]:
+            raise RuntimeError(f"Benchmark target not found by {method}")
+        results[f"{method}.i{iterations}"] = result["attempts"] / elapsed
+    return results
+
+
+def bench_scaling(worker_counts, budget, iterations):
+    """Candidates/sec of the parallel brute force over a fixed range with no match, per worker count"""
+    service = PasswordAttackService()
+    # Mot de passe hors de la plage testée : chaque run parcourt toute la plage
+    stored_hash, salt = _attack_target(index_to_candidate(budget + 1), iterations)
+    results = {}
+    for workers in worker_counts:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = service.parallel_brute_force_6char_attack(stored_hash, salt, 'benchmark', workers=workers,
+                                                               ranges=[[0, budget]], iterations=iterations)
+            elapsed = time.perf_counter() - start
+        results[f"parallel.w{workers}.i{iterations}"] = result["attempts"] / elapsed
+    return results
+
+
+def bench_queries(users, messages, min_time):
+    """Queries/sec of the repository reads behind the messaging pages, on a seeded SQLite database"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = SQLiteRepository(os.path.join(tmp, 'bench.db'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed(repository, users=users, messages=messages, hash_iterations=10)
+        # Utilisateur et conversation les plus actifs (pire cas des pages de messagerie)
+        hot_user, other = repository.db.query(
+            'SELECT sender_id, receiver_id FROM messages GROUP BY sender_id, receiver_id '
+            'ORDER BY COUNT(*) DESC LIMIT 1')[0].values()
+        queries = {
+            'user_by_username': lambda: repository.users.get_by_username(f"user{hot_user}"),
+            'conversation': lambda: repository.messages.conversation(hot_user, other),
+            'for_user': lambda: repository.messages.for_user(hot_user),
+            'received': lambda: repository.messages.received(hot_user),
+            'stego_conversation': lambda: repository.stego_messages.conversation(hot_user, other),
+        }
+        for name, query in queries.items():
+            calls, elapsed = _measure(query, min_time)
+            results[f"query.{name}.m{messages}"] = calls / elapsed
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def compare(previous, current, threshold=REGRESSION_THRESHOLD):
+    """(name, before, after) of each metric whose throughput dropped by more than `threshold`"""
+    regressions = []
+    for name, value in current.items():
+        before = previous.get(name)
+        if before and value < before * (1 - threshold):
+            regressions.append((name, before, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slow hash and password attack benchmarks")
+    parser.add_argument('--only', choices=['hash', 'attacks', 'scaling', 'queries'], action='append',
+                        help='Run only these groups (repeatable)')
+    parser.add_argument('--quick', action='store_true', help='Shorter runs for a smoke check')
+    parser.add_argument('--iterations', type=int, default=10000, help='Slow hash iterations for attack targets')
+    parser.add_argument('--budget', type=int, default=None, help='Candidates tested per attack run')
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help='Worker counts for the scaling run')
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--no-save', action='store_true', help='Do not append this run to the history')
+    args = parser.parse_args()
+
+    groups = args.only or ['hash', 'attacks', 'scaling', 'queries']
+    min_time = 0.2 if args.quick else 1.0
+    budget = args.budget or (1024 if args.quick else 8192)
+    cpus = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+
+    results = {}
+    if 'hash' in groups:
+        print("[*] Hash throughput (hashes/sec)")
+        lengths = [3, 6, 64] if args.quick else [3, 5, 6, 16, 64, 256]
+        iterations_list = [1000, 10000] if args.quick else [1000, 10000, 50000]
+        results.update(bench_hash(lengths, iterations_list, min_time))
+    if 'attacks' in groups:
+        print(f"[*] Attack throughput (candidates/sec, {args.iterations} iterations)")
+        results.update(bench_attacks(budget, args.iterations))
+    if 'scaling' in groups:
+        print(f"[*] Parallel brute force scaling (workers: {worker_counts})")
+        results.update(bench_scaling(worker_counts, budget, args.iterations))
+    if 'queries' in groups:
+        messages = 10_000 if args.quick else 100_000
+        print(f"[*] Repository queries (queries/sec, SQLite, {messages:,} messages)")
+        results.update(bench_queries(500 if args.quick else 1000, messages, min_time))
+
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        print(f"    {name:<{width}}  {value:>12,.1f}/s")
+
+    base = results.get(f"parallel.w{worker_counts[0]}.i{args.iterations}")
+    if base:
+        for workers in worker_counts:
+            rate = results[f"parallel.w{workers}.i{args.iterations}"]
+            print(f"    speedup x{workers}: {rate / base:.2f} (efficiency {rate / base / workers * worker_counts[0]:.0%})")
+
+    history = load_history(args.history)
+    if history:
+        previous = history[-1]
+        regressions = compare(previous["results"], results)
+        print(f"\n[*] Compared with {previous.get('commit') or 'previous run'} ({previous['timestamp']})")
+        for name, before, after in regressions:
+            print(f"[!] REGRESSION {name}: {before:,.1f}/s -> {after:,.1f}/s ({after / before - 1:+.0%})")
+        if not regressions:
+            print("[+] No regression above {:.0%}".format(REGRESSION_THRESHOLD))
+
+    if not args.no_save:
+        history.append({
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": cpus,
+            "quick": args.quick,
+            "results": results,
+        })
+        save_history(args.history, history)
+        print(f"[*] Results appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,10 @@ ADD COLUMN locked_until TIMESTAMPTZ NULL;
 
 ALTER TABLE users DROP COLUMN IF EXISTS password;
 
+-- Versioned password hashes: $<algorithm>$<params>$<salt hex>$<digest hex>
+-- (legacy rows keep their bare 8-hex digest and are rehashed at the next login)
+ALTER TABLE users ALTER COLUMN password_hash TYPE VARCHAR(255);
+
 -- Create messages table (from script 1)
 CREATE TABLE IF NOT EXISTS messages (
   id SERIAL PRIMARY KEY,
@@ -49,6 +53,16 @@ CREATE TABLE IF NOT EXISTS stego_messages (
   created_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Conversation key: the ordered user-id pair (smaller id in the high 32 bits), the same for both
+-- directions, so loading a conversation is one equality lookup instead of an OR of two pairs
+ALTER TABLE messages
+ADD COLUMN IF NOT EXISTS conversation_key BIGINT
+  GENERATED ALWAYS AS ((LEAST(sender_id, receiver_id)::bigint << 32) | GREATEST(sender_id, receiver_id)) STORED;
+
+ALTER TABLE stego_messages
+ADD COLUMN IF NOT EXISTS conversation_key BIGINT
+  GENERATED ALWAYS AS ((LEAST(sender_id, receiver_id)::bigint << 32) | GREATEST(sender_id, receiver_id)) STORED;
+
 
 --------------------------------------
 -- 2. Indexes for Performance
@@ -58,12 +72,91 @@ CREATE TABLE IF NOT EXISTS stego_messages (
 CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages(sender_id);
 CREATE INDEX IF NOT EXISTS idx_messages_receiver ON messages(receiver_id);
 CREATE INDEX IF NOT EXISTS idx_messages_created ON messages(date_created DESC);
-CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(sender_id, receiver_id, date_created DESC);
+-- Conversation pages: one index range scan per conversation_key, in keyset order (date_created, id)
+DROP INDEX IF EXISTS idx_messages_conversation;
+DROP INDEX IF EXISTS idx_messages_conversation_keyset;
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_key ON messages(conversation_key, date_created DESC, id DESC);
 
 -- Indexes for stego_messages table
 CREATE INDEX IF NOT EXISTS idx_stego_messages_sender ON stego_messages(sender_id);
 CREATE INDEX IF NOT EXISTS idx_stego_messages_receiver ON stego_messages(receiver_id);
 CREATE INDEX IF NOT EXISTS idx_stego_messages_created ON stego_messages(date_created DESC);
+DROP INDEX IF EXISTS idx_stego_messages_conversation_keyset;
+-- Covering: a stego conversation page (id, date_created, audio_filename, sender_id, receiver_id) is an index-only scan
+CREATE INDEX IF NOT EXISTS idx_stego_messages_conversation_key ON stego_messages(conversation_key, date_created DESC, id DESC)
+  INCLUDE (sender_id, receiver_id, audio_filename);
+
+
+--------------------------------------
+-- 2b. Functions
+--------------------------------------
+
+-- Failed login: increments the counter, applies the lock and returns the new state in a single
+-- atomic statement (no lost increments under concurrent logins, one round trip instead of two)
+CREATE OR REPLACE FUNCTION register_failed_login(p_user_id INTEGER, p_max_failed INTEGER, p_lock_seconds INTEGER)
+RETURNS TABLE (failed_attempts INTEGER, locked_until TIMESTAMPTZ)
+LANGUAGE sql
+AS $$
+  UPDATE users AS u
+  SET failed_attempts = u.failed_attempts + 1,
+      locked_until = CASE
+        WHEN u.failed_attempts + 1 >= p_max_failed THEN now() + make_interval(secs => p_lock_seconds)
+        ELSE u.locked_until
+      END
+  WHERE u.id = p_user_id
+  RETURNING u.failed_attempts, u.locked_until;
+$$;
+
+GRANT EXECUTE ON FUNCTION register_failed_login(INTEGER, INTEGER, INTEGER) TO anon, authenticated;
+
+-- Inbox: one row per peer of a user (message counts, last message, last algorithm) computed in
+-- the database, so the inbox payload grows with the number of peers, not of messages
+CREATE OR REPLACE FUNCTION inbox_summary(p_user_id INTEGER)
+RETURNS TABLE (
+  peer_id INTEGER,
+  peer_username VARCHAR,
+  crypto_count BIGINT,
+  stego_count BIGINT,
+  last_message_at TIMESTAMPTZ,
+  last_message_type TEXT,
+  last_sender_id INTEGER,
+  last_preview VARCHAR,
+  last_algo_name VARCHAR
+)
+LANGUAGE sql STABLE
+AS $$
+  WITH user_messages AS (
+    SELECT 'crypto'::text AS message_type, id, date_created, sender_id, algo_name,
+           LEFT(encrypted, 50)::varchar AS preview,
+           CASE WHEN sender_id = p_user_id THEN receiver_id ELSE sender_id END AS peer_id
+    FROM messages
+    WHERE sender_id = p_user_id OR receiver_id = p_user_id
+    UNION ALL
+    SELECT 'stego'::text, id, date_created, sender_id, NULL, NULL,
+           CASE WHEN sender_id = p_user_id THEN receiver_id ELSE sender_id END
+    FROM stego_messages
+    WHERE sender_id = p_user_id OR receiver_id = p_user_id
+  ),
+  ranked AS (
+    SELECT m.*,
+           COUNT(*) FILTER (WHERE m.message_type = 'crypto') OVER peer AS crypto_count,
+           COUNT(*) FILTER (WHERE m.message_type = 'stego') OVER peer AS stego_count,
+           ROW_NUMBER() OVER (PARTITION BY m.peer_id ORDER BY m.date_created DESC, m.id DESC) AS recency,
+           -- Algorithme du dernier message chiffré (les messages stego n'en ont pas)
+           FIRST_VALUE(m.algo_name) OVER (PARTITION BY m.peer_id
+             ORDER BY m.algo_name IS NULL, m.date_created DESC, m.id DESC) AS last_algo_name
+    FROM user_messages m
+    WINDOW peer AS (PARTITION BY m.peer_id)
+  )
+  SELECT r.peer_id, u.username, r.crypto_count, r.stego_count, r.date_created, r.message_type,
+         r.sender_id, r.preview, r.last_algo_name
+  FROM ranked r
+  JOIN users u ON u.id = r.peer_id
+  WHERE r.recency = 1
+  ORDER BY r.date_created DESC;
+$$;
+
+GRANT EXECUTE ON FUNCTION inbox_summary(INTEGER) TO anon, authenticated;
 
 
 --------------------------------------
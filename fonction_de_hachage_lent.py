@@ -1,5 +1,7 @@
 import secrets
 
+import numpy as np
+
 
 def _to_bytes(input_data):
     """Convertit l'entrée en bytes de façon sûre."""
@@ -72,6 +74,113 @@ def verify_password(stored_hash_hex, password, salt_hex, iterations=10000):
     return secrets.compare_digest(computed_hash, stored_hash_hex)
 
 
+def _slow_hash_lanes(data, salt_val, iterations):
+    """
+    Version vectorisée de `_slow_hash_core` : une ligne de `data` par candidat.
+
+    - data: tableau uint8 de forme (n, longueur), tous les candidats ont la même longueur
+    - salt_val: valeur 32-bit initiale du salt
+    - iterations: int
+
+    Retourne un tableau uint32 de n hashes, identiques bit à bit au calcul scalaire.
+    """
+    n, length = data.shape
+    hash_value = np.full(n, 0x5F5F5F5F, dtype=np.uint32)
+    salt_lane = np.full(n, salt_val, dtype=np.uint32)
+    columns = [np.ascontiguousarray(data[:, j], dtype=np.uint32) for j in range(length)]
+    tmp = np.empty(n, dtype=np.uint32)
+    mul = np.uint32(0x7FED5F)
+    one = np.uint32(1)
+
+    # Les opérations uint32 de numpy bouclent modulo 2**32, comme les masques 0xFFFFFFFF
+    for _ in range(iterations):
+        for byte in columns:
+            hash_value ^= byte
+            np.left_shift(hash_value, 7, out=tmp)
+            np.right_shift(hash_value, 25, out=hash_value)
+            hash_value |= tmp
+            hash_value += salt_lane
+            hash_value *= mul
+            hash_value += one
+
+            np.left_shift(salt_lane, 3, out=tmp)
+            np.right_shift(salt_lane, 29, out=salt_lane)
+            salt_lane |= tmp
+            salt_lane ^= hash_value
+
+    return hash_value
+
+
+def _hash_batch_values(candidates, salt, iterations):
+    """Calcule les hashes (entiers uint32) d'une liste de candidats, groupés par longueur."""
+    if isinstance(salt, str):
+        salt = bytes.fromhex(salt)
+    salt_val = int.from_bytes(salt, 'big') & 0xFFFFFFFF
+
+    encoded = [_to_bytes(c) for c in candidates]
+    results = np.empty(len(encoded), dtype=np.uint32)
+
+    by_length = {}
+    for i, data in enumerate(encoded):
+        by_length.setdefault(len(data), []).append(i)
+
+    for length, indices in by_length.items():
+        block = np.frombuffer(b''.join(encoded[i] for i in indices), dtype=np.uint8)
+        block = block.reshape(len(indices), length)
+        results[indices] = _slow_hash_lanes(block, salt_val, iterations)
+
+    return results
+
+
+def slow_hash_batch(candidates, salt, iterations=10000):
+    """
+    Hache plusieurs candidats en un seul appel (un "lane" numpy par candidat).
+
+    - candidates: liste de str ou bytes
+    - salt: bytes ou hex string du salt (le même pour tous les candidats)
+    - iterations: nombre d'itérations
+
+    Retourne la liste des hash hex (8 chars), identiques à `_slow_hash_core`.
+    """
+    return [format(int(v), '08x') for v in _hash_batch_values(candidates, salt, iterations)]
+
+
+def verify_many(stored_hash_hex, candidates, salt_hex, iterations=10000):
+    """
+    Vérifie un lot de mots de passe candidats contre un hash stocké.
+
+    Destiné aux attaques hors ligne : la comparaison n'est pas en temps constant.
+
+    Retourne une liste de booléens, un par candidat.
+    """
+    target = int(stored_hash_hex, 16)
+    matches = _hash_batch_values(candidates, salt_hex, iterations) == target
+    return matches.tolist()
+
+
+def cross_check(samples=64, iterations=50, seed=None):
+    """
+    Compare `slow_hash_batch` au calcul scalaire `_slow_hash_core` sur des entrées aléatoires.
+
+    Retourne la liste des (candidat, attendu, obtenu) qui diffèrent (vide si tout concorde).
+    """
+    import random
+
+    rng = random.Random(seed)
+    salt_bytes = bytes(rng.getrandbits(8) for _ in range(16))
+    candidates = [bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 12)))
+                  for _ in range(samples)]
+    candidates += ['aaaaaa', '234', '00000', 'Zz9+*a', '']
+
+    batch = slow_hash_batch(candidates, salt_bytes, iterations=iterations)
+    mismatches = []
+    for candidate, got in zip(candidates, batch):
+        expected = _slow_hash_core(_to_bytes(candidate), salt_bytes, iterations=iterations)
+        if expected != got:
+            mismatches.append((candidate, expected, got))
+    return mismatches
+
+
 if __name__ == "__main__":
     # Petit CLI pour tester localement
     import argparse
@@ -89,6 +198,11 @@ if __name__ == "__main__":
     p_verify.add_argument('salt')
     p_verify.add_argument('--iterations', type=int, default=10000)
 
+    p_check = sub.add_parser('crosscheck', help='Compare le hachage par lot au hachage scalaire')
+    p_check.add_argument('--samples', type=int, default=64)
+    p_check.add_argument('--iterations', type=int, default=50)
+    p_check.add_argument('--seed', type=int, default=None)
+
     args = parser.parse_args()
     if args.cmd == 'hash':
         h, s = slow_hash(args.password, iterations=args.iterations)
@@ -97,5 +211,10 @@ if __name__ == "__main__":
     elif args.cmd == 'verify':
         ok = verify_password(args.hash, args.password, args.salt, iterations=args.iterations)
         print('OK' if ok else 'FAIL')
+    elif args.cmd == 'crosscheck':
+        bad = cross_check(samples=args.samples, iterations=args.iterations, seed=args.seed)
+        for candidate, expected, got in bad:
+            print(f'MISMATCH {candidate!r}: scalar={expected} batch={got}')
+        print('OK' if not bad else 'FAIL')
     else:
         parser.print_help()
\ No newline at end of file
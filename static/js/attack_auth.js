@@ -10,9 +10,11 @@ const attackProgress = document.getElementById("attack-progress")
 const progressFill = document.getElementById("progress-fill")
 const progressText = document.getElementById("progress-text")
 const attackLog = document.getElementById("attack-log")
+const cancelAttackBtn = document.getElementById("cancel-attack")
 
 let selectedMethod = null
 let isAttackRunning = false
+let currentJobId = null
 
 // Select attack method
 attackOptions.forEach(option => {
@@ -95,11 +97,19 @@ async function startAttack() {
             addLogEntry("📚 Mode: Attaque par dictionnaire (3 caractères)", "trying");
         } else if (selectedMethod === 'dictionary5') {
             addLogEntry("📚 Mode: Attaque par dictionnaire (5 chiffres)", "trying");
+        } else if (selectedMethod === 'smart') {
+            addLogEntry("🧭 Mode: Attaque intelligente (étapes ordonnées par coût estimé)", "trying");
+        } else if (selectedMethod === 'dictionary_rules') {
+            addLogEntry("🔀 Mode: Dictionnaire + règles de mutation (casse, suffixes, leet)", "trying");
         } else if (selectedMethod === 'bruteforce') {
             addLogEntry("💥 Mode: Force brute (6 caractères: a-z, A-Z, 0-9, +, *)", "trying");
+        } else if (selectedMethod === 'bruteforce_parallel') {
+            addLogEntry("⚙️ Mode: Force brute parallèle (multi-processus)", "trying");
+        } else if (selectedMethod === 'bruteforce_markov') {
+            addLogEntry("🧠 Mode: Force brute ordonnée par modèle de Markov", "trying");
         }
         
-        // Start the actual attack
+        // Start the attack as a background job
         const attackResponse = await fetch("/api/attack_auth/start", {
             method: "POST",
             headers: {
@@ -114,9 +124,9 @@ async function startAttack() {
         const attackData = await attackResponse.json()
         
         if (attackData.success) {
-            // *** THIS IS THE FIX ***
-            // Instead of simulating, just show the real result immediately.
-            showAttackResult(username, attackData)
+            addLogEntry(`🆔 Tâche lancée: ${attackData.job_id}`, "trying")
+            logAttackPlan(attackData.job.plan)
+            followAttackJob(username, attackData.job_id)
         } else {
             showError(attackData.message)
             isAttackRunning = false
@@ -131,15 +141,109 @@ async function startAttack() {
     }
 }
 
+// Follow a job through Server-Sent Events until it finishes
+function followAttackJob(username, jobId) {
+    currentJobId = jobId
+    cancelAttackBtn.style.display = "block"
+    const source = new EventSource(`/api/attack_auth/jobs/${jobId}/stream`)
+
+    source.addEventListener("progress", (event) => {
+        const job = JSON.parse(event.data)
+        const eta = job.eta_seconds !== null ? formatDuration(job.eta_seconds) : "?"
+        updateProgress(
+            job.progress,
+            `${job.attempts.toLocaleString()} / ${job.total.toLocaleString()} - ${Math.round(job.rate)}/s - ETA ${eta} - ${job.current_candidate || ""}`
+        )
+    })
+
+    source.addEventListener("done", (event) => {
+        source.close()
+        const job = JSON.parse(event.data)
+        currentJobId = null
+        cancelAttackBtn.style.display = "none"
+
+        if (job.status === "error") {
+            showError(`Attack failed: ${job.error}`)
+            addLogEntry(`❌ Erreur: ${job.error}`, "error")
+            isAttackRunning = false
+            startAttackBtn.disabled = false
+            return
+        }
+        if (job.status === "cancelled") {
+            addLogEntry(`⏹️ Attaque annulée après ${job.attempts.toLocaleString()} tentatives`, "error")
+            updateProgress(job.progress, "Attaque annulée")
+            isAttackRunning = false
+            startAttackBtn.disabled = false
+            return
+        }
+
+        const result = job.result
+        showAttackResult(username, {
+            found: result.success,
+            password: result.password,
+            attempts: result.attempts,
+            duration: result.duration || 0,
+            method: result.method,
+            workers: result.workers,
+            cached: result.cached,
+            dedup: result.dedup
+        })
+    })
+
+    source.onerror = () => {
+        // The browser reconnects automatically; only report if the stream is closed for good
+        if (source.readyState === EventSource.CLOSED) {
+            showError("Connexion au flux de progression perdue")
+        }
+    }
+}
+
+async function cancelAttack() {
+    if (!currentJobId) return
+    cancelAttackBtn.disabled = true
+    try {
+        await fetch(`/api/attack_auth/jobs/${currentJobId}/cancel`, { method: "POST" })
+        addLogEntry("⏹️ Annulation demandée...", "trying")
+    } catch (error) {
+        showError("Erreur de connexion au serveur")
+    } finally {
+        cancelAttackBtn.disabled = false
+    }
+}
+
+// Smart attack: stage order and estimated durations chosen before the attack starts
+function logAttackPlan(plan) {
+    if (!plan) return
+    addLogEntry(`🧭 Plan: ~${formatDuration(plan.expected_seconds)} attendu, ${formatDuration(plan.worst_seconds)} au pire`, "trying")
+    plan.steps.forEach((step, i) => {
+        addLogEntry(`   ${i + 1}. ${step.method} - ${step.candidates.toLocaleString()} candidats, ~${formatDuration(step.worst_seconds)}`, "trying")
+    })
+}
+
+function formatDuration(seconds) {
+    if (seconds < 60) return `${Math.round(seconds)}s`
+    if (seconds < 3600) return `${Math.round(seconds / 60)}min`
+    if (seconds < 86400) return `${(seconds / 3600).toFixed(1)}h`
+    return `${(seconds / 86400).toFixed(1)}j`
+}
+
 // NEW FUNCTION: Displays the final result from the server
 function showAttackResult(username, attackData) {
     let foundPassword = null;
 
+    if (attackData.cached) {
+        addLogEntry("💾 Résultat déjà connu (cache des attaques précédentes)", "trying");
+    }
+    if (attackData.dedup && attackData.dedup.skipped) {
+        addLogEntry(`♻️ Doublons ignorés: ${attackData.dedup.skipped.toLocaleString()} candidats déjà testés`, "trying");
+    }
+
     if (attackData.found) {
         foundPassword = attackData.password;
         addLogEntry(`🎉 MOT DE PASSE TROUVÉ: ${foundPassword}`, "success");
         addLogEntry(`📊 Tentatives: ${attackData.attempts.toLocaleString()}`, "success");
         addLogEntry(`⏱️ Durée: ${attackData.duration.toFixed(2)}s`, "success");
+        logWorkerRates(attackData.workers);
         updateProgress(100, "Attaque terminée avec succès!");
         successMessage.textContent = `Mot de passe trouvé: ${foundPassword}`;
         
@@ -151,6 +255,7 @@ function showAttackResult(username, attackData) {
         addLogEntry("❌ Aucun mot de passe trouvé avec cette méthode", "error");
         addLogEntry(`📊 Tentatives: ${attackData.attempts.toLocaleString()}`, "trying");
         addLogEntry(`⏱️ Durée: ${attackData.duration.toFixed(2)}s`, "trying");
+        logWorkerRates(attackData.workers);
         updateProgress(100, "Attaque terminée - Aucun résultat");
         successMessage.textContent = "Aucun mot de passe trouvé. Essayez une autre méthode.";
     }
@@ -159,6 +264,14 @@ function showAttackResult(username, attackData) {
     startAttackBtn.disabled = false;
 }
 
+// Per-worker statistics for the parallel brute force
+function logWorkerRates(workers) {
+    if (!workers) return;
+    workers.forEach(w => {
+        addLogEntry(`🧵 Worker ${w.worker}: ${w.attempts.toLocaleString()} tentatives (${Math.round(w.rate)}/s)`, "trying");
+    });
+}
+
 // DELETED: simulateAttackProgress() (No longer needed)
 // DELETED: generateRealisticPassword() (No longer needed)
 
@@ -202,6 +315,7 @@ function goBack() {
 
 // Event listeners
 startAttackBtn.addEventListener("click", startAttack)
+cancelAttackBtn.addEventListener("click", cancelAttack)
 backBtn.addEventListener("click", goBack)
 
 targetUsernameInput.addEventListener("keypress", (e) => {
@@ -124,6 +124,30 @@ function getKeyParams(algorithm) {
 
 // --- CHARGEMENT ET AFFICHAGE DES MESSAGES (Unifié) ---
 
+// Messages chargés, indexés par type et id (les pages se recouvrent après un rafraîchissement)
+const loadedMessages = new Map();
+let olderCursor = null; // curseur de la page suivante (messages plus anciens)
+let olderPagesLoaded = false;
+let latestCursor = null; // curseur des messages déjà reçus (?since=)
+let syncing = false;
+let syncPending = false;
+
+function rememberMessages(messages) {
+  messages.forEach((message) => {
+    loadedMessages.set(`${message.message_type}:${message.id}`, message);
+  });
+}
+
+function sortedMessages() {
+  return [...loadedMessages.values()].sort((a, b) =>
+    a.date_created === b.date_created
+      ? a.id - b.id
+      : a.date_created < b.date_created
+        ? -1
+        : 1,
+  );
+}
+
 async function loadConversation() {
   try {
     const response = await fetch(
@@ -132,7 +156,13 @@ async function loadConversation() {
     const data = await response.json();
 
     if (data.success && data.messages) {
-      displayMessages(data.messages);
+      rememberMessages(data.messages);
+      // Le curseur de la première page ne sert que tant qu'aucune page ancienne n'a été chargée
+      if (!olderPagesLoaded) {
+        olderCursor = data.next_cursor;
+      }
+      latestCursor = data.latest_cursor;
+      displayMessages(sortedMessages());
       if (data.messages.length > 0) {
         // Tente de trouver un nom d'utilisateur
         const firstMessage = data.messages[0];
@@ -159,6 +189,101 @@ async function loadConversation() {
   }
 }
 
+async function loadOlderMessages(button) {
+  if (!olderCursor) return;
+  button.disabled = true;
+  try {
+    const response = await fetch(
+      `/api/messages/conversation/${otherUserId}?before=${encodeURIComponent(olderCursor)}`,
+    );
+    const data = await response.json();
+
+    if (data.success && data.messages) {
+      rememberMessages(data.messages);
+      olderCursor = data.next_cursor;
+      olderPagesLoaded = true;
+
+      // Conserver la position de lecture malgré les messages ajoutés au-dessus
+      const distanceFromBottom =
+        messagesArea.scrollHeight - messagesArea.scrollTop;
+      displayMessages(sortedMessages());
+      messagesArea.scrollTop = messagesArea.scrollHeight - distanceFromBottom;
+    } else {
+      console.error('Échec du chargement:', data.message);
+      button.disabled = false;
+    }
+  } catch (error) {
+    console.error('Error loading older messages:', error);
+    button.disabled = false;
+  }
+}
+
+// Ne télécharge que les messages plus récents que latestCursor et les ajoute en bas
+async function loadNewMessages() {
+  if (!latestCursor) {
+    await loadConversation();
+    return;
+  }
+  if (syncing) {
+    syncPending = true;
+    return;
+  }
+  syncing = true;
+  try {
+    let hasMore = true;
+    while (hasMore) {
+      const response = await fetch(
+        `/api/messages/conversation/${otherUserId}?since=${encodeURIComponent(latestCursor)}`,
+      );
+      const data = await response.json();
+      if (!data.success) {
+        console.error('Échec de la synchronisation:', data.message);
+        break;
+      }
+      appendMessages(data.messages);
+      latestCursor = data.latest_cursor;
+      hasMore = data.has_more;
+    }
+  } catch (error) {
+    console.error('Error loading new messages:', error);
+  } finally {
+    syncing = false;
+  }
+  if (syncPending) {
+    syncPending = false;
+    await loadNewMessages();
+  }
+}
+
+function appendMessages(messages) {
+  const fresh = messages.filter(
+    (message) =>
+      !loadedMessages.has(`${message.message_type}:${message.id}`),
+  );
+  if (fresh.length === 0) return;
+
+  const wasEmpty = loadedMessages.size === 0;
+  rememberMessages(fresh);
+  if (wasEmpty) {
+    displayMessages(sortedMessages());
+    return;
+  }
+
+  const isScrolledToBottom =
+    messagesArea.scrollHeight - messagesArea.clientHeight <=
+    messagesArea.scrollTop + 1;
+  fresh.forEach((message) => {
+    if (message.message_type === 'crypto') {
+      messagesArea.appendChild(createCryptoMessageElement(message));
+    } else if (message.message_type === 'stego') {
+      messagesArea.appendChild(createStegoMessageElement(message));
+    }
+  });
+  if (isScrolledToBottom) {
+    messagesArea.scrollTop = messagesArea.scrollHeight;
+  }
+}
+
 function displayMessages(messages) {
   if (messages.length === 0) {
     messagesArea.innerHTML =
@@ -171,6 +296,13 @@ function displayMessages(messages) {
     messagesArea.scrollTop + 1;
 
   messagesArea.innerHTML = '';
+  if (olderCursor) {
+    const olderBtn = document.createElement('button');
+    olderBtn.className = 'load-older-btn';
+    olderBtn.textContent = 'Charger les messages plus anciens';
+    olderBtn.addEventListener('click', () => loadOlderMessages(olderBtn));
+    messagesArea.appendChild(olderBtn);
+  }
   messages.forEach((message) => {
     // Aiguillage vers la bonne fonction d'affichage
     if (message.message_type === 'crypto') {
@@ -405,7 +537,7 @@ async function sendCryptoMessage() {
     const data = await response.json();
     if (data.success) {
       messageInput.value = '';
-      await loadConversation();
+      await loadNewMessages();
     } else {
       sendError.textContent = 'Erreur: ' + data.message;
     }
@@ -455,7 +587,7 @@ async function sendStegoMessage() {
       stegoMessageInput.value = '';
       stegoFileInput.value = '';
       stegoFileInfo.textContent = '';
-      await loadConversation();
+      await loadNewMessages();
     } else {
       sendError.textContent = 'Erreur: ' + data.message;
     }
@@ -483,9 +615,28 @@ function escapeHtml(text) {
 }
 
 async function manualRefresh() {
-  await loadConversation();
+  await loadNewMessages();
+}
+
+// Nouveaux messages poussés par le serveur (Server-Sent Events)
+function listenForMessages() {
+  const source = new EventSource('/api/messages/stream');
+  source.addEventListener('new_message', (e) => {
+    const event = JSON.parse(e.data);
+    if (
+      event.sender_id === otherUserId ||
+      event.receiver_id === otherUserId
+    ) {
+      loadNewMessages();
+    }
+  });
+  // Après une coupure, EventSource se reconnecte seul ; on rattrape ce qui a pu être manqué
+  source.addEventListener('open', () => {
+    if (latestCursor) loadNewMessages();
+  });
 }
 
 // Init
 updateKeyInputs();
-loadConversation();
\ No newline at end of file
+loadConversation();
+listenForMessages();
\ No newline at end of file
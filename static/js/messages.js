@@ -2,48 +2,26 @@ const conversationList = document.getElementById('conversation-list');
 
 async function loadConversations() {
     try {
-        const response = await fetch('/api/messages/all');
+        // Résumé par interlocuteur calculé côté base (taille proportionnelle au nombre de conversations)
+        const response = await fetch('/api/messages/inbox');
         const data = await response.json();
 
-        if (data.success && data.messages) {
-            displayConversations(data.messages);
+        if (data.success && data.conversations) {
+            displayConversations(data.conversations);
         }
     } catch (error) {
         console.error('Error loading conversations:', error);
     }
 }
 
-function displayConversations(messages) {
-    const conversations = {};
-
-    messages.forEach(message => {
-        const otherUserId = message.sender_id === userId ? message.receiver_id : message.sender_id;
-        const otherUsername = message.sender_id === userId
-            ? message.receiver.username
-            : message.sender.username;
-
-        if (!conversations[otherUserId]) {
-            conversations[otherUserId] = {
-                userId: otherUserId,
-                username: otherUsername,
-                lastMessage: message,
-                messages: []
-            };
-        }
-
-        conversations[otherUserId].messages.push(message);
-        if (new Date(message.date_created) > new Date(conversations[otherUserId].lastMessage.date_created)) {
-            conversations[otherUserId].lastMessage = message;
-        }
-    });
-
-    if (Object.keys(conversations).length === 0) {
+function displayConversations(conversations) {
+    if (conversations.length === 0) {
         conversationList.innerHTML = '<p class="no-messages">Aucune conversation</p>';
         return;
     }
 
     conversationList.innerHTML = '';
-    Object.values(conversations).forEach(conv => {
+    conversations.forEach(conv => {
         const item = createConversationItem(conv);
         conversationList.appendChild(item);
     });
@@ -52,21 +30,27 @@ function displayConversations(messages) {
 function createConversationItem(conversation) {
     const div = document.createElement('div');
     div.className = 'conversation-item';
-    div.onclick = () => window.location.href = `/conversation/${conversation.userId}`;
+    div.onclick = () => window.location.href = `/conversation/${conversation.peer_id}`;
 
-    const date = new Date(conversation.lastMessage.date_created).toLocaleString('fr-FR');
-    const preview = conversation.lastMessage.encrypted.substring(0, 50) + '...';
-    const direction = conversation.lastMessage.sender_id === userId ? 'Sent' : 'Received';
+    const date = new Date(conversation.last_message_at).toLocaleString('fr-FR');
+    const preview = conversation.last_message_type === 'stego'
+        ? '🎵 Message audio'
+        : conversation.last_preview + '...';
+    const direction = conversation.last_sender_id === userId ? 'Sent' : 'Received';
+    const algorithm = conversation.last_algo_name ? ` · ${conversation.last_algo_name}` : '';
 
     div.innerHTML = `
         <div class="conversation-header-info">
-            <span class="conversation-username">${conversation.username}</span>
+            <span class="conversation-username">${conversation.peer_username}</span>
             <span class="conversation-time">${date}</span>
         </div>
         <div class="conversation-preview">
             <strong>${direction}:</strong>
             <span class="encrypted">${preview}</span>
         </div>
+        <div class="conversation-counts">
+            ${conversation.crypto_count} texte · ${conversation.stego_count} audio${algorithm}
+        </div>
     `;
 
     return div;